@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+
+#################################################################################################################
+# Benchmark of the API's cold start, i.e the time taken to start a new Python process, import the Flask app and serve
+# a first code lookup (/api/alpha/DE), comparing loading the dataset and its lookup indexes from the build-time 
+# snapshot with building them from the iso3166-2 package on import. The import time of each dependency is also 
+# printed, from the app's startup diagnostics. The cold start of an earlier commit of the API, e.g the commit before the
+# snapshot was added, can also be measured, checked out into a temporary git worktree, to compare against.
+#
+# python benchmarks/benchmark_cold_start.py [--runs 10] [--compare git_ref]
+#################################################################################################################
+
+#root directory of the API, containing index.py
+api_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#script run in each new process, timing the import of the app and its first request, returning its startup diagnostics
+import_script = "import time; start = time.perf_counter(); import index, json; import_ms = (time.perf_counter() - start) * 1000; " \
+    "index.app.test_client().get('/api/alpha/DE'); first_request_ms = (time.perf_counter() - start) * 1000 - import_ms; " \
+    "print(json.dumps(dict(index.startup_diagnostics, total_import_ms=import_ms, first_request_ms=first_request_ms)))"
+
+def cold_start(snapshot_path: str, cwd: str=api_dir) -> tuple[float, dict]:
+    """ Start a new Python process that imports the app, return its total wall time in ms and startup diagnostics. """
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", import_script], cwd=cwd, capture_output=True, text=True, check=True,
+        env=dict(os.environ, ISO3166_2_SNAPSHOT=snapshot_path)).stdout
+    return (time.perf_counter() - start) * 1000, json.loads(output.strip().splitlines()[-1])
+
+def benchmark(label: str, snapshot_path: str, num_runs: int) -> None:
+    """ Print the median process wall time, import, first request and dataset load times over the input number of cold starts. """
+    results = [cold_start(snapshot_path) for _ in range(num_runs)]
+    print(f"{label:<34} process p50={median(result[0] for result in results):7.1f}ms "
+          f"import p50={median(result[1]['total_import_ms'] for result in results):7.1f}ms "
+          f"first request p50={median(result[1]['first_request_ms'] for result in results):6.1f}ms "
+          f"dataset load p50={median(result[1]['dataset_load_ms'] for result in results):7.1f}ms "
+          f"(source: {results[0][1]['dataset_source']})")
+    print(" " * 35 + "imports p50: " + ", ".join(f"{module_name}={median(result[1]['import_ms'][module_name] for result in results):.1f}ms" 
+        for module_name in results[0][1]['import_ms']))
+
+def benchmark_commit(git_ref: str, num_runs: int) -> None:
+    """ Print the median process wall time, import and first request times of the API at an earlier commit, checked out into a temporary worktree. """
+    #earlier commits may not record their startup diagnostics, so only the times measured by the script itself are reported
+    commit_script = "import time; start = time.perf_counter(); import index, json; import_ms = (time.perf_counter() - start) * 1000; " \
+        "index.app.test_client().get('/api/alpha/DE'); print(json.dumps({'total_import_ms': import_ms, " \
+        "'first_request_ms': (time.perf_counter() - start) * 1000 - import_ms}))"
+    with tempfile.TemporaryDirectory() as temp_dir:
+        worktree_dir = os.path.join(temp_dir, "worktree")
+        subprocess.run(["git", "worktree", "add", "--detach", worktree_dir, git_ref], cwd=api_dir, check=True, capture_output=True)
+        try:
+            #import once so the bytecode of the commit's modules is cached, as it is for the current commit
+            subprocess.run([sys.executable, "-c", "import index"], cwd=worktree_dir, check=True, capture_output=True)
+            results = []
+            for _ in range(num_runs):
+                start = time.perf_counter()
+                output = subprocess.run([sys.executable, "-c", commit_script], cwd=worktree_dir, capture_output=True, text=True, check=True).stdout
+                results.append(((time.perf_counter() - start) * 1000, json.loads(output.strip().splitlines()[-1])))
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree_dir], cwd=api_dir, check=True, capture_output=True)
+    print(f"{'commit ' + git_ref:<34} process p50={median(result[0] for result in results):7.1f}ms "
+          f"import p50={median(result[1]['total_import_ms'] for result in results):7.1f}ms "
+          f"first request p50={median(result[1]['first_request_ms'] for result in results):6.1f}ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the API, with and without the dataset snapshot.")
+    parser.add_argument("--runs", type=int, default=10, help="number of cold starts per configuration (default 10).")
+    parser.add_argument("--compare", help="git ref of an earlier commit of the API whose cold start is also measured, e.g the commit before the snapshot.")
+    args = parser.parse_args()
+
+    if (args.compare):
+        benchmark_commit(args.compare, args.runs)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        snapshot_path = os.path.join(temp_dir, "iso3166-2-snapshot.pickle")
+        subprocess.run([sys.executable, "build_snapshot.py", snapshot_path], cwd=api_dir, check=True, capture_output=True,
+            env=dict(os.environ, ISO3166_2_SNAPSHOT=os.path.join(temp_dir, "missing.pickle")))
+
+        benchmark("iso3166-2 package (no snapshot)", os.path.join(temp_dir, "missing.pickle"), args.runs)
+        benchmark("build-time snapshot", snapshot_path, args.runs)
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from statistics import median, quantiles
+
+#allow the API module to be imported when the benchmark is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index import app, all_iso3166_2, country_name_resolver, subdivision_name_cache
+
+#################################################################################################################
+# Benchmark of every main endpoint of the API, driving the Flask app in-process through its test client, without
+# any network access. The scenarios are run in several interleaved rounds, so a transient slowdown of the machine is
+# spread over all scenarios, and the median throughput and p50/p95/p99 latency of the rounds are compared with a stored
+# baseline, exiting with a non-zero status if the p50 or p95 latency of any scenario has regressed by more than the tolerance.
+# The /api/name and /api/country_name scenarios clear the name caches before each request, so every request does
+# the full normalization and fuzzy matching, other than the cached name scenario.
+#
+# python benchmarks/benchmark_endpoints.py [--iterations 100] [--rounds 5] [--tolerance 0.3] [--save-baseline] [--scenario name]
+#################################################################################################################
+
+#default path of the stored baseline results
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+#min increase in ms of a latency for it to be a regression, so jitter of sub-millisecond latencies isn't reported
+MIN_REGRESSION_MS = 0.05
+
+def clear_name_caches() -> None:
+    """ Clear the /api/name result cache and the country name resolver's fuzzy match cache. """
+    subdivision_name_cache.clear()
+    country_name_resolver().fuzzy_match.cache_clear()
+
+def scenarios() -> list:
+    """ Return the (name, url, setup function run untimed before each request or None) of each benchmark scenario. """
+    fifty_alpha_codes = ",".join(sorted(all_iso3166_2)[:50])
+    return [("all", "/api/all", None),
+        ("alpha single", "/api/alpha/DE", None),
+        ("alpha 50 codes", "/api/alpha/" + fifty_alpha_codes, None),
+        ("subdivision single", "/api/subdivision/IE-D", None),
+        ("subdivision list", "/api/subdivision/IE-D,GB-BIR,FR-IDF,DE-BY,US-NY", None),
+        ("name exact", "/api/name/Westmeath", clear_name_caches),
+        ("name exact (cached)", "/api/name/Westmeath", None),
+        ("name fuzzy", "/api/name/Westmeth", clear_name_caches),
+        ("name low likeness", "/api/name/Westmeath?likeness=40", clear_name_caches),
+        ("name multiple", "/api/name/Westmeath,Bayern,Lombardia,Ontario,Zurich", clear_name_caches),
+        ("country_name exact", "/api/country_name/Ireland", clear_name_caches),
+        ("country_name fuzzy", "/api/country_name/Irelandd", clear_name_caches),
+        ("list_subdivisions", "/api/list_subdivisions", None)]
+
+def benchmark(client, url: str, setup, iterations: int, warmup: int) -> dict:
+    """
+    Request the url the input number of times, after warming up, returning the throughput in requests
+    per second and the p50/p95/p99 latency in ms of the timed requests. Each request's response body
+    is read in full and its status code checked.
+
+    Parameters
+    ==========
+    :client: flask.testing.FlaskClient
+        test client of the app.
+    :url: str
+        url requested.
+    :setup: callable
+        function run, untimed, before each request, or None.
+    :iterations: int
+        number of timed requests.
+    :warmup: int
+        number of untimed requests before the timed requests.
+
+    Returns
+    =======
+    :results: dict
+        throughput and p50, p95 and p99 latency.
+    """
+    timings = []
+    for iteration in range(warmup + iterations):
+        if (setup is not None):
+            setup()
+        start = time.perf_counter()
+        response = client.get(url)
+        response.get_data()
+        duration = time.perf_counter() - start
+        assert response.status_code == 200, f"{url} returned status code {response.status_code}."
+        if (iteration >= warmup):
+            timings.append(duration)
+
+    cut_points = quantiles(timings, n=100, method="inclusive")
+    return {"throughput": round(len(timings) / sum(timings), 1), "p50_ms": round(cut_points[49] * 1000, 4),
+        "p95_ms": round(cut_points[94] * 1000, 4), "p99_ms": round(cut_points[98] * 1000, 4)}
+
+def regressions(name: str, results: dict, baseline: dict, tolerance: float) -> list:
+    """ Return a message for each of the p50 and p95 latencies of the scenario slower than its baseline by more than the tolerance. """
+    return [f"{name}: {percentile} {results[percentile]:.3f}ms vs baseline {baseline[percentile]:.3f}ms (+{(results[percentile] / baseline[percentile] - 1) * 100:.0f}%)"
+        for percentile in ("p50_ms", "p95_ms") if results[percentile] > baseline[percentile] * (1 + tolerance)
+            and results[percentile] - baseline[percentile] > MIN_REGRESSION_MS]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark every endpoint of the API in-process and compare with the stored baseline.")
+    parser.add_argument("--iterations", type=int, default=100, help="number of timed requests per scenario per round (default 100).")
+    parser.add_argument("--rounds", type=int, default=5, help="number of rounds of all scenarios, the median of the rounds is reported (default 5).")
+    parser.add_argument("--warmup", type=int, default=10, help="number of untimed requests before each scenario per round (default 10).")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="max allowed increase of the p50 and p95 latency over the baseline, e.g 0.3 = 30%% (default 0.3).")
+    parser.add_argument("--baseline", default=baseline_path, help="path of the baseline results (default benchmarks/baseline.json).")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline rather than comparing with it.")
+    parser.add_argument("--scenario", action="append", help="only run the scenarios whose name contains the value, can be repeated.")
+    args = parser.parse_args()
+
+    baseline = {}
+    if (os.path.isfile(args.baseline)):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["scenarios"]
+    elif not (args.save_baseline):
+        print(f"No baseline found at {args.baseline}, run with --save-baseline to store one.")
+
+    client = app.test_client()
+    selected_scenarios = [(name, url, setup) for name, url, setup in scenarios() if not args.scenario or any(scenario in name for scenario in args.scenario)]
+    rounds = {name: [] for name, _, _ in selected_scenarios}
+    for _ in range(args.rounds):
+        for name, url, setup in selected_scenarios:
+            rounds[name].append(benchmark(client, url, setup, args.iterations, args.warmup))
+
+    results, failures = {}, []
+    print(f"{'scenario':<22} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}   baseline p50/p95")
+    for name, scenario_rounds in rounds.items():
+        results[name] = {metric: round(median(result[metric] for result in scenario_rounds), 4) for metric in scenario_rounds[0]}
+        scenario_baseline = baseline.get(name)
+        print(f"{name:<22} {results[name]['throughput']:>9.1f} {results[name]['p50_ms']:>7.3f}ms {results[name]['p95_ms']:>7.3f}ms "
+              f"{results[name]['p99_ms']:>7.3f}ms   " + (f"{scenario_baseline['p50_ms']:.3f}ms/{scenario_baseline['p95_ms']:.3f}ms"
+              if scenario_baseline else "-"))
+        if (scenario_baseline and not args.save_baseline):
+            failures.extend(regressions(name, results[name], scenario_baseline, args.tolerance))
+
+    if (args.save_baseline):
+        #keep the baseline of any scenarios that weren't run
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(), "iterations": args.iterations, "rounds": args.rounds,
+                "scenarios": dict(baseline, **results)}, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"Saved baseline to {args.baseline}.")
+    elif (failures):
+        print(f"\nFAILED: {len(failures)} latency regression(s) of more than {args.tolerance * 100:.0f}% over the baseline:", file=sys.stderr)
+        for failure in failures:
+            print(f"  REGRESSION {failure}", file=sys.stderr)
+        sys.exit(1)
+    elif (baseline):
+        print(f"\nOK: no latency regressions of more than {args.tolerance * 100:.0f}% over the baseline.")
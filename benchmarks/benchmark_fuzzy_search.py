@@ -0,0 +1,63 @@
+import os
+import sys
+import random
+import time
+from statistics import quantiles
+from thefuzz import fuzz, process
+
+#allow the API module to be imported when the benchmark is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index import subdivision_names_list, subdivision_name_search
+
+#################################################################################################################
+# Benchmark of the fuzzy subdivision name search used by /api/name, comparing the trigram index with the previous
+# thefuzz path, which scored every subdivision name via process.extract and returned only the top 5 matches.
+#
+# python benchmarks/benchmark_fuzzy_search.py
+#################################################################################################################
+
+def percentiles(timings: list) -> tuple[float, float]:
+    """ Return the p50 and p99 of a list of timings, in milliseconds. """
+    cut_points = quantiles(timings, n=100, method="inclusive")
+    return cut_points[49] * 1000, cut_points[98] * 1000
+
+def misspell(name: str) -> str:
+    """ Return the input name with a random character substituted, deleted or inserted. """
+    position = random.randrange(len(name))
+    operation = random.choice(["substitute", "delete", "insert"])
+    if (operation == "substitute"):
+        return name[:position] + random.choice("aeiou") + name[position + 1:]
+    if (operation == "delete"):
+        return name[:position] + name[position + 1:]
+    return name[:position] + random.choice("aeiou") + name[position:]
+
+def benchmark(queries: list, likeness: float, repeats: int=3) -> None:
+    """ Time the thefuzz and trigram index searches for each query at the input likeness and print p50/p99. """
+    thefuzz_timings, trigram_timings, thefuzz_matches, trigram_matches = [], [], 0, 0
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            matches = [match for match in process.extract(query, subdivision_names_list, scorer=fuzz.ratio) if match[1] >= likeness]
+            thefuzz_timings.append(time.perf_counter() - start)
+            thefuzz_matches += len(matches)
+
+            start = time.perf_counter()
+            matches = subdivision_name_search.search(query, score_cutoff=likeness)
+            trigram_timings.append(time.perf_counter() - start)
+            trigram_matches += len(matches)
+
+    print(f"likeness={likeness:<5} thefuzz p50={percentiles(thefuzz_timings)[0]:7.3f}ms p99={percentiles(thefuzz_timings)[1]:7.3f}ms "
+          f"matches/query={thefuzz_matches / len(thefuzz_timings):6.1f} | trigram p50={percentiles(trigram_timings)[0]:7.3f}ms "
+          f"p99={percentiles(trigram_timings)[1]:7.3f}ms matches/query={trigram_matches / len(trigram_timings):6.1f}")
+
+if __name__ == '__main__':
+    random.seed(0)
+    exact_queries = random.sample(subdivision_names_list, 200)
+    misspelt_queries = [misspell(name) for name in exact_queries]
+
+    print(f"Exact names ({len(exact_queries)} queries):")
+    for likeness in [100, 90]:
+        benchmark(exact_queries, likeness)
+    print(f"Misspelt names ({len(misspelt_queries)} queries):")
+    for likeness in [90, 75, 50, 30]:
+        benchmark(misspelt_queries, likeness)
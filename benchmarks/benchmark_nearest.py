@@ -0,0 +1,78 @@
+import os
+import sys
+import random
+import time
+from heapq import nsmallest
+from statistics import quantiles
+
+#allow the API module to be imported when the benchmark is run from any directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from index import all_iso3166_2, bulk_nearest_subdivisions, nearest_subdivisions
+from spatial_index import haversine_distance
+
+#################################################################################################################
+# Benchmark of the nearest subdivision search used by /api/nearest, comparing the k-d tree spatial index with a
+# linear scan computing the haversine distance to every subdivision's latLng, as done by clients downloading
+# /api/all. Both searches are checked to return the same subdivisions. The bulk reverse geocoding of a batch of 
+# coordinates, in vectorized NumPy tiles, is also compared with looking up each coordinate in the k-d tree.
+#
+# python benchmarks/benchmark_nearest.py
+#################################################################################################################
+
+def percentiles(timings: list) -> tuple[float, float]:
+    """ Return the p50 and p99 of a list of timings, in milliseconds. """
+    cut_points = quantiles(timings, n=100, method="inclusive")
+    return cut_points[49] * 1000, cut_points[98] * 1000
+
+def linear_scan(lat: float, lng: float, k: int=1, alpha_codes: list=None, radius: float=None) -> list[tuple[str, float]]:
+    """ Return the k nearest subdivisions to the coordinates by computing the distance to every subdivision. """
+    distances = [(haversine_distance(lat, lng, *subdivision["latLng"]), subd) for alpha_2 in (alpha_codes or all_iso3166_2)
+        for subd, subdivision in all_iso3166_2[alpha_2].items()]
+    return [(subd, distance) for distance, subd in nsmallest(k, distances) if radius is None or distance <= radius]
+
+def benchmark(label: str, queries: list, k: int=1, alpha_codes: list=None, radius: float=None) -> None:
+    """ Time the linear scan and k-d tree searches for each query and print p50/p99 and the speedup. """
+    linear_timings, tree_timings = [], []
+    for lat, lng in queries:
+        start = time.perf_counter()
+        expected = linear_scan(lat, lng, k, alpha_codes, radius)
+        linear_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        nearest = nearest_subdivisions(lat, lng, k, alpha_codes, radius)
+        tree_timings.append(time.perf_counter() - start)
+        assert [round(distance, 6) for _, distance in nearest] == [round(distance, 6) for _, distance in expected], (lat, lng)
+
+    print(f"{label:<24} linear scan p50={percentiles(linear_timings)[0]:7.3f}ms p99={percentiles(linear_timings)[1]:7.3f}ms | "
+          f"k-d tree p50={percentiles(tree_timings)[0]:7.3f}ms p99={percentiles(tree_timings)[1]:7.3f}ms | "
+          f"speedup p50={percentiles(linear_timings)[0] / percentiles(tree_timings)[0]:6.1f}x")
+
+def benchmark_bulk(num_points: int) -> None:
+    """ Time the bulk reverse geocoding of random coordinates, compared with looking up each coordinate in the k-d tree. """
+    lats, lngs = [random.uniform(-90, 90) for _ in range(num_points)], [random.uniform(-180, 180) for _ in range(num_points)]
+    start = time.perf_counter()
+    nearest = [nearest_subdivisions(lat, lng)[0] for lat, lng in zip(lats, lngs)]
+    tree_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    bulk_nearest = list(bulk_nearest_subdivisions(lats, lngs))
+    bulk_time = time.perf_counter() - start
+    assert [subd for subd, _ in bulk_nearest] == [subd for subd, _ in nearest]
+
+    print(f"bulk, {num_points} points    k-d tree per point={tree_time:7.2f}s ({num_points / tree_time:9.0f} points/s) | "
+          f"vectorized tiles={bulk_time:7.2f}s ({num_points / bulk_time:9.0f} points/s) | speedup={tree_time / bulk_time:6.1f}x")
+
+if __name__ == '__main__':
+    random.seed(0)
+    #half of the queries near a random subdivision, half uniformly distributed over the globe, e.g in the ocean
+    subdivisions = [subdivision["latLng"] for country in all_iso3166_2.values() for subdivision in country.values()]
+    queries = [(lat + random.uniform(-0.5, 0.5), lng + random.uniform(-0.5, 0.5)) for lat, lng in random.sample(subdivisions, 250)] + \
+        [(random.uniform(-90, 90), random.uniform(-180, 180)) for _ in range(250)]
+    queries = [(max(-90, min(90, lat)), max(-180, min(180, lng))) for lat, lng in queries]
+
+    print(f"{len(queries)} queries over {len(subdivisions)} subdivisions:")
+    benchmark("k=1", queries)
+    benchmark("k=10", queries, k=10)
+    benchmark("k=10, radius=100km", queries, k=10, radius=100)
+    benchmark("k=5, country=GB,FR", queries, k=5, alpha_codes=["GB", "FR"])
+    benchmark_bulk(100000)
@@ -0,0 +1,16 @@
+import sys
+from index import build_dataset, save_snapshot, snapshot_path
+
+#################################################################################################################
+# Build step that loads all ISO 3166-2 subdivision data from the iso3166-2 package, builds all of its derived 
+# lookup indexes and saves them to a single compact snapshot file, which the API then loads in one read at startup 
+# rather than rebuilding everything on each cold start. Run after installing the requirements, e.g in the Dockerfile.
+#
+# python build_snapshot.py [output_path]
+#################################################################################################################
+
+if __name__ == '__main__':
+    #output path of snapshot, defaults to the path the API loads it from
+    output_path = sys.argv[1] if len(sys.argv) > 1 else snapshot_path
+    save_snapshot(build_dataset(), output_path)
+    print(f"Saved ISO 3166-2 dataset snapshot to {output_path}.")
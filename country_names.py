@@ -0,0 +1,168 @@
+from functools import lru_cache
+import threading
+
+#########################################################################################################################
+# Country name resolver used by the /api/country_name endpoint. Every official ISO 3166-1 country name, its apolitical
+# name and a table of commonly used aliases are normalized and mapped to their alpha-2 code once, so most names are
+# resolved using a single lookup. Fuzzy matching is only used as a fallback for names without an exact match, e.g
+# misspellings, with its results cached in an LRU cache keyed by the normalized name.
+#########################################################################################################################
+
+#commonly used country names that don't closely match their official ISO 3166-1 name, mapped to their alpha-2 code
+COUNTRY_NAME_ALIASES = {"UAE": "AE", "Brunei": "BN", "Bolivia": "BO", "Bosnia": "BA", "Bonaire": "BQ", "DR Congo": "CD",
+    "Ivory Coast": "CI", "Cape Verde": "CV", "Cocos Islands": "CC", "Falkland Islands": "FK", "Micronesia": "FM",
+    "United Kingdom": "GB", "UK": "GB", "South Georgia": "GS", "Iran": "IR", "North Korea": "KP", "South Korea": "KR",
+    "Laos": "LA", "Moldova": "MD", "Saint Martin": "MF", "Macau": "MO", "Pitcairn Islands": "PN", "Heard Island": "HM",
+    "Palestine": "PS", "Saint Helena": "SH", "St Helena": "SH", "Saint Kitts": "KN", "St Kitts": "KN", "St Vincent": "VC",
+    "Saint Vincent": "VC", "St Lucia": "LC", "Russia": "RU", "Sao Tome and Principe": "ST", "Sint Maarten": "SX",
+    "Syria": "SY", "Svalbard": "SJ", "French Southern and Antarctic Lands": "TF", "Turkey": "TR", "Taiwan": "TW",
+    "Tanzania": "TZ", "USA": "US", "United States": "US", "Vatican City": "VA", "Vatican": "VA", "Venezuela": "VE",
+    "British Virgin Islands": "VG", "Vietnam": "VN", "Czech Republic": "CZ", "East Timor": "TL", "Swaziland": "SZ"}
+
+#minimum fuzzy matching likeness score, between 0 and 100, of a country name without an exact match
+FUZZY_SCORE_CUTOFF = 90
+
+def normalize_country_name(country_name: str) -> str:
+    """
+    Normalize a country name for matching, decoding any unicode or accent characters, lower
+    casing, replacing all non alphanumeric characters with whitespace and collapsing repeated
+    whitespace, e.g "Côte d'Ivoire" -> "cote d ivoire".
+
+    Parameters
+    ==========
+    :country_name: str
+        country name.
+
+    Returns
+    =======
+    :normalized_name: str
+        normalized country name.
+    """
+    from unidecode import unidecode
+
+    return " ".join("".join(char if char.isalnum() else " " for char in unidecode(country_name).lower()).split())
+
+class CountryNameResolver():
+    """
+    Resolver of country names to their ISO 3166-1 alpha-2 code. Official names, apolitical names
+    and aliases are normalized and stored in a hash map, giving an exact match using a single
+    lookup. Names without an exact match are fuzzy matched against all of the known names, using
+    the same WRatio scorer as thefuzz's process.extract, with the result of each normalized name
+    cached in an LRU cache. The number of exact, cached and uncached fuzzy lookups are counted.
+
+    Parameters
+    ==========
+    :countries: iterable
+        collection of iso3166 Country objects, with name, apolitical_name and alpha2 attributes.
+    :aliases: dict (default=COUNTRY_NAME_ALIASES)
+        mapping of country name aliases to their alpha-2 code.
+    :fuzzy_cache_size: int (default=1024)
+        max number of fuzzy matching results stored in the LRU cache.
+
+    Methods
+    =======
+    lookup(country_name):
+        return the alpha-2 code of the exactly matching country name, else None.
+    resolve(country_name, stats=None):
+        return the alpha-2 code of the exactly matching or closest fuzzy matching country name, else None.
+    stats():
+        return the exact hit and fuzzy cache hit/miss counters of the resolver.
+    """
+    def __init__(self, countries, aliases: dict=COUNTRY_NAME_ALIASES, fuzzy_cache_size: int=1024):
+
+        #map each normalized official name, apolitical name and alias to its alpha-2 code, official names taking priority
+        self.names = {}
+        for country in countries:
+            self.names.setdefault(normalize_country_name(country.name), country.alpha2)
+        for country in countries:
+            self.names.setdefault(normalize_country_name(country.apolitical_name), country.alpha2)
+        for alias, alpha_2 in aliases.items():
+            self.names.setdefault(normalize_country_name(alias), alpha_2)
+        self.choices = list(self.names)
+
+        #cache of fuzzy matching results, keyed by normalized name, and counter of exact matches
+        self.fuzzy_match = lru_cache(maxsize=fuzzy_cache_size)(self._fuzzy_match)
+        self.exact_hits = 0
+        self.lock = threading.Lock()
+
+        #number of candidate names scored by the current thread's fuzzy matching, only scored on a fuzzy cache miss
+        self.scoring = threading.local()
+
+    def _fuzzy_match(self, normalized_name: str) -> str:
+        """ Return the alpha-2 code of the closest matching known country name with a likeness of at least the cutoff, else None. """
+        from rapidfuzz import fuzz, process
+
+        #scores are rounded to an integer in thefuzz, so a raw score just below the cutoff can still round up to it
+        match = process.extractOne(normalized_name, self.choices, scorer=fuzz.WRatio, processor=None,
+            score_cutoff=FUZZY_SCORE_CUTOFF - 0.5)
+        self.scoring.candidates_scored = getattr(self.scoring, "candidates_scored", 0) + len(self.choices)
+        return self.names[match[0]] if match is not None else None
+
+    def lookup(self, country_name: str) -> str:
+        """
+        Return the alpha-2 code of the input country name if it exactly matches a known country
+        name or alias, once normalized, else None.
+
+        Parameters
+        ==========
+        :country_name: str
+            country name.
+
+        Returns
+        =======
+        :alpha_2: str
+            2 letter alpha-2 code of country, None if no exact match found.
+        """
+        return self._lookup(normalize_country_name(country_name))
+
+    def _lookup(self, normalized_name: str) -> str:
+        """ Return the alpha-2 code of the exactly matching normalized country name, counting each exact match, else None. """
+        alpha_2 = self.names.get(normalized_name)
+        if (alpha_2 is not None):
+            with self.lock:
+                self.exact_hits += 1
+        return alpha_2
+
+    def resolve(self, country_name: str, stats: dict=None) -> str:
+        """
+        Return the alpha-2 code of the input country name, using an exact match if available,
+        else the closest fuzzy match with a likeness score of at least 90.
+
+        Parameters
+        ==========
+        :country_name: str
+            country name.
+        :stats: dict (default=None)
+            if input, the number of candidate names fuzzy matched is added to its candidates_scored counter.
+
+        Returns
+        =======
+        :alpha_2: str
+            2 letter alpha-2 code of country, None if no matching country found.
+        """
+        normalized_name = normalize_country_name(country_name)
+        alpha_2 = self._lookup(normalized_name)
+        if (alpha_2 is None and normalized_name != ""):
+            self.scoring.candidates_scored = 0
+            alpha_2 = self.fuzzy_match(normalized_name)
+            if (stats is not None):
+                stats["candidates_scored"] = stats.get("candidates_scored", 0) + self.scoring.candidates_scored
+        return alpha_2
+
+    def stats(self) -> dict:
+        """
+        Return the number of exact matches, fuzzy matches served from the LRU cache (hits) and
+        fuzzy matches computed (misses), and the current size of the LRU cache.
+
+        Parameters
+        ==========
+        None
+
+        Returns
+        =======
+        :stats: dict
+            counters of the resolver.
+        """
+        cache_info = self.fuzzy_match.cache_info()
+        return {"exact_hits": self.exact_hits, "fuzzy_cache_hits": cache_info.hits,
+            "fuzzy_cache_misses": cache_info.misses, "fuzzy_cache_size": cache_info.currsize}
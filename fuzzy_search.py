@@ -0,0 +1,145 @@
+from collections import Counter, defaultdict
+from math import ceil, floor, isfinite
+
+#########################################################################################################################
+# Fuzzy search engine used by the /api/name endpoint. A trigram inverted index over all of the choices is built once,
+# and for each query only the choices that could possibly reach the likeness cutoff are scored, using the q-gram lemma:
+# two strings within an edit distance k share at least max(len(a), len(b)) + q - 1 - k*q (padded) q-grams. Every choice
+# scoring at or above the cutoff is returned, unlike thefuzz's process.extract which only returns the top 5.
+#########################################################################################################################
+
+#size of the n-grams (trigrams) and padding character used at the start and end of each string
+NGRAM_SIZE = 3
+NGRAM_PADDING = "\x00" * (NGRAM_SIZE - 1)
+
+def ngrams(string: str) -> Counter:
+    """
+    Return the multiset of padded trigrams of the input string, e.g "abc" ->
+    {"\\x00\\x00a", "\\x00ab", "abc", "bc\\x00", "c\\x00\\x00"}. Padding means strings shorter than
+    3 characters still produce trigrams.
+
+    Parameters
+    ==========
+    :string: str
+        input string.
+
+    Returns
+    =======
+    :ngrams: Counter
+        count of each trigram in the padded input string.
+    """
+    padded = NGRAM_PADDING + string + NGRAM_PADDING
+    return Counter(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+class TrigramIndex():
+    """
+    Trigram inverted index over a collection of choices, used to find every choice whose
+    fuzz.ratio score against a query is at or above a cutoff. Choices and queries are
+    processed using the same default processor as thefuzz (lower case, non alphanumeric
+    characters replaced with whitespace, trimmed) so scores match thefuzz's process.extract.
+
+    Parameters
+    ==========
+    :choices: iterable
+        collection of strings to search through, e.g all normalized subdivision names.
+
+    Methods
+    =======
+    search(query, score_cutoff=0, stats=None):
+        return all choices whose score against the query is at or above the cutoff.
+    """
+    def __init__(self, choices):
+        from rapidfuzz.utils import default_process
+
+        #map each processed choice to the original choices it was processed from
+        self.choices = {}
+        for choice in choices:
+            self.choices.setdefault(default_process(choice), []).append(choice)
+
+        #processed choices, their lengths and the ids of the choices of each length
+        self.keys = list(self.choices)
+        self.lengths = [len(key) for key in self.keys]
+        self.ids_by_length = defaultdict(list)
+        for key_id, length in enumerate(self.lengths):
+            self.ids_by_length[length].append(key_id)
+
+        #inverted index of each trigram to the ids of the choices containing it, repeated for each occurrence
+        self.postings = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram, count in ngrams(key).items():
+                self.postings[gram].extend([key_id] * count)
+
+    def search(self, query: str, score_cutoff: float=0, stats: dict=None) -> list[tuple[str, int]]:
+        """
+        Return every choice whose fuzz.ratio score against the query, rounded to an integer as in
+        thefuzz, is greater than or equal to the score cutoff. Candidate choices are first taken
+        from the trigram index, only these candidates are then scored. Choices with a score of 0
+        are never returned. A ValueError is raised if the score cutoff isn't between 0 and 100.
+
+        Parameters
+        ==========
+        :query: str
+            string to search for.
+        :score_cutoff: float (default=0)
+            minimum likeness score between 0 and 100 of the returned choices.
+        :stats: dict (default=None)
+            if input, the number of candidate choices scored is added to its candidates_scored counter.
+
+        Returns
+        =======
+        :matches: list
+            list of (choice, score) tuples, sorted by score descending then choice.
+        """
+        if not (isfinite(score_cutoff) and 0 <= score_cutoff <= 100):
+            raise ValueError("Score cutoff must be between 0 and 100, got {}.".format(score_cutoff))
+
+        #rapidfuzz is imported on first search rather than with the module, so unpickling an index from the 
+        #dataset snapshot doesn't import it for requests that never search
+        from rapidfuzz import fuzz, process
+        from rapidfuzz.utils import default_process
+
+        query = default_process(query)
+        query_length = len(query)
+        if (query_length == 0):
+            return []
+
+        #scores are rounded to an integer, so a raw score just below the cutoff can still round up to it
+        raw_cutoff = max(ceil(score_cutoff) - 0.5, 0)
+
+        #the ratio can't exceed 2*min(m, n)/(m + n), this bounds the lengths of the candidate choices
+        min_length = ceil(raw_cutoff * query_length / (200 - raw_cutoff)) if raw_cutoff < 200 else query_length
+        max_length = floor(query_length * (200 - raw_cutoff) / raw_cutoff) if raw_cutoff > 0 else max(self.lengths, default=0)
+
+        #min number of trigrams a choice of each length must share with the query to be within the 
+        #max edit distance allowed by the cutoff, a threshold <= 0 means every choice of that length is a candidate
+        min_shared_ngrams = {}
+        for length in range(min_length, max_length + 1):
+            max_distance = floor((query_length + length) * (1 - raw_cutoff / 100))
+            min_shared_ngrams[length] = max(query_length, length) + NGRAM_SIZE - 1 - NGRAM_SIZE * max_distance
+
+        candidates = []
+        for length, threshold in min_shared_ngrams.items():
+            if (threshold <= 0):
+                candidates.extend(self.ids_by_length.get(length, ()))
+
+        #count the trigrams shared between the query and each choice, counting each occurrence in the choice
+        #overestimates the shared multiset, which can only add candidates and so never misses a match
+        if any(threshold > 0 for threshold in min_shared_ngrams.values()):
+            shared_ngrams = Counter()
+            for gram in ngrams(query):
+                shared_ngrams.update(self.postings.get(gram, ()))
+            candidates.extend(key_id for key_id, count in shared_ngrams.items() 
+                if 0 < min_shared_ngrams.get(self.lengths[key_id], 0) <= count)
+
+        if (stats is not None):
+            stats["candidates_scored"] = stats.get("candidates_scored", 0) + len(candidates)
+
+        #score each candidate, keeping those at or above the cutoff once rounded
+        matches = []
+        for key, score, _ in process.extract(query, [self.keys[key_id] for key_id in candidates], scorer=fuzz.ratio,
+                processor=None, score_cutoff=raw_cutoff, limit=None):
+            score = int(round(score))
+            if (score >= score_cutoff and score > 0):
+                matches.extend((choice, score) for choice in self.choices[key])
+
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
@@ -0,0 +1,46 @@
+import gc
+import os
+import sys
+from multiprocessing import cpu_count
+
+#################################################################################################################
+# Gunicorn config for serving the API in production: gunicorn -c gunicorn.conf.py index:app
+#
+# The app, the ISO 3166-2 dataset and all of its derived indexes and serialized responses are loaded once in the 
+# master process, which then forks the workers, so the workers share these memory pages copy-on-write rather than 
+# each loading their own copy. Each worker serves requests using multiple threads.
+#################################################################################################################
+
+#address and port to listen on, the Lambda Web Adapter forwards requests to port 8080
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+#number of worker processes, threads per worker and seconds to keep idle connections alive, configurable via env vars
+workers = int(os.environ.get("GUNICORN_WORKERS", cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+#the /api/batch limits, ISO3166_2_BATCH_MAX_LOOKUPS and ISO3166_2_BATCH_MAX_FUZZY_LOOKUPS, are set so a batch at either 
+#limit finishes well within the timeout, raise the timeout along with them
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+worker_class = "gthread"
+
+#load the app and dataset in the master process before forking the workers
+preload_app = True
+
+accesslog = "-"
+
+def when_ready(server):
+    """
+    Called in the master process after the app has been preloaded, before the workers are forked. 
+    Build all of the cached serialized responses so they are shared with every worker, then move 
+    all objects into the permanent generation so the garbage collector doesn't write to, and so 
+    copy, their pages in each worker.
+    """
+    sys.modules["index"].warm_caches()
+    gc.freeze()
+
+def post_fork(server, worker):
+    """
+    Called in each worker process after it's forked. Start the worker's snapshot watcher, if its 
+    interval is set, so every worker hot reloads the dataset once the snapshot changes.
+    """
+    sys.modules["index"].start_snapshot_watcher()
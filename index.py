@@ -1,10 +1,85 @@
-from flask import Flask, request, render_template, jsonify
-from urllib.parse import unquote_plus
-import iso3166
-from iso3166_2 import *
-import re
-from thefuzz import fuzz, process
-from unidecode import unidecode
+import time
+from contextlib import contextmanager
+
+#time taken in ms to import each of the app's dependencies, included in the startup diagnostics, similar to -X importtime
+import_times = {}
+
+@contextmanager
+def import_timer(module_name: str):
+    """ Record the time taken in ms to import the module(s) within the context in the import times. """
+    start = time.perf_counter()
+    yield
+    import_times[module_name] = round((time.perf_counter() - start) * 1000, 3)
+
+with import_timer("stdlib"):
+    from urllib.parse import unquote_plus
+    from bisect import bisect_left
+    from heapq import nsmallest
+    from types import MappingProxyType
+    from typing import NamedTuple
+    from functools import lru_cache, partial, wraps
+    from importlib import import_module
+    from importlib.util import find_spec
+    from itertools import count
+    import codecs
+    import copyreg
+    import csv
+    import gc
+    import gzip
+    import hashlib
+    import hmac
+    import io
+    import mmap
+    import os
+    import pickle
+    import re
+    import sys
+    import threading
+with import_timer("flask"):
+    from flask import Flask, request, render_template, jsonify, Response, stream_with_context, g, has_app_context, has_request_context
+with import_timer("iso3166"):
+    import iso3166
+with import_timer("fuzzy_search"):
+    from fuzzy_search import TrigramIndex
+    from country_names import CountryNameResolver
+    from result_cache import ResultCache
+with import_timer("spatial_index"):
+    from spatial_index import KDTree, EARTH_RADIUS_KM
+with import_timer("metrics"):
+    from metrics import MetricsRegistry
+    from profiler import RequestProfiler
+with import_timer("brotli"):
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+#time taken in ms to import each dependency only imported on first use, see lazy_import
+lazy_import_times = {}
+
+def lazy_import(module_name: str):
+    """
+    Import and return a module on first use rather than when the app is imported, recording 
+    how long its first import took. The fuzzy matching (rapidfuzz) and transliteration (unidecode) 
+    libraries are only used by the name endpoints, so a cold start only serving code lookups, 
+    e.g /api/alpha/DE, never pays for importing them.
+
+    Parameters
+    ==========
+    :module_name: str
+        name of module to import.
+
+    Returns
+    =======
+    :module: module
+        imported module.
+    """
+    module = sys.modules.get(module_name)
+    if (module is None):
+        start = time.perf_counter()
+        module = import_module(module_name)
+        lazy_import_times.setdefault(module_name, round((time.perf_counter() - start) * 1000, 3))
+    return module
 
 ########################################################### Endpoints ###########################################################
 
@@ -14,24 +89,1854 @@ from unidecode import unidecode
 # /api/subdivision/<input_subdivision> - return subdivision data for input subdivision using its subdivision code             
 # /api/name/<input_subdivision_name> - return all subdivision data for input subdivision using its subdivision name    
 # /api/country_name/<input_country_name> - return all subdivision data for input country using its country name                        
+# /api/hierarchy/<input_subdivision> - return the children, descendants or ancestors of input subdivision using its subdivision code
+# /api/nearest?lat=<lat>&lng=<lng> - return the subdivisions nearest to the input coordinates, optionally within a country and radius
+# /api/nearest - POST a JSON object of lat and lng arrays, stream the nearest subdivision to each coordinate as NDJSON
+# /api/autocomplete?q=<input_prefix> - return the ranked subdivisions whose name or localName, or a word in it, starts with the input prefix
+# /api/batch - POST a JSON array of typed lookups (alpha, subdivision, name, country_name), return the result of each in input order
+# /api/enrich - POST a CSV file, stream it back with the subdivision code/name in its chosen column annotated with its ISO 3166-2 data
+# /api/admin/reload - POST to hot reload the dataset in the background, GET the status of the latest reload, requires the admin token
+# /metrics - return the request counts, latency, response size and fuzzy matching histograms and cache statistics in the Prometheus text format
+# /api/profiles - return the latest requests profiled via the X-Profile-Token header, /api/profiles/<id> downloads a profile's pstats file
 
 #################################################################################################################################
 
 #initialise Flask app
 app = Flask(__name__)
 
-#register routes/endpoints with or without trailing slash
-app.url_map.strict_slashes = False
+#register routes/endpoints with or without trailing slash
+app.url_map.strict_slashes = False
+
+#metrics of every request served, exported by the '/metrics' endpoint
+metrics = MetricsRegistry()
+
+#endpoints that fuzzy match names, whose number of fuzzy matching candidates scored per request is observed
+FUZZY_MATCH_ENDPOINTS = ("api_subdivision_name", "api_country_name", "api_batch")
+
+@app.before_request
+def start_request_timer() -> None:
+    """ Record the start time of the current request, used to observe its latency once served. """
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def observe_request(response: Response) -> Response:
+    """
+    Record the metrics of the current request once its response is ready: its endpoint, method 
+    and status code, its latency and response size, unless streamed, and for the endpoints that 
+    fuzzy match names, the number of candidates scored. Recorded into the current thread's own 
+    counters, so no lock is taken.
+
+    Parameters
+    ==========
+    :response: flask.Response
+        response of the current request.
+
+    Returns
+    =======
+    :response: flask.Response
+        the unchanged response.
+    """
+    endpoint = request.endpoint or "not_found"
+    candidates_scored = g.get("fuzzy_stats", {}).get("candidates_scored", 0) if endpoint in FUZZY_MATCH_ENDPOINTS else None
+    metrics.observe_request(endpoint, request.method, response.status_code, time.perf_counter() - g.get("request_start", time.perf_counter()),
+        None if response.is_streamed else response.content_length, candidates_scored)
+    return response
+
+def fuzzy_stats() -> dict:
+    """ Return the fuzzy matching counters of the current request, added to by each fuzzy search, None outside of a request. """
+    if not (has_request_context()):
+        return None
+    if ("fuzzy_stats" not in g):
+        g.fuzzy_stats = {"candidates_scored": 0}
+    return g.fuzzy_stats
+
+#secret token opting a request into profiling, sent in its X-Profile-Token header, profiling is disabled if it isn't set
+profile_token = os.environ.get("ISO3166_2_PROFILE_TOKEN")
+
+#profiles of the most recently profiled requests, downloadable from the '/api/profiles' endpoint
+profiler = RequestProfiler(history=int(os.environ.get("ISO3166_2_PROFILE_HISTORY", 20)))
+
+def valid_profile_token() -> bool:
+    """ Return whether profiling is enabled and the current request has the profile token in its X-Profile-Token header. """
+    return bool(profile_token) and hmac.compare_digest(request.headers.get("X-Profile-Token", "").encode("utf-8"), profile_token.encode("utf-8"))
+
+@app.before_request
+def start_profile() -> None:
+    """ Start profiling the current request if it has the profile token, other than requests for the profiles themselves. """
+    if (profile_token and request.endpoint not in ("api_profiles", "api_profile") and valid_profile_token()):
+        g.profile = profiler.start()
+
+@app.after_request
+def finish_profile(response: Response) -> Response:
+    """
+    Stop profiling the current request, if profiled, keeping its profile and adding the duration 
+    of each of its phases to the Server-Timing header of the response, along with the id of its 
+    profile in the X-Profile-Id header. Streamed responses are only profiled until their first chunk.
+
+    Parameters
+    ==========
+    :response: flask.Response
+        response of the current request.
+
+    Returns
+    =======
+    :response: flask.Response
+        response with the Server-Timing and X-Profile-Id headers if profiled.
+    """
+    profile = g.pop("profile", None)
+    if (profile is not None):
+        summary = profiler.finish(profile, request.method, request.full_path.rstrip("?"), request.endpoint or "not_found", response.status_code)
+        response.headers["Server-Timing"] = profile.server_timing()
+        response.headers["X-Profile-Id"] = str(summary["id"])
+    return response
+
+@app.teardown_request
+def stop_profile(exception=None) -> None:
+    """ Stop profiling the current request if it failed before its response was finished, releasing the profiler for other requests. """
+    profile = g.pop("profile", None)
+    if (profile is not None):
+        profile.stop()
+
+def profile_phase(phase: str) -> None:
+    """ End the current phase, parse, resolve or serialize, of the current request if it's being profiled, else do nothing. """
+    if (profile_token and has_request_context()):
+        profile = g.get("profile")
+        if (profile is not None):
+            profile.mark(phase)
+
+class ErrorMessage(NamedTuple):
+    """ Immutable error message returned by the API, storing the error message, route and status code. """
+    message: str
+    path: str
+    status: int = 400
+
+def error_response(message: str, path: str=None, status: int=400) -> tuple[dict, int]:
+    """
+    Return a jsonified error message for the current request. A new error message is created 
+    per request, rather than sharing a mutable object between requests, so concurrent requests 
+    served by multiple threads can't overwrite each other's message or path.
+
+    Parameters
+    ==========
+    :message: str
+        error message.
+    :path: str (default=None)
+        url of the request, defaults to the current request's base url.
+    :status: int (default=400)
+        response status code.
+
+    Returns
+    =======
+    :error_message: json
+        jsonified error message, route and status code.
+    :status_code: int
+        response status code.
+    """
+    error_message = ErrorMessage(message, request.base_url if path is None else path, status)
+    return jsonify(error_message._asdict()), status
+
+#regex for validating the format of an input subdivision code, e.g XX-Y, XX-YY or XX-YYY
+subdivision_code_regex = re.compile(r"^[A-Z]{2}-[A-Z0-9]{1,3}$")
+
+def build_subdivision_code_index(all_iso3166_2: dict) -> tuple[MappingProxyType, MappingProxyType]:
+    """
+    Build the read-only lookup indexes used by the '/api/subdivision' endpoint. The first maps
+    each subdivision code to a tuple of its country's alpha-2 code and its subdivision data
+    object, the second maps each country's alpha-2 code to the set of its subdivision codes.
+    Both are built once at startup so each input code can be validated and retrieved in
+    constant time, rather than rebuilding a list of all ~5,000 codes on every request.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+
+    Returns
+    =======
+    :subdivision_codes: MappingProxyType
+        read-only mapping of subdivision code to (alpha-2 code, subdivision data).
+    :country_subdivision_codes: MappingProxyType
+        read-only mapping of alpha-2 code to the frozenset of its subdivision codes.
+    """
+    subdivision_codes = {}
+    country_subdivision_codes = {}
+
+    #iterate over each country and its subdivisions, mapping each subdivision code to its country and data
+    for alpha_2 in all_iso3166_2:
+        for subd in all_iso3166_2[alpha_2]:
+            subdivision_codes[subd] = (alpha_2, all_iso3166_2[alpha_2][subd])
+        country_subdivision_codes[alpha_2] = frozenset(all_iso3166_2[alpha_2])
+
+    return MappingProxyType(subdivision_codes), MappingProxyType(country_subdivision_codes)
+
+def build_country_code_index() -> MappingProxyType:
+    """
+    Build a read-only lookup table mapping every ISO 3166-1 alpha-2, alpha-3 and numeric 
+    country code to its alpha-2 code, so any input country code is resolved using a 
+    single lookup. Numeric codes are mapped with and without their leading zeros, e.g 
+    "4", "04" and "004" are all mapped to "AF".
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :country_codes: MappingProxyType
+        mapping of each alpha-2, alpha-3 and numeric country code to its alpha-2 code.
+    """
+    country_codes = {}
+    for country in iso3166.countries:
+        country_codes[country.alpha2] = country.alpha2
+        country_codes[country.alpha3] = country.alpha2
+        numeric = country.numeric.lstrip("0")
+        for width in range(len(numeric), len(country.numeric) + 1):
+            country_codes[numeric.zfill(width)] = country.alpha2
+
+    return MappingProxyType(country_codes)
+
+def normalize_subdivision_name(subdivision_name: str) -> str:
+    """
+    Normalize a subdivision name for searching, decoding any unicode or accent characters, 
+    lower casing and removing all whitespace, e.g "São Paulo" -> "saopaulo".
+
+    Parameters
+    ==========
+    :subdivision_name: str
+        subdivision name.
+
+    Returns
+    =======
+    :normalized_name: str
+        normalized subdivision name.
+    """
+    return lazy_import("unidecode").unidecode(subdivision_name.lower().replace(' ', ''))
+
+def build_subdivision_name_index(all_iso3166_2: dict) -> tuple[MappingProxyType, tuple, tuple]:
+    """
+    Build the read-only lookup indexes used by the '/api/name' endpoint. Each subdivision name 
+    is normalized once at startup and mapped to the alpha-2 code and subdivision code of every 
+    subdivision sharing that name (e.g Saint George), so only the input names need to be 
+    normalized per request.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+
+    Returns
+    =======
+    :subdivision_name_index: MappingProxyType
+        read-only mapping of normalized subdivision name to a tuple of (alpha-2 code, subdivision code).
+    :subdivision_names_list: tuple
+        all unique normalized subdivision names, used as the search space for the fuzzy search.
+    :subdivision_name_comma_exceptions: tuple
+        sorted normalized subdivision names that contain a comma, required if multiple subdivision 
+        names are input e.g - Murcia, Regiónde, Newry, Mourne and Down.
+    """
+    subdivision_name_index = {}
+
+    #iterate over all subdivisions, appending each subdivision's alpha-2 code and subdivision code to its normalized name
+    for alpha_2 in all_iso3166_2:
+        for subd in all_iso3166_2[alpha_2]:
+            subdivision_name_index.setdefault(normalize_subdivision_name(all_iso3166_2[alpha_2][subd]["name"]), []).append((alpha_2, subd))
+
+    #names with a comma in them are kept separately as they can't be split on the input's comma separator
+    subdivision_name_comma_exceptions = tuple(sorted(name for name in subdivision_name_index if ',' in name))
+
+    return MappingProxyType({name: tuple(codes) for name, codes in subdivision_name_index.items()}), \
+        tuple(subdivision_name_index), subdivision_name_comma_exceptions
+
+def normalize_autocomplete_text(text: str) -> str:
+    """
+    Normalize a subdivision name or autocomplete query for prefix matching, decoding any unicode 
+    or accent characters, lower casing, replacing all non alphanumeric characters with whitespace 
+    and collapsing repeated whitespace, e.g "Baden-Württemberg" -> "baden wurttemberg".
+
+    Parameters
+    ==========
+    :text: str
+        subdivision name or query.
+
+    Returns
+    =======
+    :normalized_text: str
+        normalized text.
+    """
+    return " ".join("".join(char if char.isalnum() else " " for char in lazy_import("unidecode").unidecode(text).lower()).split())
+
+def build_subdivision_autocomplete_index(all_iso3166_2: dict) -> tuple[tuple, tuple]:
+    """
+    Build the sorted arrays used by the '/api/autocomplete' endpoint. The normalized name and 
+    localName of each subdivision, along with each of their suffixes starting at a word, e.g 
+    "north yorkshire" and "yorkshire", are sorted, so all completions of a prefix are found using 
+    a binary search followed by a scan of the adjacent entries.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+
+    Returns
+    =======
+    :autocomplete_keys: tuple
+        sorted normalized names, localNames and their word suffixes.
+    :autocomplete_entries: tuple
+        (whether the key is a word suffix, original name or localName, subdivision code) of each key.
+    """
+    entries = set()
+
+    #iterate over all subdivisions, adding their normalized name and localName, and each of their word suffixes
+    for alpha_2 in all_iso3166_2:
+        for subd, subdivision in all_iso3166_2[alpha_2].items():
+            for value in {subdivision.get("name"), subdivision.get("localName")} - {None, ""}:
+                words = normalize_autocomplete_text(value).split()
+                for start in range(len(words)):
+                    entries.add((" ".join(words[start:]), start > 0, value, subd))
+
+    entries = sorted(entries)
+    return tuple(entry[0] for entry in entries), tuple(entry[1:] for entry in entries)
+
+#subdivision attributes that can be filtered on using the filter query string parameter, and those that can also be prefix matched
+FILTER_ATTRIBUTES = ("localName", "name", "parentCode", "type")
+PREFIX_FILTER_ATTRIBUTES = ("localName", "name")
+
+def build_subdivision_filter_index(all_iso3166_2: dict) -> tuple[MappingProxyType, MappingProxyType]:
+    """
+    Build the read-only inverted indexes used by the filter query string parameter. The first 
+    maps each filterable attribute to each of its case folded values and the codes of all 
+    subdivisions with that value, a subdivision without a value, e.g no parentCode, is mapped 
+    to the empty string. The second maps each prefix filterable attribute to its sorted unique 
+    values, so all values starting with a prefix are found using a binary search.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+
+    Returns
+    =======
+    :subdivision_filter_index: MappingProxyType
+        read-only mapping of each attribute to a mapping of its case folded values to a frozenset of subdivision codes.
+    :subdivision_prefix_index: MappingProxyType
+        read-only mapping of each prefix filterable attribute to a sorted tuple of its case folded values.
+    """
+    subdivision_filter_index = {attribute: {} for attribute in FILTER_ATTRIBUTES}
+
+    #iterate over all subdivisions, adding each subdivision's code to the set of each of its attribute's values
+    for alpha_2 in all_iso3166_2:
+        for subd, subdivision in all_iso3166_2[alpha_2].items():
+            for attribute in FILTER_ATTRIBUTES:
+                subdivision_filter_index[attribute].setdefault((subdivision.get(attribute) or "").casefold(), set()).add(subd)
+
+    subdivision_filter_index = MappingProxyType({attribute: MappingProxyType({value: frozenset(codes) for value, codes in values.items()}) 
+        for attribute, values in subdivision_filter_index.items()})
+    return subdivision_filter_index, \
+        MappingProxyType({attribute: tuple(sorted(subdivision_filter_index[attribute])) for attribute in PREFIX_FILTER_ATTRIBUTES})
+
+def build_subdivision_hierarchy_index(all_iso3166_2: dict, subdivision_codes: MappingProxyType) -> tuple[MappingProxyType, MappingProxyType]:
+    """
+    Build the read-only adjacency indexes of the subdivision hierarchy used by the '/api/hierarchy' 
+    endpoint. The first maps each subdivision code to its parent's code, the second maps each 
+    parent subdivision code to the sorted tuple of its children's codes, so a branch can be walked 
+    in either direction without scanning its country. A parentCode that isn't the code of another 
+    subdivision, e.g a malformed or list of codes in the source data, is ignored.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+    :subdivision_codes: MappingProxyType
+        read-only mapping of subdivision code to (alpha-2 code, subdivision data).
+
+    Returns
+    =======
+    :subdivision_parents: MappingProxyType
+        read-only mapping of subdivision code to its parent's subdivision code.
+    :subdivision_children: MappingProxyType
+        read-only mapping of parent subdivision code to the sorted tuple of its children's codes.
+    """
+    subdivision_parents = {}
+    subdivision_children = {}
+
+    #iterate over all subdivisions, adding each subdivision with a valid parent to its parent's children
+    for alpha_2 in all_iso3166_2:
+        for subd, subdivision in all_iso3166_2[alpha_2].items():
+            parent_code = (subdivision.get("parentCode") or "").strip().upper()
+            if (parent_code in subdivision_codes and parent_code != subd):
+                subdivision_parents[subd] = parent_code
+                subdivision_children.setdefault(parent_code, []).append(subd)
+
+    return MappingProxyType(subdivision_parents), \
+        MappingProxyType({parent_code: tuple(sorted(children)) for parent_code, children in subdivision_children.items()})
+
+def build_subdivision_spatial_index(all_iso3166_2: dict) -> tuple[KDTree, MappingProxyType]:
+    """
+    Build the k-d tree spatial indexes over the latLng coordinates of all subdivisions, used by 
+    the '/api/nearest' endpoint. The first is over all subdivisions, the second maps each 
+    country's alpha-2 code to a k-d tree over just its subdivisions, so a query restricted to a 
+    country only searches its own subdivisions. Subdivisions without coordinates are excluded.
+
+    Parameters
+    ==========
+    :all_iso3166_2: dict
+        all ISO 3166-2 subdivision data for all countries, as exported by the iso3166-2 package.
+
+    Returns
+    =======
+    :subdivision_spatial_index: KDTree
+        k-d tree over the coordinates of all subdivisions, keyed by subdivision code.
+    :country_spatial_index: MappingProxyType
+        read-only mapping of alpha-2 code to the k-d tree over the coordinates of its subdivisions.
+    """
+    country_points = {alpha_2: [(subd, subdivision["latLng"][0], subdivision["latLng"][1]) for subd, subdivision in all_iso3166_2[alpha_2].items() 
+        if subdivision.get("latLng") and len(subdivision["latLng"]) == 2] for alpha_2 in all_iso3166_2}
+
+    return KDTree(point for points in country_points.values() for point in points), \
+        MappingProxyType({alpha_2: KDTree(points) for alpha_2, points in country_points.items()})
+
+#path to the build-time snapshot of the dataset and its lookup indexes, created by build_snapshot.py
+snapshot_path = os.environ.get("ISO3166_2_SNAPSHOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "iso3166-2-snapshot.pickle"))
+
+#version of the snapshot's format, must be incremented whenever the contents of the dataset object change
+SNAPSHOT_FORMAT = 6
+
+def mapping_proxy(mapping: dict) -> MappingProxyType:
+    """ Return a read-only mapping proxy of the input dict, used to unpickle the lookup indexes from the snapshot. """
+    return MappingProxyType(mapping)
+
+#allow the read-only mapping proxies of the lookup indexes to be pickled in the snapshot
+copyreg.pickle(MappingProxyType, lambda mapping: (mapping_proxy, (dict(mapping),)))
+
+def dataset_source_path() -> str:
+    """ Return the path to the iso3166-2 package's data file, found without importing the package. """
+    return os.path.join(os.path.dirname(find_spec("iso3166_2").origin), "iso3166-2.json")
+
+def dataset_source_stamp() -> str:
+    """
+    Return a hash of the contents of the iso3166-2 package's data file, used to check a snapshot 
+    was built from the currently installed data without importing the package. The contents are 
+    hashed, rather than using the file's modification time, so a snapshot shipped with the app, 
+    e.g on Vercel, is still used after a fresh install of the same data.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :stamp: str
+        SHA-256 hex digest of the iso3166-2 data file.
+    """
+    with open(dataset_source_path(), "rb") as iso3166_2_data_file:
+        return hashlib.sha256(iso3166_2_data_file.read()).hexdigest()
+
+def build_dataset() -> dict:
+    """
+    Load all subdivision data from the iso3166-2 package and build all of its derived lookup 
+    indexes.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :dataset: dict
+        the dataset's version, all ISO 3166-2 subdivision data and each of its lookup indexes.
+    """
+    from iso3166_2 import ISO3166_2
+
+    #get all subdivision data from the ISO 3166-2 package
+    iso3166_2_instance = ISO3166_2()
+    all_iso3166_2 = iso3166_2_instance.all
+
+    #index of all subdivision codes and their data, as well as the subdivision codes per country
+    subdivision_codes, country_subdivision_codes = build_subdivision_code_index(all_iso3166_2)
+
+    #index of all normalized subdivision names and their subdivision codes, as well as the search space for the fuzzy search
+    subdivision_name_index, subdivision_names_list, subdivision_name_comma_exceptions = build_subdivision_name_index(all_iso3166_2)
+
+    #inverted indexes of the filterable attributes' values to their subdivision codes, used by the filter query string parameter
+    subdivision_filter_index, subdivision_prefix_index = build_subdivision_filter_index(all_iso3166_2)
+
+    #adjacency indexes of each subdivision's parent and each parent's children, used by the '/api/hierarchy' endpoint
+    subdivision_parents, subdivision_children = build_subdivision_hierarchy_index(all_iso3166_2, subdivision_codes)
+
+    #k-d trees over the coordinates of all subdivisions and of each country's subdivisions, used by the '/api/nearest' endpoint
+    subdivision_spatial_index, country_spatial_index = build_subdivision_spatial_index(all_iso3166_2)
+
+    #sorted normalized subdivision names and localNames, and their word suffixes, used by the '/api/autocomplete' endpoint
+    autocomplete_keys, autocomplete_entries = build_subdivision_autocomplete_index(all_iso3166_2)
+
+    return {
+        "version": iso3166_2_instance.__version__,
+        "all_iso3166_2": all_iso3166_2,
+        "subdivision_codes": subdivision_codes,
+        "country_subdivision_codes": country_subdivision_codes,
+        #sorted list of all subdivision data attributes, which can be projected using the fields query string parameter
+        "subdivision_attributes": sorted({attribute for country in all_iso3166_2.values() for subd in country.values() for attribute in subd}),
+        "subdivision_name_index": subdivision_name_index,
+        "subdivision_names_list": subdivision_names_list,
+        "subdivision_name_comma_exceptions": subdivision_name_comma_exceptions,
+        #trigram index over all normalized subdivision names, used for the fuzzy search of subdivision names
+        "subdivision_name_search": TrigramIndex(subdivision_names_list),
+        "subdivision_filter_index": subdivision_filter_index,
+        "subdivision_prefix_index": subdivision_prefix_index,
+        "subdivision_parents": subdivision_parents,
+        "subdivision_children": subdivision_children,
+        "subdivision_spatial_index": subdivision_spatial_index,
+        "country_spatial_index": country_spatial_index,
+        "autocomplete_keys": autocomplete_keys,
+        "autocomplete_entries": autocomplete_entries,
+    }
+
+def save_snapshot(dataset: dict, path: str=snapshot_path) -> None:
+    """
+    Save the dataset and its lookup indexes to a single compact snapshot file, along with the 
+    snapshot format and the stamp of the iso3166-2 data file it was built from. Used at build 
+    time so the API can load everything in one read at startup.
+
+    Parameters
+    ==========
+    :dataset: dict
+        the dataset and its lookup indexes, as returned by build_dataset().
+    :path: str (default=snapshot_path)
+        path to the output snapshot file.
+
+    Returns
+    =======
+    None
+    """
+    #write to a temporary file and rename it, so a partially written snapshot is never loaded
+    with open(path + ".tmp", "wb") as snapshot_file:
+        pickle.dump({"format": SNAPSHOT_FORMAT, "source_stamp": dataset_source_stamp(), "dataset": dataset}, 
+            snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+def load_snapshot(path: str=snapshot_path, pause_gc: bool=False) -> dict:
+    """
+    Load the dataset and its lookup indexes from the snapshot file, which is memory-mapped and 
+    unpickled in one pass. If the snapshot doesn't exist, is in an old format or was built from 
+    a different version of the iso3166-2 data then None is returned. Garbage collection can be 
+    paused while unpickling, which is only done at startup, before any requests are served, as 
+    pausing it is process wide and would also pause it for the requests served while reloading.
+
+    Parameters
+    ==========
+    :path: str (default=snapshot_path)
+        path to the snapshot file.
+    :pause_gc: bool (default=False)
+        pause garbage collection while unpickling, as it would otherwise repeatedly scan the many new objects.
+
+    Returns
+    =======
+    :dataset: dict
+        the dataset and its lookup indexes, or None if the snapshot can't be used.
+    """
+    if not (os.path.isfile(path)):
+        return None
+
+    #snapshot is a trusted build artifact created by build_snapshot.py, return None if it can't be read, 
+    #e.g if it was pickled using an incompatible version of numpy
+    #garbage collection is only re-enabled afterwards if it was enabled beforehand
+    gc_paused = pause_gc and gc.isenabled()
+    if (gc_paused):
+        gc.disable()
+    try:
+        with open(path, "rb") as snapshot_file, mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as snapshot:
+            snapshot = pickle.loads(snapshot) # nosec B301
+    except (OSError, ValueError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+        return None
+    finally:
+        if (gc_paused):
+            gc.enable()
+
+    if (snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("source_stamp") != dataset_source_stamp()):
+        return None
+    return snapshot["dataset"]
+
+#lookup table of each ISO 3166-1 alpha-2, alpha-3 and numeric country code to its alpha-2 code, built from the iso3166 
+#package rather than stored in the snapshot as it doesn't depend on the iso3166-2 data
+country_codes = build_country_code_index()
+
+@lru_cache(None)
+def country_name_resolver() -> CountryNameResolver:
+    """
+    Return the resolver of country names to their alpha-2 code, built on the first request to the 
+    '/api/country_name' endpoint, as normalizing the country names imports the transliteration library.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :resolver: CountryNameResolver
+        country name resolver, built from the iso3166 package's countries.
+    """
+    return CountryNameResolver(iso3166.countries)
+
+class Dataset():
+    """
+    Immutable version of all subdivision data, its lookup indexes and the caches derived from it.
+    Requests read all data through the dataset pinned at their start, so a dataset hot reloaded 
+    while a request is in flight, see reload_dataset, never changes the data that request reads.
+    Each dataset has its own caches, which are warmed before it's swapped in and are released 
+    along with it once no request is still using it.
+
+    Parameters
+    ==========
+    :dataset: dict
+        the dataset's version, all ISO 3166-2 subdivision data and each of its lookup indexes, as
+        returned by build_dataset() or load_snapshot().
+    :source: str
+        where the dataset was loaded from, snapshot or iso3166-2.
+    """
+    #reload generation of each dataset, increasing with each dataset loaded by the process
+    generations = count()
+
+    __slots__ = ("version", "all_iso3166_2", "subdivision_codes", "country_subdivision_codes", "subdivision_attributes", 
+        "subdivision_name_index", "subdivision_names_list", "subdivision_name_comma_exceptions", "subdivision_name_search", 
+        "subdivision_filter_index", "subdivision_prefix_index", "subdivision_parents", "subdivision_children", 
+        "subdivision_spatial_index", "country_spatial_index", "autocomplete_keys", "autocomplete_entries", "source", "generation", "caches")
+
+    def __init__(self, dataset: dict, source: str):
+        for attribute in self.__slots__[:-3]:
+            object.__setattr__(self, attribute, dataset[attribute])
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "generation", next(self.generations))
+        object.__setattr__(self, "caches", {})
+
+    def __setattr__(self, attribute: str, value) -> None:
+        raise AttributeError(f"Dataset is immutable, cannot set attribute: {attribute}.")
+
+def dataset_cache(maxsize: int=128):
+    """
+    Decorator memoizing a function of a dataset, its first argument, in an LRU cache of up to the 
+    input max size stored on that dataset rather than shared by all datasets, so a reloaded 
+    dataset's cache is warmed without evicting the current dataset's and is released along with it.
+
+    Parameters
+    ==========
+    :maxsize: int (default=128)
+        max number of cached results per dataset, None for no limit.
+
+    Returns
+    =======
+    :decorator: function
+        decorator of the function to memoize.
+    """
+    def decorator(function):
+        @wraps(function)
+        def cached_function(dataset: Dataset, *args, **kwargs):
+            cache = dataset.caches.get(function.__name__)
+            if (cache is None):
+                cache = dataset.caches.setdefault(function.__name__, lru_cache(maxsize)(partial(function, dataset)))
+            return cache(*args, **kwargs)
+        return cached_function
+    return decorator
+
+#get all subdivision data and its lookup indexes, from the build-time snapshot if available, else from the iso3166-2 package
+dataset_load_start = time.perf_counter()
+dataset = load_snapshot(pause_gc=True)
+startup_diagnostics = {"dataset_source": "iso3166-2" if dataset is None else "snapshot", "import_ms": import_times, 
+    "lazy_import_ms": lazy_import_times}
+if (dataset is None):
+    dataset = build_dataset()
+startup_diagnostics["dataset_load_ms"] = round((time.perf_counter() - dataset_load_start) * 1000, 3)
+
+#dataset used by new requests, only ever replaced by a single reference assignment in reload_dataset
+current_dataset = Dataset(dataset, startup_diagnostics["dataset_source"])
+del dataset
+
+def active_dataset() -> Dataset:
+    """
+    Return the dataset used by the current request, pinning the current dataset to the request 
+    on its first use, so every read made while serving a request, including by any streamed 
+    response, is from the same version of the data even if the dataset is reloaded meanwhile. 
+    Outside of a request the current dataset is returned.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :dataset: Dataset
+        dataset used by the current request.
+    """
+    if not (has_app_context()):
+        return current_dataset
+    if ("dataset" not in g):
+        g.dataset = current_dataset
+    return g.dataset
+
+def __getattr__(name: str):
+    """ Return the attributes of the current dataset as module attributes, e.g index.all_iso3166_2. """
+    if (name == "iso3166_2_version"):
+        return current_dataset.version
+    if (name in Dataset.__slots__):
+        return getattr(current_dataset, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+#LRU cache of the codes of the subdivisions matching repeated '/api/name' queries, keyed by the normalized names and likeness, 
+#its max number of entries and time to live in seconds can be set using environment variables, a size of 0 disables it
+subdivision_name_cache = ResultCache(maxsize=int(os.environ.get("ISO3166_2_NAME_CACHE_SIZE", 1024)), 
+    ttl=float(os.environ.get("ISO3166_2_NAME_CACHE_TTL", 3600)))
+
+def serialize_json(obj, sort_keys: bool=True) -> bytes:
+    """
+    Serialize object to the same compact JSON bytes as Flask's jsonify, with sorted keys.
+
+    Parameters
+    ==========
+    :obj: dict/list
+        object to serialize.
+    :sort_keys: bool (default=True)
+        sort the keys of each object, else keep their insertion order, e.g to keep results ranked.
+
+    Returns
+    =======
+    :body: bytes
+        utf-8 encoded JSON, terminated by a newline.
+    """
+    return (app.json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys) + "\n").encode("utf-8")
+
+class SerializedResponse():
+    """
+    JSON response body that is serialized once, along with its gzip and brotli compressed variants
+    and a strong ETag per variant derived from a hash of the body. The compressed variants are 
+    created on their first request, using the highest compression levels if the body is 
+    precompressed ahead of requests, e.g by warm_caches, else faster levels, so a client isn't 
+    kept waiting on the slowest compression of a body first requested on demand. Each response is served using the encoding negotiated from the 
+    request's Accept-Encoding header, a 406 is returned if it refuses every supported encoding, 
+    and a request whose If-None-Match header matches the body's ETag is returned a 304 with no body.
+
+    Parameters
+    ==========
+    :body: bytes
+        serialized JSON response body.
+    :precompressed: bool (default=False)
+        whether the body's compressed variants are created ahead of requests, compressing them 
+        using the highest compression levels rather than the faster on request levels.
+
+    Methods
+    =======
+    negotiate():
+        return the best content encoding accepted by the current request.
+    encoded(encoding):
+        return the body compressed using the input content encoding.
+    response():
+        return a Flask response of the body for the current request.
+    """
+    #supported content encodings, in order of preference, and their compression functions of the body and compression level
+    compressors = {"br": lambda body, level: brotli.compress(body, quality=level), "gzip": lambda body, level: gzip.compress(body, level, mtime=0)}
+    if (brotli is None):
+        del compressors["br"]
+
+    #compression levels of each encoding of precompressed bodies, and of bodies compressed on request, which compress
+    #the full /api/all body ~3x faster (e.g brotli ~16ms vs ~72ms) for a body only a few % larger
+    precompressed_levels = {"br": 9, "gzip": 9}
+    on_request_levels = {"br": 5, "gzip": 6}
+
+    def __init__(self, body: bytes, precompressed: bool=False):
+        self.body = body
+        self.levels = self.precompressed_levels if precompressed else self.on_request_levels
+        self.content_hash = hashlib.sha256(body).hexdigest()
+        self.encodings = {"identity": body}
+        self.lock = threading.Lock()
+
+    def etag(self, encoding: str) -> str:
+        """ Return the strong ETag of the body in the input content encoding. """
+        return self.content_hash if (encoding == "identity") else f"{self.content_hash}-{encoding}"
+
+    def negotiate(self) -> str:
+        """
+        Return the best content encoding accepted by the current request's Accept-Encoding header, 
+        preferring the compressed encodings. The uncompressed identity encoding is acceptable unless
+        it's refused with a quality of 0, either explicitly or via a * wildcard with no identity entry.
+
+        Parameters
+        ==========
+        None
+
+        Returns
+        =======
+        :encoding: str
+            negotiated content encoding, None if no supported encoding is acceptable.
+        """
+        accept_encodings = request.accept_encodings
+        encoding = accept_encodings.best_match(list(self.compressors))
+        if (encoding is not None):
+            return encoding
+
+        #identity is only refused with a quality of 0, an absent header or entry accepts it
+        identity_quality = next((quality for value, quality in accept_encodings if value.lower() == "identity"), 
+            next((quality for value, quality in accept_encodings if value == "*"), 1))
+        return "identity" if (identity_quality > 0) else None
+
+    def encoded(self, encoding: str) -> bytes:
+        """ Return the body compressed using the input content encoding, compressing it on first use. """
+        if (encoding not in self.encodings):
+            with self.lock:
+                if (encoding not in self.encodings):
+                    self.encodings[encoding] = self.compressors[encoding](self.body, self.levels[encoding])
+        return self.encodings[encoding]
+
+    def response(self) -> Response:
+        """
+        Return a Flask response of the serialized body for the current request, using the best
+        content encoding accepted by the client. If the client already has this version of the 
+        body, according to its If-None-Match header, then a 304 Not Modified is returned.
+
+        Parameters
+        ==========
+        None
+
+        Returns
+        =======
+        :response: flask.Response
+            response with the encoded body, an empty 304 response, or an error message
+            with status code 406 if no supported encoding is acceptable.
+        """
+        encoding = self.negotiate()
+        if (encoding is None):
+            return error_response("None of the content encodings accepted by the Accept-Encoding header are supported, "
+                "supported encodings: {}.".format(", ".join(["identity", *self.compressors])), status=406)
+
+        #return 304 if the client's cached version of the body, in any encoding, is the current one, using the weak 
+        #comparison of If-None-Match, so a W/ prefixed validator, as proxies and CDNs send after re-encoding, also matches
+        if any(request.if_none_match.contains_weak(self.etag(encoding_)) for encoding_ in ["identity", *self.compressors]):
+            response = Response(status=304)
+        else:
+            response = Response(self.encoded(encoding), mimetype="application/json")
+            if (encoding != "identity"):
+                response.headers["Content-Encoding"] = encoding
+
+        response.set_etag(self.etag(encoding))
+        response.vary.add("Accept-Encoding")
+        return response
+
+#max number of projected subdivisions and serialized country fragments cached per dataset, a few projections of every 
+#subdivision and country, rather than unbounded, as every distinct ?fields= combination of attributes adds its own entries
+PROJECTED_SUBDIVISION_CACHE_SIZE = 16384
+SERIALIZED_COUNTRY_CACHE_SIZE = 1024
+
+@dataset_cache(maxsize=PROJECTED_SUBDIVISION_CACHE_SIZE)
+def projected_subdivision(dataset: Dataset, subd: str, fields: tuple) -> dict:
+    """
+    Return the data of the input subdivision projected down to the input attributes, which is 
+    only projected once per subdivision, fields and dataset. If no fields are input then the 
+    subdivision's full data is returned.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset of the subdivision.
+    :subd: str
+        ISO 3166-2 subdivision code.
+    :fields: tuple
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :subdivision: dict
+        subdivision data, only including the input attributes.
+    """
+    subdivision = dataset.subdivision_codes[subd][1]
+    if (fields is None):
+        return subdivision
+    return {field: subdivision[field] for field in fields}
+
+@dataset_cache(maxsize=SERIALIZED_COUNTRY_CACHE_SIZE)
+def serialized_country(dataset: Dataset, alpha_2: str, fields: tuple=None) -> bytes:
+    """
+    Return the JSON encoded subdivision data of the input country, which is only serialized 
+    once per country, fields and dataset and then reused as a fragment of every response that 
+    includes the country.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset of the country.
+    :alpha_2: str
+        ISO 3166-1 alpha-2 country code.
+    :fields: tuple (default=None)
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :country_fragment: bytes
+        utf-8 encoded JSON of the country's subdivision data.
+    """
+    return app.json.dumps({subd: projected_subdivision(dataset, subd, fields) for subd in dataset.all_iso3166_2[alpha_2]}, 
+        separators=(",", ":")).encode("utf-8")
+
+def serialize_countries(dataset: Dataset, alpha_codes: list, fields: tuple=None) -> bytes:
+    """
+    Serialize the subdivision data of the input countries into a JSON object keyed by their 
+    alpha-2 codes, by joining each country's cached JSON fragment. The output is identical to 
+    that of jsonify, with the countries sorted by alpha-2 code.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset of the countries.
+    :alpha_codes: list
+        ISO 3166-1 alpha-2 country codes.
+    :fields: tuple (default=None)
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :body: bytes
+        utf-8 encoded JSON object of each country's subdivision data, terminated by a newline.
+    """
+    return b"{" + b",".join(b'"' + alpha_2.encode("utf-8") + b'":' + serialized_country(dataset, alpha_2, fields) 
+        for alpha_2 in sorted(set(alpha_codes))) + b"}\n"
+
+@dataset_cache(maxsize=16)
+def all_iso3166_2_response(dataset: Dataset, fields: tuple=None) -> SerializedResponse:
+    """
+    Return the serialized '/api/all' response of all ISO 3166-2 subdivision data, which is only 
+    serialized once per fields and dataset. Only the unprojected response is precompressed, by 
+    warm_caches, the projected responses of each fields are compressed on request at the faster 
+    compression levels.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset to serialize.
+    :fields: tuple (default=None)
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :all_iso3166_2_response: SerializedResponse
+        serialized response of all ISO 3166-2 subdivision data.
+    """
+    return SerializedResponse(serialize_countries(dataset, list(dataset.all_iso3166_2), fields), precompressed=fields is None)
+
+def parse_fields_param() -> tuple[tuple, str]:
+    """
+    Parse the fields query string parameter of the current request, a comma separated list of 
+    subdivision attributes that each subdivision's data is projected down to, e.g ?fields=name,type. 
+    The attributes are canonicalized into a sorted tuple of unique attributes, the key of the cached
+    projections, so differently ordered or repeated attributes, e.g ?fields=type,name,name, share 
+    the cached projections of ?fields=name,type. A parameter with no attributes, e.g ?fields=, or 
+    ?fields=, , is treated as if it isn't input, rather than projecting every subdivision to {}.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :fields: tuple
+        sorted unique subdivision attributes, or None if the parameter isn't input or has no attributes.
+    :fields_error: str
+        error message if any of the attributes are invalid, else None.
+    """
+    fields = request.args.get('fields')
+    if (fields is None):
+        return None, None
+
+    #split comma separated list of attributes, removing whitespace, deduplicate and sort them, return error if any are invalid
+    fields = tuple(sorted({field.strip() for field in fields.split(',') if field.strip() != ""}))
+    if (fields == ()):
+        return None, None
+    subdivision_attributes = active_dataset().subdivision_attributes
+    invalid_fields = [field for field in fields if field not in subdivision_attributes]
+    if (invalid_fields != []):
+        return None, f"Invalid attribute(s) input to fields query string parameter: {', '.join(invalid_fields)}. " \
+            f"List of available attributes: {', '.join(subdivision_attributes)}."
+    return fields, None
+
+def parse_filter_param() -> tuple[list, str]:
+    """
+    Parse the filter query string parameter of the current request, a comma separated list of 
+    predicates on the subdivision attributes, each in the format attribute=value, e.g 
+    ?filter=type=Province,parentCode=GB-ENG. Values are matched case insensitively, and a name 
+    or localName value ending in * matches every value starting with it, e.g localName=Baden*. 
+    A comma within a value, e.g name=Murcia, Región de, is kept as part of the value.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :predicates: list
+        list of (attribute, case folded value, prefix match) tuples, or None if the parameter isn't input.
+    :filter_error: str
+        error message if any of the predicates are invalid, else None.
+    """
+    filter_param = request.args.get('filter')
+    if (filter_param is None or filter_param.strip() == ""):
+        return None, None
+
+    #split into predicates on each comma followed by an attribute=value predicate, else the comma is part of the value
+    raw_predicates = []
+    for segment in filter_param.split(','):
+        if ('=' in segment or raw_predicates == []):
+            raw_predicates.append(segment)
+        else:
+            raw_predicates[-1] += ',' + segment
+
+    predicates = []
+    for raw_predicate in raw_predicates:
+        attribute, separator, value = raw_predicate.partition('=')
+        attribute, value = attribute.strip(), value.strip()
+        if (separator == "" or attribute not in FILTER_ATTRIBUTES):
+            return None, f"Invalid filter query string parameter value: {raw_predicate.strip()}. Filters must be in the format attribute=value, " \
+                f"using the attributes: {', '.join(FILTER_ATTRIBUTES)}."
+        prefix = value.endswith('*')
+        if (prefix and attribute not in PREFIX_FILTER_ATTRIBUTES):
+            return None, f"Invalid filter query string parameter value: {raw_predicate.strip()}. Prefix filters (value*) can only be used " \
+                f"with the attributes: {', '.join(PREFIX_FILTER_ATTRIBUTES)}."
+        predicates.append((attribute, (value[:-1] if prefix else value).casefold(), prefix))
+    return predicates, None
+
+def filter_subdivisions(predicates: list, alpha_codes: list=None) -> set:
+    """
+    Return the codes of all subdivisions matching every input predicate, optionally only those 
+    of the input countries. Each predicate's set of matching subdivisions is taken from the 
+    inverted indexes, with prefix predicates using a binary search over the attribute's sorted 
+    values, and the sets are intersected smallest first, so the cost of a selective filter is 
+    proportional to the size of its result rather than the size of the dataset.
+
+    Parameters
+    ==========
+    :predicates: list
+        list of (attribute, case folded value, prefix match) tuples, as parsed by parse_filter_param.
+    :alpha_codes: list (default=None)
+        ISO 3166-1 alpha-2 codes of the countries to filter, or None for all countries.
+
+    Returns
+    =======
+    :subdivisions: set
+        codes of all matching subdivisions.
+    """
+    dataset = active_dataset()
+    matching_sets = []
+    for attribute, value, prefix in predicates:
+        if (prefix):
+            #union the subdivisions of every value starting with the prefix, found after its position in the sorted values
+            values = dataset.subdivision_prefix_index[attribute]
+            matching = set()
+            for index in range(bisect_left(values, value), len(values)):
+                if not (values[index].startswith(value)):
+                    break
+                matching.update(dataset.subdivision_filter_index[attribute][values[index]])
+            matching_sets.append(matching)
+        else:
+            matching_sets.append(dataset.subdivision_filter_index[attribute].get(value, frozenset()))
+    if (alpha_codes is not None):
+        matching_sets.append(frozenset().union(*(dataset.country_subdivision_codes[alpha_2] for alpha_2 in set(alpha_codes))))
+
+    #intersect the sets of matching subdivisions, starting with the smallest
+    matching_sets.sort(key=len)
+    subdivisions = set(matching_sets[0])
+    for matching in matching_sets[1:]:
+        subdivisions.intersection_update(matching)
+    return subdivisions
+
+def filtered_countries(subdivisions: set, fields: tuple=None) -> dict:
+    """
+    Group the data of the input subdivisions by their country's alpha-2 code, as returned by the 
+    '/api/all' and '/api/alpha' endpoints. Only countries with at least one subdivision are included.
+
+    Parameters
+    ==========
+    :subdivisions: set
+        codes of subdivisions.
+    :fields: tuple (default=None)
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :countries: dict
+        subdivision data of each subdivision, keyed by subdivision code, grouped by alpha-2 code.
+    """
+    dataset = active_dataset()
+    countries = {}
+    for subd in subdivisions:
+        countries.setdefault(dataset.subdivision_codes[subd][0], {})[subd] = projected_subdivision(dataset, subd, fields)
+    return countries
+
+def warm_caches(dataset: Dataset=None) -> None:
+    """
+    Serialize and compress the cached '/api/all' response, and with it every country's JSON 
+    fragment, ahead of the first request. Used by the gunicorn master process before forking 
+    its workers, so the workers share the cached responses rather than each building their own, 
+    and by reload_dataset before a reloaded dataset is swapped in. The lazily imported name 
+    search dependencies are also imported, the country name resolver built and the completions 
+    of every single character autocomplete prefix, the slowest to complete, cached for the same 
+    reason.
+
+    Parameters
+    ==========
+    :dataset: Dataset (default=None)
+        dataset whose caches are warmed, defaults to the current dataset.
+
+    Returns
+    =======
+    None
+    """
+    dataset = current_dataset if dataset is None else dataset
+    all_response = all_iso3166_2_response(dataset)
+    for encoding in all_response.compressors:
+        all_response.encoded(encoding)
+    for module_name in ("unidecode", "rapidfuzz.process"):
+        lazy_import(module_name)
+    country_name_resolver()
+    for prefix in "abcdefghijklmnopqrstuvwxyz0123456789":
+        autocomplete_subdivisions(dataset, prefix, AUTOCOMPLETE_DEFAULT_LIMIT, None)
+
+#lock held while the dataset is reloaded, so only one reload runs at a time, and the status of the latest reload
+reload_lock = threading.Lock()
+reload_status = {"state": "idle", "version": current_dataset.version, "source": current_dataset.source, 
+    "reloaded_at": None, "reload_ms": None, "error": None}
+
+def dataset_files_stamp() -> tuple:
+    """ Return the size and modification time of the snapshot and of the iso3166-2 data file, None for a file that doesn't exist. """
+    stamps = []
+    for path in (snapshot_path, dataset_source_path()):
+        try:
+            stamps.append((os.stat(path).st_size, os.stat(path).st_mtime_ns))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+def reload_dataset(locked: bool=False) -> bool:
+    """
+    Hot reload the dataset without restarting the app, e.g after a new snapshot or version of 
+    the iso3166-2 data is deployed. A new immutable dataset, with all of its lookup indexes, is 
+    loaded from the snapshot, or else built from the iso3166-2 package, and its caches warmed, 
+    all while the current dataset keeps serving requests. It's then swapped in using a single 
+    reference assignment, so new requests immediately use the warmed dataset, while requests 
+    already in flight finish using the dataset pinned to them. If a reload is already running, 
+    or the new dataset fails to load, the current dataset is kept. Run in a background thread 
+    by the '/api/admin/reload' endpoint and the snapshot watcher.
+
+    Parameters
+    ==========
+    :locked: bool (default=False)
+        whether the caller already acquired the reload lock on behalf of this reload, which 
+        releases it once finished, else it's acquired here.
+
+    Returns
+    =======
+    :reloaded: bool
+        whether the reloaded dataset was swapped in.
+    """
+    global current_dataset
+    if not (locked or reload_lock.acquire(blocking=False)):
+        return False
+    try:
+        reload_status.update(state="reloading", error=None)
+        start = time.perf_counter()
+        try:
+            #garbage collection isn't paused while reloading, as requests are still being served
+            dataset = load_snapshot()
+            dataset = Dataset(dataset, "snapshot") if dataset is not None else Dataset(build_dataset(), "iso3166-2")
+            warm_caches(dataset)
+        except Exception as error:
+            reload_status.update(state="failed", error=f"{type(error).__name__}: {error}")
+            return False
+
+        #swap in the reloaded dataset, the previous one is released along with its caches once no request is still using it
+        current_dataset = dataset
+        reload_status.update(state="idle", version=dataset.version, source=dataset.source, 
+            reloaded_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), reload_ms=round((time.perf_counter() - start) * 1000, 3))
+        return True
+    finally:
+        reload_lock.release()
+
+def start_reload() -> bool:
+    """ 
+    Start reloading the dataset in a background thread, return False if a reload is already running.
+    The reload lock is acquired before the thread is started, and released by it once finished, so 
+    of any concurrent calls only one can start a reload.
+    """
+    if not (reload_lock.acquire(blocking=False)):
+        return False
+    try:
+        threading.Thread(target=reload_dataset, kwargs={"locked": True}, name="iso3166-2-reload", daemon=True).start()
+    except Exception:
+        reload_lock.release()
+        raise
+    return True
+
+#seconds between each check of the snapshot and iso3166-2 data files for changes by the snapshot watcher, 0 disables it
+snapshot_watch_interval = float(os.environ.get("ISO3166_2_SNAPSHOT_WATCH_INTERVAL", 0))
+
+def start_snapshot_watcher(interval: float=snapshot_watch_interval) -> threading.Thread:
+    """
+    Start a background thread that checks the size and modification time of the snapshot and the 
+    iso3166-2 data file every interval seconds, reloading the dataset once either has changed. As 
+    threads don't survive a fork, it's started in each gunicorn worker, so every worker reloads.
+
+    Parameters
+    ==========
+    :interval: float (default=snapshot_watch_interval)
+        seconds between each check, 0 or less doesn't start the watcher.
+
+    Returns
+    =======
+    :watcher: threading.Thread
+        watcher thread, None if not started.
+    """
+    if (interval <= 0):
+        return None
+
+    def watch_snapshot():
+        """ Reload the dataset whenever the stamp of the snapshot or iso3166-2 data file changes. """
+        stamp = dataset_files_stamp()
+        while True:
+            time.sleep(interval)
+            latest_stamp = dataset_files_stamp()
+            if (latest_stamp != stamp and reload_dataset()):
+                stamp = latest_stamp
+
+    watcher = threading.Thread(target=watch_snapshot, name="iso3166-2-snapshot-watcher", daemon=True)
+    watcher.start()
+    return watcher
+
+def parse_stream_params() -> tuple[str, str]:
+    """
+    Parse the format and granularity query string parameters of the current request, used to 
+    stream the response as newline delimited JSON (NDJSON), one line per country or subdivision.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :output_format: str
+        output format of the response, json (default) or ndjson.
+    :granularity: str
+        granularity of each NDJSON line, country (default) or subdivision.
+    """
+    return request.args.get('format', 'json').lower(), request.args.get('granularity', 'country').lower()
+
+def invalid_stream_params(output_format: str, granularity: str) -> str:
+    """ Return an error message if the format or granularity query string parameters are invalid, else None. """
+    if (output_format not in ["json", "ndjson"]):
+        return f"Format query string parameter value must be json or ndjson, got value: {output_format}."
+    if (granularity not in ["country", "subdivision"]):
+        return f"Granularity query string parameter value must be country or subdivision, got value: {granularity}."
+    return None
+
+def ndjson_response(lines) -> Response:
+    """
+    Return a streamed Flask response of newline delimited JSON, each line is a JSON object
+    that is a fragment of the endpoint's full JSON response, such that merging all of the 
+    lines recreates it.
+
+    Parameters
+    ==========
+    :lines: generator
+        generator of utf-8 encoded JSON objects, each terminated by a newline.
+
+    Returns
+    =======
+    :response: flask.Response
+        streamed NDJSON response.
+    """
+    return Response(lines, mimetype="application/x-ndjson")
+
+def subdivision_lines(countries: dict, sort_subdivisions: bool=True):
+    """
+    Yield the alpha-2 code and subdivision codes of each line of a NDJSON response streamed one 
+    line per subdivision, with the countries in alpha-2 code order. A country without any 
+    subdivisions is yielded once with no subdivision codes, so it's still included when the 
+    lines are merged.
+
+    Parameters
+    ==========
+    :countries: dict
+        subdivisions of each country, keyed by alpha-2 code.
+    :sort_subdivisions: bool (default=True)
+        yield each country's subdivisions in code order, rather than in their order in the dataset.
+
+    Returns
+    =======
+    :subdivision_lines: generator
+        generator of (alpha-2 code, list of a single subdivision code, or empty list) tuples.
+    """
+    for alpha_2 in sorted(countries):
+        subdivision_codes = sorted(countries[alpha_2]) if (sort_subdivisions) else list(countries[alpha_2])
+        if (subdivision_codes == []):
+            yield alpha_2, []
+        for subd in subdivision_codes:
+            yield alpha_2, [subd]
+
+def resolve_alpha_codes(alpha: str) -> tuple[list, str]:
+    """
+    Resolve the input comma separated ISO 3166-1 alpha-2, alpha-3 or numeric country codes into 
+    their alpha-2 codes, using the precomputed country code lookup table. Numeric codes can be 
+    input with or without their leading zeros, e.g "4", "04" and "004" are all resolved to "AF". 
+    Used by the '/api/alpha' and '/api/batch' endpoints.
+
+    Parameters
+    ==========
+    :alpha: str
+        2 letter alpha-2, 3 letter alpha-3 or numeric ISO 3166-1 country code or comma separated list of codes.
+
+    Returns
+    =======
+    :alpha_code: list
+        sorted alpha-2 codes of the input countries, None if invalid input.
+    :error: str
+        error message if empty or invalid country code input, else None.
+    """
+    #sort and uppercase all alpha codes, remove any unicode spaces (%20) and split into comma separated list
+    alpha_code = sorted(alpha.upper().replace(' ', '').replace('%20', '').split(','))
+    
+    #if no input parameters set then return error
+    if (alpha_code == ['']):
+        return None, "The alpha input parameter cannot be empty."
+
+    #iterate over each input alpha code, resolving alpha-3 and numeric codes to their alpha-2 counterpart, return error if invalid code
+    for code in range(0, len(alpha_code)):
+        alpha_2 = country_codes.get(alpha_code[code])
+        if (alpha_2 is None):
+            #return error message if invalid numeric code input, of any length
+            if (alpha_code[code].isdecimal()):
+                return None, f"Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: {alpha_code[code]}."
+            #return error message if invalid alpha-3 code input
+            if (len(alpha_code[code]) == 3):
+                return None, f"Invalid ISO 3166-1 alpha-3 country code input, cannot convert into corresponding alpha-2 code: {alpha_code[code]}."
+            return None, f"Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: {alpha_code[code]}."
+        alpha_code[code] = alpha_2
+
+    return alpha_code, None
+
+def resolve_subdivision_codes(subd: str) -> tuple[list, str]:
+    """
+    Validate the input comma separated ISO 3166-2 subdivision codes, checking the format of each 
+    code and that it exists in the dataset. Used by the '/api/subdivision' and '/api/batch' endpoints.
+
+    Parameters
+    ==========
+    :subd: str
+        ISO 3166-2 subdivision code or comma separated list of codes.
+
+    Returns
+    =======
+    :subd_code: list
+        uppercased subdivision codes, None if invalid input.
+    :error: str
+        error message if empty, invalid or not found subdivision code input, else None.
+    """
+    #sort and uppercase all subdivision codes, remove any unicode spaces (%20)
+    subd_code = sorted([subd.upper().replace(' ','').replace('%20', '')])
+    
+    #if no input parameters set then return error
+    if (subd_code == ['']):
+        return None, "The subdivision input parameter cannot be empty."
+
+    #if first element in subdivision list is comma separated list of codes, split into actual array of comma separated codes
+    if (',' in subd_code[0]):
+        subd_code = subd_code[0].split(',')
+        subd_code = [code.strip() for code in subd_code]
+
+    #iterate over each subdivision code and validate its format and check if exists in dataset, if not then return error
+    country_subdivision_codes = active_dataset().country_subdivision_codes
+    for code in subd_code:
+        if not (subdivision_code_regex.match(code)):
+            return None, "All subdivision codes must be in the format XX-Y, XX-YY or XX-YYY: {}.".format(code)
+        if (code not in country_subdivision_codes.get(code.split('-')[0], ())):
+            return None, f"Subdivision code {code} not found in list of available subdivisions for {code.split('-')[0]}."
+
+    return subd_code, None
+
+#relations of a subdivision returned by the '/api/hierarchy' endpoint, children being the descendants at a depth of 1
+HIERARCHY_RELATIONS = ("ancestors", "children", "descendants")
+
+def parse_depth(depth: str) -> tuple[int, str]:
+    """
+    Parse the depth query string parameter of the '/api/hierarchy' endpoint, the max number of 
+    levels of the hierarchy to walk from the input subdivision.
+
+    Parameters
+    ==========
+    :depth: str
+        raw depth query string parameter, None if not input.
+
+    Returns
+    =======
+    :depth: int
+        max number of levels to walk, None if not input or invalid, in which case all levels are walked.
+    :error: str
+        error message if the depth isn't a positive integer, else None.
+    """
+    if (depth is None or depth.strip() == ""):
+        return None, None
+    if not (depth.strip().isdecimal() and int(depth) > 0):
+        return None, f"Depth query string parameter value must be a positive integer: {depth}."
+    return int(depth), None
+
+def subdivision_relatives(subd: str, relation: str, depth: int=None) -> list:
+    """
+    Return the codes of the ancestors or descendants of the input subdivision, walking the 
+    precomputed parent and children adjacency indexes up to the input depth, so the cost is 
+    proportional to the size of the branch rather than the size of the subdivision's country.
+
+    Parameters
+    ==========
+    :subd: str
+        ISO 3166-2 subdivision code.
+    :relation: str
+        ancestors, children or descendants.
+    :depth: int (default=None)
+        max number of levels to walk, None to walk all levels. Children are always 1 level.
+
+    Returns
+    =======
+    :relatives: list
+        codes of the relatives, ancestors ordered from the parent upwards and descendants in breadth first order.
+    """
+    if (relation == "children"):
+        depth = 1
+    dataset = active_dataset()
+    relatives = []
+    level = 0
+    if (relation == "ancestors"):
+        #follow the chain of parents, stopping if a parent was already visited
+        parent = dataset.subdivision_parents.get(subd)
+        while (parent is not None and parent != subd and parent not in relatives and (depth is None or level < depth)):
+            relatives.append(parent)
+            parent = dataset.subdivision_parents.get(parent)
+            level += 1
+        return relatives
+
+    #walk the children level by level, breadth first
+    visited = {subd}
+    frontier = [subd]
+    while (frontier and (depth is None or level < depth)):
+        frontier = [child for parent in frontier for child in dataset.subdivision_children.get(parent, ()) if child not in visited]
+        visited.update(frontier)
+        relatives.extend(frontier)
+        level += 1
+    return relatives
+
+#max number of nearest subdivisions returned per request by the '/api/nearest' endpoint
+NEAREST_MAX_K = 100
+
+def parse_coordinate(name: str, value: str, limit: float) -> tuple[float, str]:
+    """
+    Parse the lat or lng query string parameter of the '/api/nearest' endpoint, in degrees.
+
+    Parameters
+    ==========
+    :name: str
+        name of the query string parameter, lat or lng.
+    :value: str
+        raw query string parameter value.
+    :limit: float
+        max absolute value of the coordinate, 90 for latitude and 180 for longitude.
+
+    Returns
+    =======
+    :coordinate: float
+        coordinate in degrees, None if invalid.
+    :error: str
+        error message if the coordinate isn't a number between -limit and limit, else None.
+    """
+    try:
+        coordinate = float(value)
+    except (TypeError, ValueError):
+        coordinate = None
+    if (coordinate is None or not (-limit <= coordinate <= limit)):
+        return None, f"{name.capitalize()} query string parameter value must be a number between -{limit} and {limit}, got value: {value}."
+    return coordinate, None
+
+def parse_radius(radius: str) -> tuple[float, str]:
+    """
+    Parse the radius query string parameter of the '/api/nearest' endpoint, the max distance in 
+    km of the nearest subdivisions.
+
+    Parameters
+    ==========
+    :radius: str
+        raw radius query string parameter, None if not input.
+
+    Returns
+    =======
+    :radius: float
+        max distance in km, None if not input or invalid.
+    :error: str
+        error message if the radius isn't a positive number, else None.
+    """
+    if (radius is None):
+        return None, None
+    try:
+        radius_km = float(radius)
+    except ValueError:
+        radius_km = -1
+    if not (0 < radius_km < float("inf")):
+        return None, f"Radius query string parameter value must be a positive number of km, got value: {radius}."
+    return radius_km, None
+
+def nearest_subdivisions(lat: float, lng: float, k: int=1, alpha_codes: list=None, radius: float=None) -> list[tuple[str, float]]:
+    """
+    Return the k subdivisions nearest to the input coordinates, using the k-d tree over all 
+    subdivisions or, if a list of countries is input, the k-d tree of each country, merging 
+    their nearest subdivisions.
+
+    Parameters
+    ==========
+    :lat: float
+        latitude in degrees.
+    :lng: float
+        longitude in degrees.
+    :k: int (default=1)
+        max number of subdivisions to return.
+    :alpha_codes: list (default=None)
+        ISO 3166-1 alpha-2 codes of the countries to search, or None for all countries.
+    :radius: float (default=None)
+        max great-circle distance in km of the returned subdivisions, None for no limit.
+
+    Returns
+    =======
+    :nearest: list
+        (subdivision code, distance in km) of each of the nearest subdivisions, closest first.
+    """
+    dataset = active_dataset()
+    if (alpha_codes is None):
+        return dataset.subdivision_spatial_index.nearest(lat, lng, k, radius)
+    nearest = [match for alpha_2 in set(alpha_codes) for match in dataset.country_spatial_index[alpha_2].nearest(lat, lng, k, radius)]
+    return sorted(nearest, key=lambda match: (match[1], match[0]))[:k]
+
+#number of coordinates whose distances to all subdivision centroids are computed at once by bulk_nearest_subdivisions, 
+#bounding the memory of each tile's distance matrix to ~tile size * number of subdivisions * 8 bytes
+BULK_NEAREST_TILE_SIZE = int(os.environ.get("ISO3166_2_BULK_NEAREST_TILE_SIZE", 512))
+
+@dataset_cache(maxsize=64)
+def centroid_matrix(dataset: Dataset, alpha_codes: tuple) -> tuple:
+    """
+    Return the NumPy matrices of the latLng centroids of all subdivisions, or only those of the 
+    input countries, sorted by subdivision code, used by bulk_nearest_subdivisions. Only built 
+    once per countries and dataset.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset of the subdivisions.
+    :alpha_codes: tuple
+        sorted ISO 3166-1 alpha-2 codes of the countries, or None for all countries.
+
+    Returns
+    =======
+    :codes: tuple
+        subdivision code of each centroid.
+    :vectors: numpy.ndarray
+        3 x n matrix of the unit vector of each centroid.
+    :latitudes: numpy.ndarray
+        latitude of each centroid, in radians.
+    :longitudes: numpy.ndarray
+        longitude of each centroid, in radians.
+    """
+    numpy = lazy_import("numpy")
+    #sorted by subdivision code, so the first of the centroids the same distance from a coordinate has the smallest code, as in the k-d tree
+    centroids = sorted((subd, subdivision["latLng"]) for alpha_2 in (alpha_codes or dataset.all_iso3166_2) 
+        for subd, subdivision in dataset.all_iso3166_2[alpha_2].items() if subdivision.get("latLng") and len(subdivision["latLng"]) == 2)
+    latitudes = numpy.radians(numpy.array([lat_lng[0] for _, lat_lng in centroids], dtype=float))
+    longitudes = numpy.radians(numpy.array([lat_lng[1] for _, lat_lng in centroids], dtype=float))
+    vectors = numpy.stack([numpy.cos(latitudes) * numpy.cos(longitudes), numpy.cos(latitudes) * numpy.sin(longitudes), numpy.sin(latitudes)])
+    return tuple(subd for subd, _ in centroids), vectors, latitudes, longitudes
+
+def bulk_nearest_subdivisions(lats, lngs, alpha_codes: list=None, radius: float=None, tile_size: int=BULK_NEAREST_TILE_SIZE):
+    """
+    Return the nearest subdivision to each of the input coordinates, for reverse geocoding large 
+    batches of coordinates, e.g millions of GPS points in offline jobs. If NumPy is installed the 
+    coordinates are processed in tiles, the nearest centroid of every coordinate in a tile being 
+    found in one vectorized pass, as the max dot product of the coordinates' and centroids' unit 
+    vectors, with its distance then computed using the haversine formula. The size of the tiles 
+    bounds the memory used. Else, each coordinate is looked up in the k-d tree spatial indexes.
+
+    Parameters
+    ==========
+    :lats: sequence
+        latitude of each coordinate, in degrees.
+    :lngs: sequence
+        longitude of each coordinate, in degrees, the same length as lats.
+    :alpha_codes: list (default=None)
+        ISO 3166-1 alpha-2 codes of the countries to search, or None for all countries.
+    :radius: float (default=None)
+        max great-circle distance in km of the nearest subdivision, None for no limit.
+    :tile_size: int (default=BULK_NEAREST_TILE_SIZE)
+        number of coordinates processed in each vectorized pass.
+
+    Returns
+    =======
+    :nearest: generator
+        generator of the (subdivision code, distance in km) of each coordinate in input order, 
+        (None, None) if there's no subdivision within the radius.
+    """
+    if (len(lats) != len(lngs)):
+        raise ValueError(f"The lats and lngs must be the same length, got {len(lats)} and {len(lngs)}.")
+
+    #look up each coordinate in the k-d tree if NumPy isn't installed
+    if (find_spec("numpy") is None):
+        for lat, lng in zip(lats, lngs):
+            nearest = nearest_subdivisions(lat, lng, 1, alpha_codes, radius)
+            yield nearest[0] if nearest else (None, None)
+        return
+
+    numpy = lazy_import("numpy")
+    codes, vectors, latitudes, longitudes = centroid_matrix(active_dataset(), None if alpha_codes is None else tuple(sorted(set(alpha_codes))))
+    for start in range(0, len(lats), tile_size):
+        tile_latitudes = numpy.radians(numpy.asarray(lats[start:start + tile_size], dtype=float))
+        tile_longitudes = numpy.radians(numpy.asarray(lngs[start:start + tile_size], dtype=float))
+        if not (codes):
+            yield from [(None, None)] * len(tile_latitudes)
+            continue
+
+        #the nearest centroid has the largest dot product with the coordinate's unit vector, i.e the smallest angle between them
+        tile_vectors = numpy.stack([numpy.cos(tile_latitudes) * numpy.cos(tile_longitudes), 
+            numpy.cos(tile_latitudes) * numpy.sin(tile_longitudes), numpy.sin(tile_latitudes)], axis=1)
+        nearest = numpy.argmax(tile_vectors @ vectors, axis=1)
+
+        #haversine distance from each coordinate to its nearest centroid
+        haversine = numpy.sin((latitudes[nearest] - tile_latitudes) / 2) ** 2 + numpy.cos(tile_latitudes) * numpy.cos(latitudes[nearest]) * \
+            numpy.sin((longitudes[nearest] - tile_longitudes) / 2) ** 2
+        distances = 2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.clip(haversine, 0, 1)))
+
+        for index, distance in zip(nearest.tolist(), distances.tolist()):
+            yield (codes[index], distance) if (radius is None or distance <= radius) else (None, None)
+
+#default and max number of completions returned by the '/api/autocomplete' endpoint
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+@dataset_cache(maxsize=4096)
+def autocomplete_subdivisions(dataset: Dataset, prefix: str, limit: int, alpha_codes: tuple) -> tuple:
+    """
+    Return the subdivisions whose normalized name or localName, or a suffix of it starting at a 
+    word, starts with the input normalized prefix, found using a binary search over the sorted 
+    autocomplete keys. Completions are ranked by whether the whole name or only a later word 
+    matches, then the length of the name, so the closest completions come first, e.g "york" 
+    ranks York before North Yorkshire. Each subdivision is only returned once, using its best 
+    ranked name. Repeated prefixes, e.g from every user's first keystrokes, are cached per dataset.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset of the subdivisions.
+    :prefix: str
+        normalized prefix.
+    :limit: int
+        max number of completions to return.
+    :alpha_codes: tuple
+        sorted ISO 3166-1 alpha-2 codes of the countries to complete, or None for all countries.
+
+    Returns
+    =======
+    :completions: tuple
+        (subdivision code, matching name or localName) of each completion, ranked.
+    """
+    start = bisect_left(dataset.autocomplete_keys, prefix)
+    end = bisect_left(dataset.autocomplete_keys, prefix + "\U0010ffff", start)
+
+    #keep the best ranked matching name of each subdivision, only of the input countries
+    completions = {}
+    for is_suffix, value, subd in dataset.autocomplete_entries[start:end]:
+        if (alpha_codes is not None and dataset.subdivision_codes[subd][0] not in alpha_codes):
+            continue
+        rank = (is_suffix, len(value), value, subd)
+        if (subd not in completions or rank < completions[subd]):
+            completions[subd] = rank
+
+    return tuple((subd, value) for _, _, value, subd in nsmallest(limit, completions.values()))
+
+def parse_likeness(search_likeness: str) -> tuple[float, str]:
+    """
+    Parse the likeness query string parameter of the '/api/name' endpoint, a % cutoff for the 
+    likeness of matching subdivision names, input as a value between 0 - 1 or 1 - 100. 
+
+    Parameters
+    ==========
+    :search_likeness: str
+        likeness query string parameter value, None if not input.
+
+    Returns
+    =======
+    :search_likeness: float
+        likeness between 0 and 1, None if not input or invalid.
+    :error: str
+        error message if invalid type or value input, else None.
+    """
+    if (search_likeness is None):
+        return None, None
+    try: 
+        likeness = float(search_likeness) 
+    except ValueError: 
+        return None, "Likeness query string parameter value must be between 0 - 1 or 1 - 100: {}.".format(search_likeness)
+    if (likeness > 1 and likeness <= 100): #divide input by 100 if % value input
+        likeness = likeness / 100 
+    #nan fails every comparison, so only finite values between 0 and 1, once divided, are accepted
+    if not (0 <= likeness <= 1):
+        return None, "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: {}.".format(search_likeness)
+    return likeness, None
+
+def search_subdivision_names(subdivision_names: list, search_likeness: float=None) -> tuple:
+    """
+    Return the codes of all subdivisions whose name matches any of the input normalized subdivision 
+    names, using the trigram index. If no likeness is input then exact matches are returned, else 
+    if there are none all names that match 90% or more. Otherwise every subdivision name that 
+    matches at or above the likeness is returned.
+
+    Parameters
+    ==========
+    :subdivision_names: list
+        normalized subdivision names.
+    :search_likeness: float (default=None)
+        likeness score between 0 and 1 of matching subdivision names.
+
+    Returns
+    =======
+    :matching_subdivisions: tuple
+        sorted codes of matching subdivisions, empty if no matching subdivisions found.
+    """
+    dataset = active_dataset()
+    stats = fuzzy_stats()
+    matching_subdivisions = set()
+
+    #iterate over all input subdivision names, and find all matching subdivision names using the trigram index
+    for subdiv in subdivision_names: 
+
+        #use default likeness score of 100 (exact) followed by 90 if no exact matches found
+        if (search_likeness is None):
+            all_subdivision_name_matches = dataset.subdivision_name_search.search(subdiv, score_cutoff=90, stats=stats)
+            exact_subdivision_name_matches = [match for match in all_subdivision_name_matches if match[1] == 100]
+            if (exact_subdivision_name_matches != []):
+                all_subdivision_name_matches = exact_subdivision_name_matches
+        #using a custom likeness score according to input query parameter, all subdivisions at or above the score are returned
+        else:
+            all_subdivision_name_matches = dataset.subdivision_name_search.search(subdiv, score_cutoff=search_likeness * 100, stats=stats)
+
+        #get the codes of the subdivisions of each matching subdivision name
+        for name_match, _ in all_subdivision_name_matches:
+            matching_subdivisions.update(subd for alpha_2, subd in dataset.subdivision_name_index[name_match])
+
+    return tuple(sorted(matching_subdivisions))
+
+def resolve_subdivision_names(subdivision_name: str, search_likeness: float=None) -> tuple[tuple, str]:
+    """
+    Return the codes of all subdivisions matching the input comma separated subdivision names, 
+    using the trigram index. Subdivision names containing a comma are kept as one name. The 
+    results of repeated queries are cached in the subdivision name cache. Used by the '/api/name' 
+    and '/api/batch' endpoints.
+
+    Parameters
+    ==========
+    :subdivision_name: str
+        one or more subdivision names as they are commonly known in English.
+    :search_likeness: float (default=None)
+        likeness score between 0 and 1 of matching subdivision names.
+
+    Returns
+    =======
+    :matching_subdivisions: tuple
+        sorted codes of matching subdivisions, None if invalid input.
+    :error: str
+        error message if empty input or no matching subdivisions found, else None.
+    """
+    #if no input parameters set then return error
+    if (subdivision_name == ""):
+        return None, "The subdivision name input parameter cannot be empty."
+
+    #decode any unicode or accent characters using utf-8 encoding, lower case and remove additional whitespace
+    subdivision_name_ = normalize_subdivision_name(unquote_plus(subdivision_name))
+    dataset = active_dataset()
+
+    #separate list to keep track if any of input subdivision names are exceptions (have comma in them)
+    subdivision_name_exceptions_input = []
+
+    #only execute subdivision name exception code if comma is in input param
+    if (',' in subdivision_name_):
+        #temp var to track input subdivision name 
+        temp_subdivision_name = subdivision_name_
+
+        #iterate over all subdivision names exceptions (those with a comma in them), append to separate list if input param is one
+        for sub_name in dataset.subdivision_name_comma_exceptions:
+            if (sub_name in temp_subdivision_name):
+                subdivision_name_exceptions_input.append(sub_name)
+                #remove current subdivision name from temp var, strip of commas
+                subdivision_name_ = temp_subdivision_name.replace(sub_name, '').strip(',')
+
+    #split multiple subdivision names into list
+    subdivision_names = subdivision_name_.split(',')
+
+    #extend subdivision names list if any subdivision name exceptions are present in input param
+    if (subdivision_name_exceptions_input != []):
+        subdivision_names.extend(subdivision_name_exceptions_input)
+    profile_phase("parse")
+
+    #codes of the subdivisions matching the input names and likeness, from the cache of repeated queries if available, keyed
+    #on the dataset's version and reload generation, so its entries are invalidated once a reloaded dataset is in use, while
+    #requests still in flight using the previous dataset bypass the cache rather than evicting the reloaded dataset's entries
+    cache_key = (tuple(sorted(subdivision_names)), search_likeness)
+    matching_subdivisions = subdivision_name_cache.get(cache_key, dataset.version, dataset.generation)
+    if (matching_subdivisions is None):
+        matching_subdivisions = search_subdivision_names(subdivision_names, search_likeness)
+        subdivision_name_cache.put(cache_key, matching_subdivisions, dataset.version, dataset.generation)
+
+    #return error if no matching subdivisions found from input name    
+    if (matching_subdivisions == ()):
+        return None, "No valid subdivision found for input name: {}. Try using the query string parameter '?likeness' and reduce the likeness score to expand the"\
+            " search space, e.g '?likeness=0.3' will return subdivisions that have a 30% match to the input name.".format(subdivision_name)
+
+    return matching_subdivisions, None
+
+def resolve_country_names(country_name: str) -> tuple[list, str]:
+    """
+    Resolve the input comma separated country names into their alpha-2 codes, using the country 
+    name resolver, exactly matching official names and aliases or else fuzzy matching them. Used 
+    by the '/api/country_name' and '/api/batch' endpoints.
+
+    Parameters
+    ==========
+    :country_name: str
+        one or more country names as they are commonly known in English.
+
+    Returns
+    =======
+    :alpha2_code: list
+        alpha-2 codes of the input countries, None if invalid input.
+    :error: str
+        error message if empty or invalid country name input, else None.
+    """
+    #decode any unicode or accent characters using utf-8 encoding, lower case and remove additional whitespace
+    name = lazy_import("unidecode").unidecode(unquote_plus(country_name)).replace('%20', ' ').title()
+    profile_phase("parse")
+
+    #if no input parameters set then return error message
+    if (name == ""):
+        return None, "The country name input parameter cannot be empty."
 
-#json object storing the error message, route and status code 
-error_message = {}
-error_message["status"] = 400
+    #path can accept multiple country names, separated by a comma, but several countries contain a comma already in 
+    #their name, e.g "Korea, Republic of", so the whole input is first matched exactly as a single name
+    resolver = country_name_resolver()
+    alpha_2 = resolver.lookup(name)
+    if (alpha_2 is not None):
+        return [alpha_2], None
 
-#get all subdivision data from the ISO 3166-2 package
-iso3166_2_instance = ISO3166_2()
-all_iso3166_2 = iso3166_2_instance.all
+    #iterate over all input country names, get corresponding 2 letter alpha-2 code, exactly or fuzzy matched
+    alpha2_code = []
+    for name_ in name.split(','):
+        alpha_2 = resolver.resolve(name_, stats=fuzzy_stats())
+        #return error if country name not found
+        if (alpha_2 is None):
+            return None, "Invalid country name input: {}.".format(name)
+        alpha2_code.append(alpha_2)
 
-# print(f"Using version {iso3166_2_instance.__version__} of ISO 3166-2 software.")
+    return alpha2_code, None
 
 @app.route('/')
 @app.route('/api')
@@ -53,11 +1958,16 @@ def home() -> str:
 
 @app.route('/api/all', methods=['GET'])
 @app.route('/all', methods=['GET'])
-def all() -> tuple[dict, int]:
+def all() -> Response:
     """
     Flask route for '/api/all' path/endpoint. Return all ISO 3166-2 subdivision data 
-    attributes and values for all countries. Route can accept path with or without 
-    trailing slash.
+    attributes and values for all countries. The data is serialized and compressed once 
+    per dataset version, with the response's encoding negotiated from the Accept-Encoding 
+    header. A 304 is returned if the request's If-None-Match header matches the data's 
+    ETag. If the format query string parameter is ndjson then the data is instead streamed 
+    as newline delimited JSON, one line per country or, if the granularity parameter is 
+    subdivision, one line per subdivision. Route can accept path with or without trailing 
+    slash.
 
     Parameters
     ==========
@@ -65,13 +1975,48 @@ def all() -> tuple[dict, int]:
 
     Returns
     =======
-    :jsonify(all_iso3166_2): json
-        jsonified ISO 3166-2 subdivision data.
-    :status_code: int
-        response status code. 200 is a successful response, 400 means there was an 
-        invalid parameter input. 
+    :all_iso3166_2_response: flask.Response
+        serialized ISO 3166-2 subdivision data, status code 200, or 304 if the
+        client's cached data is unchanged. Streamed NDJSON response if format is
+        ndjson, or error message with status code 400 if invalid parameter input.
     """  
-    return jsonify(all_iso3166_2), 200
+    #parse format and granularity query string params, return error if invalid
+    output_format, granularity = parse_stream_params()
+    stream_params_error = invalid_stream_params(output_format, granularity)
+    if (stream_params_error is not None):
+        return error_response(stream_params_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #parse filter query string param, used to only return subdivisions whose attributes match every predicate
+    predicates, filter_error = parse_filter_param()
+    if (filter_error is not None):
+        return error_response(filter_error)
+
+    #read all data from the dataset pinned to this request, including while the response is streamed
+    dataset = active_dataset()
+    if (predicates is not None):
+        #get the data of the matching subdivisions from the inverted indexes, rather than the cached full response
+        countries = filtered_countries(filter_subdivisions(predicates), fields)
+        if (output_format == "ndjson"):
+            if (granularity == "country"):
+                return ndjson_response(serialize_json({alpha_2: countries[alpha_2]}) for alpha_2 in sorted(countries))
+            return ndjson_response(serialize_json({alpha_2: {subd: countries[alpha_2][subd] for subd in subds}}) 
+                for alpha_2, subds in subdivision_lines(countries))
+        return Response(serialize_json(countries), mimetype="application/json"), 200
+
+    if (output_format == "ndjson"):
+        #stream each country's cached JSON fragment, or each of its subdivisions, as a separate line
+        if (granularity == "country"):
+            return ndjson_response(b'{"' + alpha_2.encode("utf-8") + b'":' + serialized_country(dataset, alpha_2, fields) + b"}\n" 
+                for alpha_2 in sorted(dataset.all_iso3166_2))
+        return ndjson_response(serialize_json({alpha_2: {subd: projected_subdivision(dataset, subd, fields) for subd in subds}}) 
+            for alpha_2, subds in subdivision_lines(dataset.all_iso3166_2))
+
+    return all_iso3166_2_response(dataset, fields).response()
 
 @app.route('/api/alpha/<alpha>', methods=['GET'])
 @app.route('/alpha/<alpha>', methods=['GET'])
@@ -97,75 +2042,26 @@ def api_alpha(alpha="") -> tuple[dict, int]:
         response status code. 200 is a successful response, 400 means there was an 
         invalid parameter input.
     """
-    #initialise vars
-    iso3166_2 = {}
-    alpha_code = []
-
-    #set path url for error message object
-    error_message['path'] = request.base_url
-
-    #sort and uppercase all alpha codes, remove any unicode spaces (%20) and split into comma separated list
-    alpha_code = sorted(alpha.upper().replace(' ', '').replace('%20', '').split(','))
-    
-    #if no input parameters set then raise and return error
-    if (alpha_code == ['']):
-        error_message["message"] = "The alpha input parameter cannot be empty."
-        return jsonify(error_message), 400
-
-    def convert_to_alpha2(alpha_code):
-        """ 
-        Convert an ISO 3166 country's 3 letter alpha-3 code or numeric code into its 
-        2 letter alpha-2 counterpart. 
-
-        Parameters 
-        ==========
-        :alpha_code: str
-            3 letter ISO 3166 alpha-3 country code or numeric code.
-        
-        Returns
-        =======
-        :iso3166.countries_by_alpha3[alpha3_code].alpha2/iso3166.countries_by_numeric[alpha_code].alpha2: str
-            2 letter alpha-2 ISO 3166 country code. 
-        """
-        if (alpha_code.isdigit()):
-            #return error if numeric code not found
-            if not (alpha_code in list(iso3166.countries_by_numeric.keys())):
-                return None
-            else:
-                #use iso3166 package to find corresponding alpha-2 code from its numeric code
-                return iso3166.countries_by_numeric[alpha_code].alpha2
-    
-        #return error if 3 letter alpha-3 code not found
-        if not (alpha_code in list(iso3166.countries_by_alpha3.keys())):
-            return None
-        else:
-            #use iso3166 package to find corresponding alpha-2 code from its alpha-3 code
-            return iso3166.countries_by_alpha3[alpha_code].alpha2
-
-    #iterate over each input alpha codes, convert to equivalent alpha-2 codes if applicable, return error if invalid code
-    for code in range(0, len(alpha_code)):
-        #api can accept alpha-3 or numeric codes for country, this has to be converted into its alpha-2 counterpart
-        if (len(alpha_code[code]) == 3):
-            temp_code = convert_to_alpha2(alpha_code[code])
-            #return error message if invalid numeric code input
-            if (temp_code is None and alpha_code[0].isdigit()):
-                error_message["message"] = f"Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: {''.join(alpha_code[code])}."
-                return jsonify(error_message), 400
-            #return error message if invalid alpha-3 code input
-            if (temp_code is None):
-                error_message["message"] = f"Invalid ISO 3166-1 alpha-3 country code input, cannot convert into corresponding alpha-2 code: {''.join(alpha_code[code])}."
-                return jsonify(error_message), 400
-            alpha_code[code] = temp_code
-        #use regex to validate format of alpha-2 codes - if invalid then return error
-        if not (bool(re.match(r"^[A-Z]{2}$", alpha_code[code]))) or (alpha_code[code] not in list(iso3166.countries_by_alpha2.keys())):
-            error_message["message"] = f"Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: {''.join(alpha_code[code])}."
-            return jsonify(error_message), 400
-
-    #get subdivision data from iso3166_2 object per country using alpha-2 code
-    for code in alpha_code:
-        iso3166_2[code] = all_iso3166_2[code]
-    
-    return jsonify(iso3166_2), 200
+    #resolve all input alpha-2, alpha-3 and numeric codes into their alpha-2 code, return error if empty or invalid code
+    alpha_code, alpha_error = resolve_alpha_codes(alpha)
+    profile_phase("resolve")
+    if (alpha_error is not None):
+        return error_response(alpha_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #parse filter query string param, used to only return subdivisions whose attributes match every predicate
+    predicates, filter_error = parse_filter_param()
+    if (filter_error is not None):
+        return error_response(filter_error)
+    if (predicates is not None):
+        return Response(serialize_json(filtered_countries(filter_subdivisions(predicates, alpha_code), fields)), mimetype="application/json"), 200
+
+    #join the cached JSON subdivision data of each country, using its alpha-2 code as key
+    return Response(serialize_countries(active_dataset(), alpha_code, fields), mimetype="application/json"), 200
 
 @app.route('/api/subdivision/<subd>', methods=['GET'])
 @app.route('/subdivision/<subd>', methods=['GET'])
@@ -191,49 +2087,68 @@ def api_subdivision(subd="") -> tuple[dict, int]:
         response status code. 200 is a successful response, 400 means there was an 
         invalid parameter input.
     """
-    #initialise vars
-    iso3166_2 = {}
-    subd_code = []
-
-    #set path url for error message object
-    error_message['path'] = request.base_url
-
-    #get list of all available subdivision codes
-    all_iso3166_2_codes = []
-    for country in all_iso3166_2:
-        for subd_code in all_iso3166_2[country]:
-            all_iso3166_2_codes.append(subd_code)
-            
-    #sort and uppercase all subdivision codes, remove any unicode spaces (%20)
-    subd_code = sorted([subd.upper().replace(' ','').replace('%20', '')])
-    
-    #if no input parameters set then return error
-    if (subd_code == ['']):
-        error_message["message"] = "The subdivision input parameter cannot be empty."
-        return jsonify(error_message), 400
-
-    #if first element in subdivision list is comma separated list of codes, split into actual array of comma separated codes
-    if (',' in subd_code[0]):
-        subd_code = subd_code[0].split(',')
-        subd_code = [code.strip() for code in subd_code]
-
-    #iterate over each subdivision code and validate its format and check if exists in dataset, if not then return error
-    for subd in range(0, len(subd_code)):
-        if not (bool(re.match(r"^[A-Z]{2}-[A-Z0-9]{1,3}$", subd_code[subd]))):
-            error_message["message"] = "All subdivision codes must be in the format XX-Y, XX-YY or XX-YYY: {}.".format(subd_code[subd])
-            return jsonify(error_message), 400
-        if (subd_code[subd] not in all_iso3166_2_codes):
-            error_message["message"] = f"Subdivision code {subd_code[subd]} not found in list of available subdivisions for {subd_code[subd].split('-')[0]}."
-            return jsonify(error_message), 400
-
-        #create empty country object for country subdivision data, if code is valid, using subdivision code as key
-        if not (subd_code in all_iso3166_2_codes):
-            iso3166_2[subd_code[subd]] = {}
+    #validate all input subdivision codes, return error if empty, invalid format or not found
+    subd_code, subd_error = resolve_subdivision_codes(subd)
+    profile_phase("resolve")
+    if (subd_error is not None):
+        return error_response(subd_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #add respective subdivision data to object, using subdivision code as key
+    return jsonify({code: projected_subdivision(active_dataset(), code, fields) for code in subd_code}), 200
+
+@app.route('/api/hierarchy/<subd>', methods=['GET'])
+@app.route('/hierarchy/<subd>', methods=['GET'])
+@app.route('/api/hierarchy', methods=['GET'])
+@app.route('/hierarchy', methods=['GET'])
+def api_hierarchy(subd="") -> tuple[dict, int]:
+    """
+    Flask route for '/api/hierarchy' path/endpoint. Return the ISO 3166-2 subdivision data of 
+    the children, descendants or ancestors of the inputted subdivision, according to its ISO 
+    3166-2 code, set using the relation query string parameter, children by default. The depth 
+    query string parameter limits the number of levels of descendants or ancestors returned. A 
+    comma separated list of subdivision codes can also be input. If invalid subdivision code, 
+    relation or depth input then return error. Route can accept path with or without trailing 
+    slash.
 
-        #add respective subdivision data to object
-        iso3166_2[subd_code[subd]]= all_iso3166_2[subd_code[subd].split('-')[0]][subd_code[subd]]
+    Parameters
+    ==========
+    :subd: str/list (default="")
+        ISO 3166-2 subdivision code or list of codes.
 
-    return jsonify(iso3166_2), 200
+    Returns
+    =======
+    :iso3166_2: json
+        jsonified response of iso3166-2 data of each relative, per input subdivision code.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid parameter input.
+    """
+    #validate all input subdivision codes, return error if empty, invalid format or not found
+    subd_code, subd_error = resolve_subdivision_codes(subd)
+    if (subd_error is not None):
+        return error_response(subd_error)
+
+    #parse relation and depth query string params, return error if invalid
+    relation = request.args.get('relation', 'children').strip().lower()
+    if (relation not in HIERARCHY_RELATIONS):
+        return error_response(f"Relation query string parameter value must be one of {', '.join(HIERARCHY_RELATIONS)}, got value: {relation}.")
+    depth, depth_error = parse_depth(request.args.get('depth'))
+    if (depth_error is not None):
+        return error_response(depth_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #add the data of each relative of each subdivision to object, using subdivision code as key
+    return jsonify({code: {relative: projected_subdivision(active_dataset(), relative, fields) 
+        for relative in subdivision_relatives(code, relation, depth)} for code in subd_code}), 200
 
 @app.route('/api/name/<subdivision_name>', methods=['GET'])
 @app.route('/name/<subdivision_name>', methods=['GET'])
@@ -243,12 +2158,12 @@ def api_subdivision_name(subdivision_name="") -> tuple[dict, int]:
     """
     Flask route for '/api/name' path/endpoint. Return all ISO 3166-2 subdivision data attributes and 
     values for inputted subdivision name/names. When searching for the sought subdivision name, a 
-    fuzzy search algorithm is used via "thefuzz" package that finds the exact match within the 
-    dataset, if this returns nothing then the dataset is searched for subdivision names that match 
-    90% or more, the first match will then be returned. If no matching subdivision name found or 
-    input is empty then return an error. Route can accept path with or without trailing slash.
+    fuzzy search is used via a trigram index of all subdivision names that finds the exact match within 
+    the dataset, if this returns nothing then all subdivision names that match 90% or more are returned. 
+    If the likeness query string parameter is input then every subdivision name that matches at or 
+    above this score is returned. If no matching subdivision name found or input is empty then return 
+    an error. Route can accept path with or without trailing slash.
 
-    **mention likeenss parameter here
     Parameters
     ==========
     :subdivision_name: str/list (default="")
@@ -262,141 +2177,24 @@ def api_subdivision_name(subdivision_name="") -> tuple[dict, int]:
         response status code. 200 is a successful response, 400 means there was an 
         invalid parameter input. 
     """
-    #if no input parameters set then raise and return error
-    if (subdivision_name == ""):
-        error_message["message"] = "The subdivision name input parameter cannot be empty."
-        error_message['path'] = request.url
-        return jsonify(error_message), 400
-    
-    def is_float(string):
-        """ Return if input is float or not - used for search likeness query string parameter. """
-        try: 
-            float(string) 
-            return True 
-        except ValueError: 
-            return False
-    
     #parse likeness query string param, used as a % cutoff for likeness of subdivision names, raise error if invalid type or value input
-    search_likeness = request.args.get('likeness')
-    if not (search_likeness is None):
-        if not (is_float(search_likeness)):
-            error_message["message"] = "Likeness query string parameter value must be between 0 - 1 or 1 - 100: {}.".format(search_likeness)
-            error_message['path'] = request.url
-            return jsonify(error_message), 400   
-        if (float(search_likeness) > 1 and float(search_likeness) <= 100): #divide input by 100 if % value input
-            search_likeness = float(search_likeness) / 100 
-        if (float(search_likeness) < 0):
-            error_message["message"] = "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: {}.".format(search_likeness)
-            error_message['path'] = request.url
-            return jsonify(error_message), 400   
-        else:
-            search_likeness = float(search_likeness)
-
-    #decode any unicode or accent characters using utf-8 encoding, lower case and remove additional whitespace
-    subdivision_name_ = unidecode(unquote_plus(subdivision_name).lower().replace(' ', ''))
-
-    #object to store the subdivision name and its corresponding alpha-2 code and subdivision code (name: alpha_2, code: subd_code)
-    all_subdivision_names = {}
-
-    #list to store all subdivision names for all countries
-    all_subdivision_names_list = []
-
-    #list of subdivision names with comma in them from dataset, required if multiple subdivision names are input e.g - Murcia, Regiónde, Newry, Mourne and Down
-    subdivision_name_exceptions = []
-
-    #separate list to keep track if any of input subdivision names are exceptions (have comma in them)
-    subdivision_name_exceptions_input = []
-
-    #iterate over all ISO 3166-2 subdivision data, appending each subdivision's name, country code and 
-    #subdivision code to object that will be used to search through, lowercase, remove whitespace and any accents and special characters,
-    #if a comma is in the official subdivision name then append to the exception list only if comma is in input parameter
-    for alpha_2 in all_iso3166_2:
-        for subd in all_iso3166_2[alpha_2]:
-
-            #append object of the subdivision's alpha-2 code and subdivision code with its name as the key
-            if not (unidecode(all_iso3166_2[alpha_2][subd]["name"].lower().replace(' ', '')) in list(all_subdivision_names.keys())):
-                all_subdivision_names[unidecode(unquote_plus(all_iso3166_2[alpha_2][subd]["name"]).lower().replace(' ', ''))]  = []
-                all_subdivision_names[unidecode(unquote_plus(all_iso3166_2[alpha_2][subd]["name"]).lower().replace(' ', ''))].append({"alpha2": alpha_2, "code": subd})
-            else:
-                all_subdivision_names[unidecode(unquote_plus(all_iso3166_2[alpha_2][subd]["name"]).lower().replace(' ', ''))].append({"alpha2": alpha_2, "code": subd})
-
-            #append subdivision name to list of subdivision names for searching
-            all_subdivision_names_list.append(unidecode(unquote_plus(all_iso3166_2[alpha_2][subd]["name"]).lower().replace(' ', '')))
-
-            #if comma in official subdivision name, append to the exception list, which is needed if a comma separated list of names are input
-            if (',' in subdivision_name_):
-                if (',' in unidecode(all_iso3166_2[alpha_2][subd]["name"].lower().replace(' ', ''))):
-                    subdivision_name_exceptions.append(unidecode(all_iso3166_2[alpha_2][subd]["name"].lower().replace(' ', '')))      
-                    
-    #only execute subdivision name exception code if comma is in input param
-    if (',' in subdivision_name_):
-        #sort exceptions list alphabetically 
-        subdivision_name_exceptions.sort()
-
-        #temp var to track input subdivision name 
-        temp_subdivision_name = subdivision_name_
-
-        #iterate over all subdivision names exceptions (those with a comma in them), append to separate list if input param is one
-        for sub_name in subdivision_name_exceptions:
-            if (sub_name in temp_subdivision_name):
-                subdivision_name_exceptions_input.append(sub_name)
-                #remove current subdivision name from temp var, strip of commas
-                subdivision_name_ = temp_subdivision_name.replace(sub_name, '').strip(',')
-
-    #sort all subdivision names codes
-    subdivision_names = sorted([subdivision_name_])
-    
-    #split multiple subdivision names into list
-    subdivision_names = subdivision_names[0].split(',')
-
-    #extend subdivision names list if any subdivision name exceptions are present in input param
-    if (subdivision_name_exceptions_input != []):
-        subdivision_names.extend(subdivision_name_exceptions_input)
-
-    #object to keep track of matching subdivisions and their data
-    output_subdivisions =  {}
-
-    #list of matching subdivision names
-    subdivision_name_matches = []
-    
-    #iterate over all input subdivision names, and find matching subdivision in data object, using thefuzz library
-    for subdiv in subdivision_names: 
+    search_likeness, likeness_error = parse_likeness(request.args.get('likeness'))
+    if (likeness_error is not None and subdivision_name != ""):
+        return error_response(likeness_error, request.url)
 
-        #using thefuzz library, get all subdivisions that match the input subdivision names
-        all_subdivision_name_matches = process.extract(subdiv, all_subdivision_names_list, scorer=fuzz.ratio) #partial_ratio
-
-        #iterate over all found subdivision matches, look for exact matches, if none found then look for ones that have likeness score>=90
-        for match in all_subdivision_name_matches:
-            #use default likeness score of 100 (exact) followed by 90 if no exact matches found
-            if (search_likeness != "" and search_likeness == None):
-                if (match[1] == 100):
-                    subdivision_name_matches.append(match[0])
-                    break #exact match found so break to next iteration
-                elif (match[1] >= 90):
-                    subdivision_name_matches.append(match[0])
-            #using a custom likeness score according to input query parameter
-            else:
-                if (match[1] >= search_likeness * 100):
-                    subdivision_name_matches.append(match[0])
-
-        #iterate over all subdivision name matches and get corresponding subdivision object from dataset
-        for subd in range(0, len(subdivision_name_matches)): 
-            for obj in range(0, len(all_subdivision_names[subdivision_name_matches[subd]])):
-                #create temp object for subdivision and its data attributes, with its subdivision code as key
-                subdivision = all_iso3166_2[all_subdivision_names[subdivision_name_matches[subd]][obj]["alpha2"]][all_subdivision_names[subdivision_name_matches[subd]][obj]["code"]]
-                #append subdivision data and its attributes to the output object
-                output_subdivisions[all_subdivision_names[subdivision_name_matches[subd]][obj]["code"]] = subdivision
+    #get the codes of all subdivisions matching the input names, return error if empty or no matching subdivisions found
+    matching_subdivisions, name_error = resolve_subdivision_names(subdivision_name, search_likeness)
+    profile_phase("resolve")
+    if (name_error is not None):
+        return error_response(name_error, request.url)
 
-    #return error if no matching subdivisions found from input name    
-    if (output_subdivisions == {}):
-        error_message["message"] = "No valid subdivision found for input name: {}. Try using the query string parameter '?likeness' and reduce the likeness score to expand the"\
-            " search space, e.g '?likeness=0.3' will return subdivisions that have a 30% match to the input name.".format(subdivision_name)
-        error_message['path'] = request.url
-        return jsonify(error_message), 400  
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error, request.url)
 
     #return object of matching subdivisions and their data
-    else:
-        return jsonify(output_subdivisions), 200
+    return jsonify({subd: projected_subdivision(active_dataset(), subd, fields) for subd in matching_subdivisions}), 200
 
 @app.route('/api/country_name/<country_name>', methods=['GET'])
 @app.route('/country_name/<country_name>', methods=['GET'])
@@ -423,114 +2221,503 @@ def api_country_name(country_name="") -> tuple[dict, int]:
         response status code. 200 is a successful response, 400 means there was an 
         invalid parameter input. 
     """
-    #initialise vars
-    iso3166_2 = {}
-    alpha2_code = []
-    names = []
+    #resolve all input country names into their alpha-2 code, return error if empty or invalid country name
+    alpha2_code, name_error = resolve_country_names(country_name)
+    profile_phase("resolve")
+    if (name_error is not None):
+        return error_response(name_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #join the cached JSON subdivision data of each country, using its alpha-2 code as key
+    return Response(serialize_countries(active_dataset(), alpha2_code, fields), mimetype="application/json"), 200
+
+@app.route('/api/autocomplete', methods=['GET'])
+@app.route('/autocomplete', methods=['GET'])
+def api_autocomplete() -> tuple[dict, int]:
+    """
+    Flask route for '/api/autocomplete' path/endpoint. Return the ranked completions of the q 
+    query string parameter, i.e the subdivisions whose name or localName, or a word in it, starts 
+    with the input, ignoring case, accents and punctuation, for type-ahead search. The limit 
+    query string parameter sets the max number of completions and the country query string 
+    parameter restricts the completions to 1 or more ISO 3166-1 alpha-2, alpha-3 or numeric 
+    country codes. If empty q, or invalid limit or country input then return error. Route can 
+    accept path with or without trailing slash.
 
-    #decode any unicode or accent characters using utf-8 encoding, lower case and remove additional whitespace
-    name = unidecode(unquote_plus(country_name)).replace('%20', ' ').title()
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :completions: json
+        jsonified array of the code, name, localName and matching name of each completion, ranked.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid parameter input.
+    """
+    #normalize the q query string param, return error if empty
+    prefix = normalize_autocomplete_text(request.args.get('q', ''))
+    if (prefix == ""):
+        return error_response("The q query string parameter must contain at least one letter or digit.")
+
+    #parse the limit query string param, the max number of completions to return
+    limit = request.args.get('limit', str(AUTOCOMPLETE_DEFAULT_LIMIT)).strip()
+    if not (limit.isdecimal() and 1 <= int(limit) <= AUTOCOMPLETE_MAX_LIMIT):
+        return error_response(f"Limit query string parameter value must be an integer between 1 and {AUTOCOMPLETE_MAX_LIMIT}, got value: {limit}.")
+
+    #parse the country query string param, used to restrict the completions to the subdivisions of the input countries
+    alpha_code = None
+    if (request.args.get('country') is not None):
+        alpha_code, alpha_error = resolve_alpha_codes(request.args.get('country'))
+        if (alpha_error is not None):
+            return error_response(alpha_error)
+        alpha_code = tuple(sorted(set(alpha_code)))
+
+    dataset = active_dataset()
+    return jsonify([{"code": subd, "name": dataset.subdivision_codes[subd][1]["name"], "localName": dataset.subdivision_codes[subd][1]["localName"], 
+        "match": value} for subd, value in autocomplete_subdivisions(dataset, prefix, int(limit), alpha_code)]), 200
+
+@app.route('/api/nearest', methods=['GET'])
+@app.route('/nearest', methods=['GET'])
+def api_nearest() -> tuple[dict, int]:
+    """
+    Flask route for '/api/nearest' path/endpoint. Return the ISO 3166-2 subdivision data of the 
+    subdivisions nearest to the input lat and lng query string parameters, along with the 
+    great-circle distance in km from the coordinates to each subdivision's latLng, ordered closest
+    first. The k query string parameter sets the number of subdivisions returned, 1 by default, 
+    the country query string parameter restricts the search to 1 or more ISO 3166-1 alpha-2, 
+    alpha-3 or numeric country codes and the radius query string parameter sets the max distance 
+    in km. If invalid coordinates, k, country or radius input then return error. Route can accept 
+    path with or without trailing slash.
 
-    #set path for current request url 
-    error_message['path'] = request.base_url
+    Parameters
+    ==========
+    None
 
-    #if no input parameters set then return error message
-    if (name == ""):
-        error_message["message"] = "The country name input parameter cannot be empty."
-        return jsonify(error_message), 400
-
-    #path can accept multiple country names, separated by a comma but several
-    #countries contain a comma already in their name. If multiple country names input,  
-    #separate by comma, cast to a sorted list, unless any of the names are in the below list
-    name_comma_exceptions = ["BOLIVIA, PLURINATIONAL STATE OF",
-                    "BONAIRE, SINT EUSTATIUS AND SABA",
-                    "CONGO, DEMOCRATIC REPUBLIC OF THE",
-                    "IRAN, ISLAMIC REPUBLIC OF",
-                    "KOREA, DEMOCRATIC PEOPLE'S REPUBLIC OF",
-                    "KOREA, REPUBLIC OF",
-                    "MICRONESIA, FEDERATED STATES OF",
-                    "MOLDOVA, REPUBLIC OF",
-                    "PALESTINE, STATE OF",
-                    "SAINT HELENA, ASCENSION AND TRISTAN DA CUNHA",
-                    "TAIWAN, PROVINCE OF CHINA",
-                    "TANZANIA, UNITED REPUBLIC OF",
-                    "VIRGIN ISLANDS, BRITISH",
-                    "VIRGIN ISLANDS, U.S.",
-                    "VENEZUELA, BOLIVARIAN REPUBLIC OF"]
-    
-    #check if input country is in above list, if not add to sorted comma separated list    
-    if (name.upper() in name_comma_exceptions):
-        names = [name]
+    Returns
+    =======
+    :iso3166_2: json
+        jsonified response of iso3166-2 data and distance of each of the nearest subdivisions.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid parameter input.
+    """
+    #parse the lat and lng query string params, return error if missing or invalid
+    if (request.args.get('lat') is None or request.args.get('lng') is None):
+        return error_response("The lat and lng query string parameters are required, e.g /api/nearest?lat=53.35&lng=-6.26.")
+    lat, lat_error = parse_coordinate("lat", request.args.get('lat'), 90)
+    if (lat_error is not None):
+        return error_response(lat_error)
+    lng, lng_error = parse_coordinate("lng", request.args.get('lng'), 180)
+    if (lng_error is not None):
+        return error_response(lng_error)
+
+    #parse the k query string param, the number of nearest subdivisions to return
+    k = request.args.get('k', '1').strip()
+    if not (k.isdecimal() and 1 <= int(k) <= NEAREST_MAX_K):
+        return error_response(f"K query string parameter value must be an integer between 1 and {NEAREST_MAX_K}, got value: {k}.")
+
+    #parse the country query string param, used to restrict the search to the subdivisions of the input countries
+    alpha_code = None
+    if (request.args.get('country') is not None):
+        alpha_code, alpha_error = resolve_alpha_codes(request.args.get('country'))
+        if (alpha_error is not None):
+            return error_response(alpha_error)
+
+    #parse the radius query string param, the max distance in km of the nearest subdivisions
+    radius, radius_error = parse_radius(request.args.get('radius'))
+    if (radius_error is not None):
+        return error_response(radius_error)
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #add the data and distance of each of the nearest subdivisions to object, using subdivision code as key, keeping them 
+    #ordered closest first rather than sorting the codes, each subdivision's attributes are still sorted
+    return Response(serialize_json({subd: dict(sorted(dict(projected_subdivision(active_dataset(), subd, fields), distance=round(distance, 3)).items())) 
+        for subd, distance in nearest_subdivisions(lat, lng, int(k), alpha_code, radius)}, sort_keys=False), mimetype="application/json"), 200
+
+#max number of coordinates per request to the bulk '/api/nearest' endpoint
+bulk_nearest_max_points = int(os.environ.get("ISO3166_2_BULK_NEAREST_MAX_POINTS", 1000000))
+
+@app.route('/api/nearest', methods=['POST'])
+@app.route('/nearest', methods=['POST'])
+def api_nearest_bulk() -> Response:
+    """
+    Flask route for bulk '/api/nearest' path/endpoint. Reverse geocode a batch of coordinates, 
+    sent as a JSON object of equal length lat and lng arrays, e.g {"lat": [53.35, 48.86], "lng": 
+    [-6.26, 2.35]}, into the code of, and distance in km to, the nearest subdivision to each 
+    coordinate. The results are streamed as newline delimited JSON, one line per coordinate in 
+    input order, e.g {"code":"IE-D","distance":0.0}, using bulk_nearest_subdivisions. The country 
+    and radius query string parameters restrict the search as for a single coordinate. Return 
+    error if the request body or a coordinate is invalid, or there are too many coordinates.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :nearest: flask.Response
+        streamed NDJSON response of the nearest subdivision to each coordinate.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid request body or parameter input.
+    """
+    #parse JSON request body, return error if not an object of equal length lat and lng arrays
+    coordinates = request.get_json(silent=True)
+    if not (isinstance(coordinates, dict) and isinstance(coordinates.get("lat"), list) and isinstance(coordinates.get("lng"), list) 
+        and len(coordinates["lat"]) == len(coordinates["lng"])):
+        return error_response("The request body must be a JSON object of equal length lat and lng arrays, e.g {\"lat\": [53.35], \"lng\": [-6.26]}.")
+    lats, lngs = coordinates["lat"], coordinates["lng"]
+    if (len(lats) > bulk_nearest_max_points):
+        return error_response(f"The request cannot contain more than {bulk_nearest_max_points} coordinates, got {len(lats)}.")
+
+    #validate each coordinate is a number within range, return error with the index of the first invalid coordinate
+    for index, (lat, lng) in enumerate(zip(lats, lngs)):
+        if not (type(lat) in (int, float) and type(lng) in (int, float) and -90 <= lat <= 90 and -180 <= lng <= 180):
+            return error_response(f"Invalid coordinate at index {index}: lat must be a number between -90 and 90 and lng between -180 and 180, "
+                f"got {app.json.dumps(lat)}, {app.json.dumps(lng)}.")
+
+    #parse the country and radius query string params, used to restrict the search
+    alpha_code = None
+    if (request.args.get('country') is not None):
+        alpha_code, alpha_error = resolve_alpha_codes(request.args.get('country'))
+        if (alpha_error is not None):
+            return error_response(alpha_error)
+    radius, radius_error = parse_radius(request.args.get('radius'))
+    if (radius_error is not None):
+        return error_response(radius_error)
+
+    def nearest_lines():
+        """ Stream a line per coordinate, yielding the lines of each tile of coordinates as one chunk. """
+        lines = []
+        for subd, distance in bulk_nearest_subdivisions(lats, lngs, alpha_code, radius):
+            lines.append(b'{"code":null,"distance":null}\n' if subd is None else f'{{"code":"{subd}","distance":{round(distance, 3)}}}\n'.encode())
+            if (len(lines) == BULK_NEAREST_TILE_SIZE):
+                yield b"".join(lines)
+                lines = []
+        yield b"".join(lines)
+
+    #keep the request context while streaming, so every coordinate is looked up in the dataset pinned to this request
+    return ndjson_response(stream_with_context(nearest_lines()))
+
+def batch_result(lookup, status: int=200, data: bytes=None, message: str=None) -> bytes:
+    """
+    Serialize the result of a single '/api/batch' lookup into a JSON object, including the 
+    lookup's type and value, its status code and either its data or error message.
+
+    Parameters
+    ==========
+    :lookup: dict
+        input lookup.
+    :status: int (default=200)
+        status code of the lookup, 200 if successful else 400.
+    :data: bytes (default=None)
+        utf-8 encoded JSON data of the matching countries/subdivisions, if successful.
+    :message: str (default=None)
+        error message, if unsuccessful.
+
+    Returns
+    =======
+    :result: bytes
+        utf-8 encoded JSON object of the lookup's result.
+    """
+    result = {"status": status, "type": lookup.get("type"), "value": lookup.get("value")} if isinstance(lookup, dict) \
+        else {"status": status, "type": None, "value": None}
+    if (message is not None):
+        result["message"] = message
+    result = app.json.dumps(result, separators=(",", ":")).encode("utf-8")
+
+    #the data is the first key of the sorted result object, the serialized data is inserted rather than re-encoded
+    if (data is not None):
+        result = b'{"data":' + data + b"," + result[1:]
+    return result
+
+def batch_lookup(lookup, fields: tuple=None) -> bytes:
+    """
+    Resolve a single '/api/batch' lookup using the same logic as its respective endpoint, i.e 
+    '/api/alpha', '/api/subdivision', '/api/name' or '/api/country_name', returning its 
+    serialized result. Errors are returned as part of the result.
+
+    Parameters
+    ==========
+    :lookup: dict
+        lookup object with a type, value and, for subdivision name lookups, an optional likeness.
+    :fields: tuple (default=None)
+        sorted subdivision attributes to project the data down to, or None for all attributes.
+
+    Returns
+    =======
+    :result: bytes
+        utf-8 encoded JSON object of the lookup's result.
+    """
+    #return error if lookup isn't an object with a valid type and string value
+    if not (isinstance(lookup, dict)) or (lookup.get("type") not in batch_lookup_types):
+        return batch_result(lookup, 400, message="Each lookup must be an object with a type, one of {}, and a value, "\
+            "e.g {{\"type\": \"alpha\", \"value\": \"FR\"}}.".format(", ".join(batch_lookup_types)))
+    if not (isinstance(lookup.get("value"), str)):
+        return batch_result(lookup, 400, message="The lookup value must be a string: {}.".format(lookup.get("value")))
+
+    #resolve the value into the alpha-2 codes of the matching countries, or codes of the matching subdivisions
+    if (lookup["type"] == "name"):
+        likeness, error = parse_likeness(str(lookup["likeness"]) if lookup.get("likeness") is not None else None)
+        if (error is not None):
+            return batch_result(lookup, 400, message=error)
+        codes, error = resolve_subdivision_names(lookup["value"], likeness)
     else:
-        names = sorted(name.split(','))
-    
-    #list of country name exceptions that are converted into their more common name
-    name_converted = {"UAE": "United Arab Emirates", "Brunei": "Brunei Darussalam", "Bolivia": "Bolivia, Plurinational State of", 
-                      "Bosnia": "Bosnia and Herzegovina", "Bonaire": "Bonaire, Sint Eustatius and Saba", "DR Congo": 
-                      "Congo, the Democratic Republic of the", "Ivory Coast": "Côte d'Ivoire", "Cape Verde": "Cabo Verde", 
-                      "Cocos Islands": "Cocos (Keeling) Islands", "Falkland Islands": "Falkland Islands (Malvinas)", 
-                      "Micronesia": "Micronesia, Federated States of", "United Kingdom": "United Kingdom of Great Britain and Northern Ireland",
-                      "South Georgia": "South Georgia and the South Sandwich Islands", "Iran": "Iran, Islamic Republic of",
-                      "North Korea": "Korea, Democratic People's Republic of", "South Korea": "Korea, Republic of", 
-                      "Laos": "Lao People's Democratic Republic", "Moldova": "Moldova, Republic of", "Saint Martin": "Saint Martin (French part)",
-                      "Macau": "Macao", "Pitcairn Islands": "Pitcairn", "South Georgia": "South Georgia and the South Sandwich Islands",
-                      "Heard Island": "Heard Island and McDonald Islands", "Palestine": "Palestine, State of", 
-                      "Saint Helena": "Saint Helena, Ascension and Tristan da Cunha", "St Helena": "Saint Helena, Ascension and Tristan da Cunha",              
-                      "Saint Kitts": "Saint Kitts and Nevis", "St Kitts": "Saint Kitts and Nevis", "St Vincent": "Saint Vincent and the Grenadines", 
-                      "St Lucia": "Saint Lucia", "Saint Vincent": "Saint Vincent and the Grenadines", "Russia": "Russian Federation", 
-                      "Sao Tome and Principe":" São Tomé and Príncipe", "Sint Maarten": "Sint Maarten (Dutch part)", "Syria": "Syrian Arab Republic", 
-                      "Svalbard": "Svalbard and Jan Mayen", "French Southern and Antarctic Lands": "French Southern Territories", "Turkey": "Türkiye", 
-                      "Taiwan": "Taiwan, Province of China", "Tanzania": "Tanzania, United Republic of", "USA": "United States of America", 
-                      "United States": "United States of America", "Vatican City": "Holy See", "Vatican": "Holy See", "Venezuela": 
-                      "Venezuela, Bolivarian Republic of", "Virgin Islands, British": "British Virgin Islands"}
-    
-    #iterate over list of names, convert country names from name_converted dict, if applicable
-    for name_ in range(0, len(names)):
-        if (names[name_].title() in list(name_converted.keys())):
-            names[name_] = name_converted[names[name_]]
+        codes, error = batch_lookup_types[lookup["type"]](lookup["value"])
+    profile_phase("resolve")
+    if (error is not None):
+        return batch_result(lookup, 400, message=error)
+
+    #serialize the data of the matching countries or subdivisions, as returned by the respective endpoint
+    if (lookup["type"] in ("alpha", "country_name")):
+        data = serialize_countries(active_dataset(), codes, fields).rstrip(b"\n")
+    else:
+        data = serialize_json({subd: projected_subdivision(active_dataset(), subd, fields) for subd in codes}).rstrip(b"\n")
+    return batch_result(lookup, data=data)
+
+#resolver of each type of '/api/batch' lookup, shared with the respective endpoint
+batch_lookup_types = {"alpha": resolve_alpha_codes, "subdivision": resolve_subdivision_codes, 
+    "name": resolve_subdivision_names, "country_name": resolve_country_names}
+
+#max number of lookups in a single '/api/batch' request, can be set using an environment variable
+batch_max_lookups = int(os.environ.get("ISO3166_2_BATCH_MAX_LOOKUPS", 10000))
+
+#max number of name lookups with a likeness below the default of 90 in a single '/api/batch' request, which are limited 
+#separately as each can score and return thousands of subdivisions, e.g a likeness of 0 takes ~60ms per lookup, so the 
+#request finishes well within the gunicorn worker timeout (30s), can be set using an environment variable
+batch_max_fuzzy_lookups = int(os.environ.get("ISO3166_2_BATCH_MAX_FUZZY_LOOKUPS", 100))
+
+def is_fuzzy_lookup(lookup) -> bool:
+    """ Return whether the input '/api/batch' lookup is a name lookup with a likeness below the default of 90. """
+    if not (isinstance(lookup, dict)) or (lookup.get("type") != "name") or (lookup.get("likeness") is None):
+        return False
+    likeness, _ = parse_likeness(str(lookup["likeness"]))
+    return likeness is not None and likeness < 0.9
+
+@app.route('/api/batch', methods=['POST'])
+@app.route('/batch', methods=['POST'])
+def api_batch() -> tuple[dict, int]:
+    """
+    Flask route for '/api/batch' path/endpoint. Resolve a JSON array of typed lookups in a single 
+    request, each lookup being an object with a type - one of alpha, subdivision, name or country_name - 
+    and a value, as input to the respective endpoint, e.g [{"type": "alpha", "value": "FR"}, {"type": 
+    "name", "value": "Derry", "likeness": 0.8}]. The results are returned in input order, each with 
+    its status code and either its data or error message, so an invalid lookup doesn't fail the 
+    whole request. Repeated lookups within the batch are only resolved once. The fields query 
+    string parameter is applied to all lookups. Return error if the request body isn't a JSON array 
+    or contains too many lookups, or too many name lookups with a likeness below the default. 
 
-    #remove all whitespace in any of the country names
-    names = [name_.strip(' ') for name_ in names]
+    Parameters
+    ==========
+    None
 
-    #get list of available country names from iso3166 library, remove whitespace
-    all_names_no_space = [name_.strip(' ') for name_ in list(iso3166.countries_by_name.keys())]
-    
-    #iterate over all input country names, get corresponding 2 letter alpha-2 code
-    for name_ in names:
-
-        #using thefuzz library, get all countries that match the input country name
-        all_country_name_matches = process.extract(name_.upper(), all_names_no_space)
-        name_matches = []
-        
-        #iterate over all found country matches, look for exact matches, if none found then look for ones that have likeness score>=90
-        for match in all_country_name_matches:
-            #use default likeness score of 100 (exact) followed by 90 if no exact matches found
-            if (match[1] == 100):
-                name_matches.append(match[0])
-                break
-            elif (match[1] >= 90):
-                name_matches.append(match[0])
-                break
-            else:
-                #return error if country name not found
-                error_message["message"] = "Invalid country name input: {}.".format(name)
-                return jsonify(error_message), 400                
-
-        #use iso3166 package to find corresponding alpha-2 code from its name
-        alpha2_code.append(iso3166.countries_by_name[name_matches[0].upper()].alpha2)
-    
-    #get country data from ISO 3166-2 object, using alpha-2 code
-    for code in alpha2_code:
-        iso3166_2[code] = all_iso3166_2[code]
+    Returns
+    =======
+    :results: json
+        JSON array of the result of each lookup, in input order.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid request body or parameter input. 
+    """
+    #parse JSON request body, return error if not an array
+    lookups = request.get_json(silent=True)
+    if not (isinstance(lookups, list)):
+        return error_response("The batch request body must be a JSON array of lookups, e.g [{\"type\": \"alpha\", \"value\": \"FR\"}].")
+    if (len(lookups) > batch_max_lookups):
+        return error_response(f"The batch request cannot contain more than {batch_max_lookups} lookups, got {len(lookups)}.")
+    fuzzy_lookups = sum(map(is_fuzzy_lookup, lookups))
+    if (fuzzy_lookups > batch_max_fuzzy_lookups):
+        return error_response(f"The batch request cannot contain more than {batch_max_fuzzy_lookups} name lookups with a likeness below 90, got {fuzzy_lookups}.")
+
+    #parse fields query string param, used to project each subdivision's data down to the input attributes
+    fields, fields_error = parse_fields_param()
+    if (fields_error is not None):
+        return error_response(fields_error)
+
+    #resolve each unique lookup once, keyed by its sorted JSON encoding, reusing its result for repeated lookups
+    results = {}
+    output = []
+    for lookup in lookups:
+        key = app.json.dumps(lookup)
+        if (key not in results):
+            results[key] = batch_lookup(lookup, fields)
+        output.append(results[key])
+
+    return Response(b"[" + b",".join(output) + b"]\n", mimetype="application/json"), 200
+
+#annotation columns appended to each row of the '/api/enrich' CSV, the matching subdivisions' attributes and any error message
+ENRICH_COLUMNS = ("iso3166_2_code", "iso3166_2_name", "iso3166_2_type", "iso3166_2_parentCode", "iso3166_2_error")
+
+#min size in bytes of each chunk of the streamed '/api/enrich' CSV response
+ENRICH_CHUNK_SIZE = 64 * 1024
+
+#max number of subdivisions annotated per row of the '/api/enrich' CSV, a low likeness can match thousands of 
+#subdivisions per value, e.g ?likeness=0 matches every name, which would otherwise all be joined into a single cell
+ENRICH_MAX_MATCHES = 10
+
+def read_lines(stream, chunk_size: int=ENRICH_CHUNK_SIZE):
+    """
+    Yield each utf-8 decoded line of the input binary stream, e.g a request body, reading it in 
+    chunks rather than all at once or byte by byte, such that only one chunk is held in memory.
 
-    return jsonify(iso3166_2), 200
+    Parameters
+    ==========
+    :stream: file-like object
+        binary stream to read.
+    :chunk_size: int (default=ENRICH_CHUNK_SIZE)
+        number of bytes read from the stream at a time.
+
+    Returns
+    =======
+    :lines: generator
+        generator of decoded lines, each terminated by a newline except for the last.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += decoder.decode(chunk, final=not chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if not (chunk):
+            if (buffer):
+                yield buffer
+            return
+
+@dataset_cache(maxsize=4096)
+def enrich_row_annotation(dataset: Dataset, value: str, lookup_type: str, search_likeness: float) -> tuple:
+    """
+    Return the annotation columns of a single row of the '/api/enrich' CSV, resolving the value 
+    of its chosen column as a subdivision code or name, using the same logic as the respective 
+    endpoint. If the value matches multiple subdivisions, e.g a name shared by several 
+    subdivisions, their attributes are separated by a semicolon. A name matching more than 
+    ENRICH_MAX_MATCHES subdivisions is annotated with only the closest ones, with a message in 
+    the error column saying the matches were truncated. The annotations of the most recently 
+    repeated values are cached, as CSV columns typically contain many repeated values.
+
+    Parameters
+    ==========
+    :dataset: Dataset
+        dataset in use by the request.
+    :value: str
+        subdivision code or name in the row's chosen column.
+    :lookup_type: str
+        type of value, subdivision (code) or name.
+    :search_likeness: float
+        likeness score between 0 and 1 of matching subdivision names, None for the default.
+
+    Returns
+    =======
+    :annotation: tuple
+        the matching subdivisions' codes, names, types and parent codes, and error message if no match
+        or the matches were truncated.
+    """
+    if (lookup_type == "name"):
+        codes, error = resolve_subdivision_names(value, search_likeness)
+    else:
+        codes, error = resolve_subdivision_codes(value)
+    if (error is not None):
+        return ("", "", "", "", error)
+
+    #keep only the subdivisions whose names are closest to any of the input names, ties broken by code, if too many match
+    truncated_error = ""
+    if (len(codes) > ENRICH_MAX_MATCHES):
+        fuzz = lazy_import("rapidfuzz.fuzz")
+        names = [normalize_subdivision_name(name) for name in unquote_plus(value).split(',')]
+        closest_codes = sorted(codes, key=lambda code: (-max(fuzz.ratio(normalize_subdivision_name(dataset.subdivision_codes[code][1]["name"]), name) 
+            for name in names), code))
+        truncated_error = "Matched {} subdivisions, only the {} closest are included, increase the likeness to narrow the matches.".format(len(codes), ENRICH_MAX_MATCHES)
+        codes = sorted(closest_codes[:ENRICH_MAX_MATCHES])
+
+    subdivisions = [dataset.subdivision_codes[code][1] for code in codes]
+    return (";".join(codes), *(";".join(subdivision[attribute] or "" for subdivision in subdivisions) 
+        for attribute in ("name", "type", "parentCode")), truncated_error)
+
+@app.route('/api/enrich', methods=['POST'])
+@app.route('/enrich', methods=['POST'])
+def api_enrich() -> Response:
+    """
+    Flask route for '/api/enrich' path/endpoint. Annotate an uploaded CSV file, sent as the raw 
+    request body, with the ISO 3166-2 code, name, type and parent code of the subdivision in 
+    its chosen column. The column, set by the column query string parameter as a header name or 
+    0-based index, is resolved as a subdivision code (type=subdivision, the default) or name 
+    (type=name, with an optional likeness), using the same logic as the '/api/subdivision' and 
+    '/api/name' endpoints. The upload is read, and the annotated CSV streamed back, row by row, 
+    so memory use doesn't grow with the size of the file. Rows whose value can't be resolved get 
+    an error message in the iso3166_2_error column rather than failing the whole request. Return 
+    error if invalid parameters, or empty CSV or chosen column not found in its header.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :csv: flask.Response
+        streamed CSV response of the input rows, each with the annotation columns appended.
+    :status_code: int
+        response status code. 200 is a successful response, 400 means there was an 
+        invalid parameter input. 
+    """
+    #parse type and likeness query string params, the type of value in the chosen column and likeness of matching subdivision names
+    lookup_type = request.args.get('type', 'subdivision').lower()
+    if (lookup_type not in ("subdivision", "name")):
+        return error_response("Type query string parameter value must be subdivision or name, got value: {}.".format(lookup_type))
+    search_likeness, likeness_error = parse_likeness(request.args.get('likeness'))
+    if (likeness_error is not None):
+        return error_response(likeness_error)
+
+    #read the CSV from the request body as a stream, decoding it row by row, and get its header
+    rows = csv.reader(read_lines(request.stream))
+    header = next(rows, None)
+    if (header is None):
+        return error_response("The request body must be a CSV file with a header row.")
+
+    #get the index of the chosen column, by header name or 0-based index
+    column = request.args.get('column', '')
+    if (column in header):
+        column_index = header.index(column)
+    elif (column.isdecimal() and int(column) < len(header)):
+        column_index = int(column)
+    else:
+        return error_response("Column query string parameter value must be a column name or index in the CSV header, got value: {}.".format(column))
+
+    def annotated_rows():
+        """ Yield the annotated CSV in chunks of at least ENRICH_CHUNK_SIZE bytes, reading and annotating one row at a time. """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header + list(ENRICH_COLUMNS))
+        for row in rows:
+            value = row[column_index].strip() if column_index < len(row) else ""
+            #pad rows shorter than the header, so the annotations are always under their own columns
+            writer.writerow(row + [""] * (len(header) - len(row)) + list(enrich_row_annotation(active_dataset(), value, lookup_type, search_likeness)))
+            if (buffer.tell() >= ENRICH_CHUNK_SIZE):
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(annotated_rows()), mimetype="text/csv")
 
 @app.route('/api/list_subdivisions', methods=['GET'])
 @app.route('/list_subdivisions', methods=['GET'])
 def api_list_subdivisions() -> tuple[dict, int]:
     """
     Flask route for '/api/list_subdivisions' path/endpoint. Return all ISO 3166 country codes and 
-    a list of just their subdivision codes. Route can accept path with or without trailing slash.
+    a list of just their subdivision codes. If the format query string parameter is ndjson then 
+    the codes are streamed as newline delimited JSON, one line per country or, if the granularity 
+    parameter is subdivision, one line per subdivision. Route can accept path with or without 
+    trailing slash.
     
     Parameters
     ==========
@@ -545,16 +2732,205 @@ def api_list_subdivisions() -> tuple[dict, int]:
     """
     iso3166_2 = {}
 
+    #parse format and granularity query string params, return error if invalid
+    output_format, granularity = parse_stream_params()
+    stream_params_error = invalid_stream_params(output_format, granularity)
+    if (stream_params_error is not None):
+        return error_response(stream_params_error)
+
+    #stream each country's subdivision codes, or each subdivision code, as a separate line, in the same order as the JSON response
+    all_iso3166_2 = active_dataset().all_iso3166_2
+    if (output_format == "ndjson"):
+        if (granularity == "country"):
+            return ndjson_response(serialize_json({country: list(all_iso3166_2[country])}) for country in sorted(all_iso3166_2))
+        return ndjson_response(serialize_json({country: subdivisions}) 
+            for country, subdivisions in subdivision_lines(all_iso3166_2, sort_subdivisions=False))
+
     #iterate through each country code, append its subdivisions to export object
     for country in all_iso3166_2:
-        iso3166_2[country] = []
-        for subdivision in all_iso3166_2[country]:
-            print("iso3166_2[country]", iso3166_2[country])
-            print("subdivision",subdivision)
-            iso3166_2[country].append(subdivision)
+        iso3166_2[country] = list(all_iso3166_2[country])
 
     return jsonify(iso3166_2), 200
 
+#secret token authorizing requests to the '/api/admin' endpoints, which are disabled if it isn't set
+admin_token = os.environ.get("ISO3166_2_ADMIN_TOKEN")
+
+@app.route('/api/admin/reload', methods=['GET', 'POST'])
+@app.route('/admin/reload', methods=['GET', 'POST'])
+def api_admin_reload() -> tuple[dict, int]:
+    """
+    Flask route for '/api/admin/reload' path/endpoint. A POST request starts hot reloading the 
+    dataset in a background thread, using reload_dataset, returning immediately with status code
+    202, or 409 if a reload is already running. A GET request returns the status of the latest 
+    reload. Requests must include the admin token in the Authorization header, e.g 
+    "Authorization: Bearer <token>". Only the worker process serving the request is reloaded, 
+    the snapshot watcher reloads every worker.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :reload_status: json
+        jsonified status of the latest reload: its state (idle, reloading or failed), the version 
+        and source of the current dataset, when it was reloaded, how long it took and any error.
+    :status_code: int
+        response status code. 200 for the status, 202 if the reload was started, 409 if a reload 
+        is already running, 401 if the admin token is invalid and 403 if the admin endpoints are disabled.
+    """
+    #return error if the admin endpoints are disabled or the request's admin token is invalid
+    if not (admin_token):
+        return error_response("The admin endpoints are disabled, set the ISO3166_2_ADMIN_TOKEN environment variable to enable them.", status=403)
+    if not (hmac.compare_digest(request.headers.get("Authorization", "").encode("utf-8"), f"Bearer {admin_token}".encode("utf-8"))):
+        return error_response("Invalid or missing admin token in the Authorization header.", status=401)
+
+    if (request.method == "GET"):
+        return jsonify(reload_status), 200
+    if not (start_reload()):
+        return error_response("A reload of the dataset is already running.", status=409)
+    return jsonify(dict(reload_status, state="reloading")), 202
+
+def metrics_gauges() -> list:
+    """
+    Return the statistics of the API's caches and the current dataset, read when the metrics are 
+    exported: the counters of the subdivision name cache, the country name resolver, if built, 
+    and each of the current dataset's memoized functions, along with the dataset's version and 
+    the startup diagnostics, i.e the time taken to import each dependency and load the dataset.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :gauges: list
+        (name, type, help text, [(labels, value), ...]) of each metric, as input to MetricsRegistry.render.
+    """
+    dataset = current_dataset
+    name_cache_stats = subdivision_name_cache.stats()
+    gauges = [(f"name_cache_{counter}_total", "counter", f"Total number of {counter} of the /api/name result cache.", [({}, name_cache_stats[counter])]) 
+        for counter in ("hits", "misses", "bypasses", "evictions", "expirations", "invalidations")]
+    gauges.append(("name_cache_size", "gauge", "Number of entries in the /api/name result cache.", [({}, name_cache_stats["size"])]))
+
+    #only include the country name resolver's counters once it's been built by the first country name request
+    if (country_name_resolver.cache_info().currsize):
+        resolver_stats = country_name_resolver().stats()
+        gauges.extend([("country_name_exact_hits_total", "counter", "Total number of exactly matched country names.", [({}, resolver_stats["exact_hits"])]),
+            ("country_name_fuzzy_cache_hits_total", "counter", "Total number of fuzzy matched country names served from the cache.", 
+                [({}, resolver_stats["fuzzy_cache_hits"])]),
+            ("country_name_fuzzy_cache_misses_total", "counter", "Total number of country names fuzzy matched against every known name.", 
+                [({}, resolver_stats["fuzzy_cache_misses"])])])
+
+    cache_info = sorted((name, cache.cache_info()) for name, cache in list(dataset.caches.items()))
+    gauges.extend([("dataset_cache_hits_total", "counter", "Total number of hits of each memoized function of the current dataset.", 
+            [({"cache": name}, info.hits) for name, info in cache_info]),
+        ("dataset_cache_misses_total", "counter", "Total number of misses of each memoized function of the current dataset.", 
+            [({"cache": name}, info.misses) for name, info in cache_info]),
+        ("dataset_cache_size", "gauge", "Number of entries of each memoized function of the current dataset.", 
+            [({"cache": name}, info.currsize) for name, info in cache_info]),
+        ("dataset_info", "gauge", "Version and source of the current dataset.", [({"version": dataset.version, "source": dataset.source}, 1)])])
+
+    #startup diagnostics of this process, the lazily imported dependencies are only included once imported on first use
+    gauges.extend([("startup_import_seconds", "gauge", "Time taken to import each dependency at startup.", 
+            [({"module": module_name}, round(import_ms / 1000, 6)) for module_name, import_ms in startup_diagnostics["import_ms"].items()]),
+        ("lazy_import_seconds", "gauge", "Time taken to import each lazily imported dependency on its first use.", 
+            [({"module": module_name}, round(import_ms / 1000, 6)) for module_name, import_ms in sorted(startup_diagnostics["lazy_import_ms"].items())]),
+        ("startup_dataset_load_seconds", "gauge", "Time taken to load the dataset at startup, by its source.", 
+            [({"source": startup_diagnostics["dataset_source"]}, round(startup_diagnostics["dataset_load_ms"] / 1000, 6))])])
+    return gauges
+
+@app.route('/metrics', methods=['GET'])
+@app.route('/api/metrics', methods=['GET'])
+def api_metrics() -> Response:
+    """
+    Flask route for '/metrics' path/endpoint. Return the metrics of the requests served by this 
+    process, in the Prometheus text format: the number of requests and errors by endpoint and 
+    status code, histograms of the latency, response size and, for the endpoints that fuzzy 
+    match names, the number of candidates scored per request, along with the statistics of the 
+    API's caches. Each gunicorn worker process exports its own metrics.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :metrics: flask.Response
+        metrics in the Prometheus text format, status code 200.
+    """
+    return Response(metrics.render(metrics_gauges()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route('/api/profiles', methods=['GET'])
+@app.route('/profiles', methods=['GET'])
+def api_profiles() -> tuple[dict, int]:
+    """
+    Flask route for '/api/profiles' path/endpoint. Return a summary of each of the latest requests 
+    profiled by this process, most recent first: its profile id, method, path, endpoint, status 
+    code, when it was profiled and the duration of each of its phases. A request is profiled if 
+    it has the profile token in its X-Profile-Token header, set using the ISO3166_2_PROFILE_TOKEN 
+    environment variable, which requests to this endpoint must also include.
+
+    Parameters
+    ==========
+    None
+
+    Returns
+    =======
+    :profiles: json
+        jsonified summary of each kept profile.
+    :status_code: int
+        response status code. 200 is a successful response, 401 if the profile token is invalid 
+        and 403 if profiling is disabled.
+    """
+    #return error if profiling is disabled or the request's profile token is invalid
+    if not (profile_token):
+        return error_response("Profiling is disabled, set the ISO3166_2_PROFILE_TOKEN environment variable to enable it.", status=403)
+    if not (valid_profile_token()):
+        return error_response("Invalid or missing profile token in the X-Profile-Token header.", status=401)
+    return jsonify(profiler.profiles()), 200
+
+@app.route('/api/profiles/<int:profile_id>', methods=['GET'])
+@app.route('/profiles/<int:profile_id>', methods=['GET'])
+def api_profile(profile_id: int) -> Response:
+    """
+    Flask route for '/api/profiles/<id>' path/endpoint. Return the cProfile stats of the profiled 
+    request with the input profile id, as a pstats file, loadable using pstats.Stats or tools 
+    such as snakeviz, or, if the format query string parameter is text, as text listing the 
+    functions with the highest cumulative time. Requests must include the profile token in 
+    their X-Profile-Token header.
+
+    Parameters
+    ==========
+    :profile_id: int
+        id of the profile, as returned in the X-Profile-Id header of the profiled request.
+
+    Returns
+    =======
+    :stats: flask.Response
+        pstats file or text of the profile's stats, status code 200.
+    :status_code: int
+        response status code. 200 is a successful response, 400 for an invalid format, 404 if the 
+        profile isn't kept or was only timed, 401 if the profile token is invalid and 403 if 
+        profiling is disabled.
+    """
+    #return error if profiling is disabled or the request's profile token is invalid
+    if not (profile_token):
+        return error_response("Profiling is disabled, set the ISO3166_2_PROFILE_TOKEN environment variable to enable it.", status=403)
+    if not (valid_profile_token()):
+        return error_response("Invalid or missing profile token in the X-Profile-Token header.", status=401)
+
+    output_format = request.args.get("format", "pstats")
+    if (output_format not in ("pstats", "text")):
+        return error_response("Invalid format query string parameter value, must be pstats or text: {}.".format(output_format))
+    stats = profiler.stats(profile_id, output_format)
+    if (stats is None):
+        return error_response("No profile with cProfile stats found for id: {}.".format(profile_id), status=404)
+
+    if (output_format == "text"):
+        return Response(stats, mimetype="text/plain")
+    return Response(stats, mimetype="application/octet-stream", headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.pstats"})
+
 @app.errorhandler(404)
 def not_found(e) -> tuple[dict, int]:
     """
@@ -585,5 +2961,6 @@ def not_found(e) -> tuple[dict, int]:
     return render_template("404.html", path=request.url), 404
 
 if __name__ == '__main__':
-    #run Flask app 
+    #run Flask app, reloading the dataset whenever the snapshot changes if the watch interval is set
+    start_snapshot_watcher()
     app.run(debug=True)
\ No newline at end of file
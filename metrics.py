@@ -0,0 +1,210 @@
+from bisect import bisect_left
+import threading
+import weakref
+
+#########################################################################################################################
+# In-process metrics of the requests served by the API, exported in the Prometheus text format by the /metrics endpoint.
+# Every request is counted, and its latency, response size and fuzzy matching work observed in histograms, per endpoint.
+# Each thread records into its own shard of counters, so recording a request never takes a lock or contends with the
+# threads serving other requests, the shards are only summed when the metrics are exported. When a thread exits its
+# shard is folded into the retired totals, so a server starting a thread per request doesn't accumulate shards.
+#########################################################################################################################
+
+#upper bounds of the histogram buckets of the request latency in seconds, response size in bytes and fuzzy candidates scored
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+CANDIDATES_BUCKETS = (0, 10, 100, 1000, 10000, 100000)
+
+def format_labels(labels: dict) -> str:
+    """ Return the input labels in the Prometheus text format, e.g {endpoint="api_alpha",status="200"}. """
+    return "{" + ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()) + "}"
+
+def format_value(value: float) -> str:
+    """ Return the input sample value in the Prometheus text format, integers without a decimal point. """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class ShardOwner():
+    """ Thread local owner of a thread's shard, released when the thread exits, which retires the shard. """
+
+class MetricsRegistry():
+    """
+    Registry of the request metrics of the API, recorded into per-thread shards of counters and
+    histograms, keyed by endpoint, that are summed and rendered in the Prometheus text format on
+    export. Only the thread owning a shard writes to it, so recording a request is lock free, the
+    lock is only taken the first time each thread records a request, to register its shard, and
+    once the thread exits, to fold its shard into the retired totals.
+
+    Parameters
+    ==========
+    :prefix: str (default="iso3166_2")
+        prefix of the name of every metric.
+
+    Methods
+    =======
+    observe_request(endpoint, method, status, duration, size=None, candidates_scored=None):
+        record a request served by the current thread.
+    samples():
+        return the summed counters and histograms of all threads.
+    render(gauges=()):
+        return all metrics, and the input gauges, in the Prometheus text format.
+    """
+    def __init__(self, prefix: str="iso3166_2"):
+        self.prefix = prefix
+        self.local = threading.local()
+        self.shards = []
+        self.retired = self.new_shard()
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def new_shard() -> dict:
+        """ Return an empty shard of counters and histograms. """
+        return {"requests": {}, "errors": {}, "latency": {}, "size": {}, "candidates": {}}
+
+    @staticmethod
+    def merge(totals: dict, shard: dict) -> None:
+        """ Add the counters and histograms of the shard to the totals, copying each as its thread may be recording a request meanwhile. """
+        for metric in ("requests", "errors"):
+            for key, value in list(shard[metric].items()):
+                totals[metric][key] = totals[metric].get(key, 0) + value
+        for metric in ("latency", "size", "candidates"):
+            for key, (counts, total, count) in list(shard[metric].items()):
+                histogram = totals[metric].setdefault(key, [[0] * len(counts), 0, 0])
+                histogram[0] = [summed + bucket for summed, bucket in zip(histogram[0], counts)]
+                histogram[1] += total
+                histogram[2] += count
+
+    def shard(self) -> dict:
+        """
+        Return the current thread's shard of counters, registering a new shard on the thread's first 
+        request. The shard is retired once the thread exits, when its thread local owner is released.
+        """
+        shard = getattr(self.local, "shard", None)
+        if (shard is None):
+            shard = self.new_shard()
+            with self.lock:
+                self.shards.append(shard)
+            owner = ShardOwner()
+            weakref.finalize(owner, self.retire, shard)
+            self.local.owner, self.local.shard = owner, shard
+        return shard
+
+    def retire(self, shard: dict) -> None:
+        """ Fold the shard of an exited thread into the retired totals and stop tracking it. """
+        with self.lock:
+            self.merge(self.retired, shard)
+            self.shards.remove(shard)
+
+    @staticmethod
+    def observe(histograms: dict, key, buckets: tuple, value: float) -> None:
+        """ Add the value to the histogram of the key, as [count per bucket, sum, count], only called by the shard's thread. """
+        histogram = histograms.get(key)
+        if (histogram is None):
+            histogram = histograms[key] = [[0] * (len(buckets) + 1), 0, 0]
+        histogram[0][bisect_left(buckets, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def observe_request(self, endpoint: str, method: str, status: int, duration: float, size: int=None, candidates_scored: int=None) -> None:
+        """
+        Record a request served by the current thread: count it by its endpoint, method and status
+        code, counting it as an error if its status code is 400 or above, and observe its latency
+        and, if known, its response size and the number of fuzzy matching candidates it scored.
+
+        Parameters
+        ==========
+        :endpoint: str
+            name of the endpoint that served the request.
+        :method: str
+            HTTP method of the request.
+        :status: int
+            status code of the response.
+        :duration: float
+            seconds taken to serve the request.
+        :size: int (default=None)
+            size in bytes of the response body, None if unknown, e.g a streamed response.
+        :candidates_scored: int (default=None)
+            number of fuzzy matching candidates scored, None if the endpoint doesn't fuzzy match.
+
+        Returns
+        =======
+        None
+        """
+        shard = self.shard()
+        shard["requests"][(endpoint, method, status)] = shard["requests"].get((endpoint, method, status), 0) + 1
+        if (status >= 400):
+            shard["errors"][(endpoint, status)] = shard["errors"].get((endpoint, status), 0) + 1
+        self.observe(shard["latency"], endpoint, LATENCY_BUCKETS, duration)
+        if (size is not None):
+            self.observe(shard["size"], endpoint, SIZE_BUCKETS, size)
+        if (candidates_scored is not None):
+            self.observe(shard["candidates"], endpoint, CANDIDATES_BUCKETS, candidates_scored)
+
+    def samples(self) -> dict:
+        """
+        Return the counters and histograms of all threads, including the retired totals of exited
+        threads, summed per key. Each shard is copied before summing, as its thread may be 
+        recording a request meanwhile.
+
+        Parameters
+        ==========
+        None
+
+        Returns
+        =======
+        :samples: dict
+            each counter's value, and each histogram's [count per bucket, sum, count], keyed by metric then key.
+        """
+        totals = self.new_shard()
+        with self.lock:
+            self.merge(totals, self.retired)
+            shards = list(self.shards)
+        for shard in shards:
+            self.merge(totals, shard)
+        return totals
+
+    def render(self, gauges=()) -> str:
+        """
+        Return all request metrics in the Prometheus text exposition format, followed by the input
+        gauges and counters, e.g the statistics of the API's caches, read when the metrics are exported.
+
+        Parameters
+        ==========
+        :gauges: iterable (default=())
+            (name without prefix, type, help text, [(labels dict, value), ...]) of each additional metric.
+
+        Returns
+        =======
+        :metrics: str
+            metrics in the Prometheus text format.
+        """
+        samples = self.samples()
+        lines = []
+
+        def add_metric(name: str, metric_type: str, help_text: str, metric_samples: list) -> None:
+            lines.extend([f"# HELP {self.prefix}_{name} {help_text}", f"# TYPE {self.prefix}_{name} {metric_type}"])
+            lines.extend(f"{self.prefix}_{name}{format_labels(labels) if labels else ''} {format_value(value)}" for labels, value in metric_samples)
+
+        def add_histogram(name: str, help_text: str, histograms: dict, buckets: tuple) -> None:
+            lines.extend([f"# HELP {self.prefix}_{name} {help_text}", f"# TYPE {self.prefix}_{name} histogram"])
+            for endpoint, (counts, total, count) in sorted(histograms.items()):
+                #bucket counts are cumulative, each including the observations of all lower buckets
+                cumulative = 0
+                for bound, bucket_count in zip([format_value(bound) for bound in buckets] + ["+Inf"], counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.prefix}_{name}_bucket{format_labels({'endpoint': endpoint, 'le': bound})} {cumulative}")
+                lines.append(f"{self.prefix}_{name}_sum{format_labels({'endpoint': endpoint})} {format_value(total)}")
+                lines.append(f"{self.prefix}_{name}_count{format_labels({'endpoint': endpoint})} {count}")
+
+        add_metric("requests_total", "counter", "Total number of requests, by endpoint, method and status code.",
+            [({"endpoint": endpoint, "method": method, "status": status}, value) for (endpoint, method, status), value in sorted(samples["requests"].items())])
+        add_metric("request_errors_total", "counter", "Total number of requests with a 4xx or 5xx status code, by endpoint and status code.",
+            [({"endpoint": endpoint, "status": status}, value) for (endpoint, status), value in sorted(samples["errors"].items())])
+        add_histogram("request_duration_seconds", "Time taken to serve each request, by endpoint.", samples["latency"], LATENCY_BUCKETS)
+        add_histogram("response_size_bytes", "Size of each response body, by endpoint, excluding streamed responses.", samples["size"], SIZE_BUCKETS)
+        add_histogram("fuzzy_candidates_scored", "Number of fuzzy matching candidates scored per request, by endpoint.", 
+            samples["candidates"], CANDIDATES_BUCKETS)
+        for name, metric_type, help_text, metric_samples in gauges:
+            add_metric(name, metric_type, help_text, metric_samples)
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,165 @@
+from collections import deque
+from itertools import count
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+
+#########################################################################################################################
+# Opt-in profiling of individual requests, used to find where the time of a slow request goes in production. A profiled
+# request is timed per phase, parse, resolve and serialize, returned in its Server-Timing header, and run under the
+# deterministic cProfile profiler, whose stats are kept for the last N profiled requests so they can be downloaded as
+# a pstats file. Only one request is run under cProfile at a time, concurrent profiled requests are only timed.
+#########################################################################################################################
+
+class RequestProfile():
+    """
+    Profile of a single request, timing each of its phases and, if the profiler's lock could be
+    acquired, running it under cProfile. Each phase ends when it's marked, its duration being the
+    time since the previous mark, or the start of the request, and is summed if marked repeatedly,
+    e.g once per lookup of a batch. The time after the last mark, if any, is the serialize phase.
+
+    Parameters
+    ==========
+    :lock: threading.Lock
+        lock held while a request runs under cProfile, if it can't be acquired the request is only timed.
+
+    Methods
+    =======
+    mark(phase):
+        end the current phase of the request.
+    stop():
+        stop the cProfile profiler and release its lock, if held.
+    server_timing():
+        return the duration of each phase in the Server-Timing header format.
+    """
+    def __init__(self, lock: threading.Lock):
+        self.lock = lock
+        self.phases = {}
+        self.profile = None
+        if (lock.acquire(blocking=False)):
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        self.start = self.last_mark = time.perf_counter()
+        self.duration = None
+
+    def mark(self, phase: str) -> None:
+        """ End the current phase of the request, adding the time since the previous mark to the input phase, unless stopped. """
+        now = time.perf_counter()
+        if (self.duration is not None):
+            return
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last_mark
+        self.last_mark = now
+
+    def stop(self) -> None:
+        """ End the request's final serialize phase, stop the cProfile profiler and release its lock, if not already stopped. """
+        if (self.duration is not None):
+            return
+        if (self.profile is not None):
+            self.profile.disable()
+            self.profile.create_stats()
+            self.lock.release()
+        if (self.phases):
+            self.mark("serialize")
+        else:
+            self.last_mark = time.perf_counter()
+        self.duration = self.last_mark - self.start
+
+    def server_timing(self) -> str:
+        """ Return the duration of each phase, and the whole request, in ms in the Server-Timing header format. """
+        return ", ".join(f"{phase};dur={duration * 1000:.3f}" for phase, duration in
+            [*((phase, self.phases[phase]) for phase in ("parse", "resolve", "serialize") if phase in self.phases), ("total", self.duration)])
+
+class RequestProfiler():
+    """
+    Profiler of the requests opted into profiling, keeping the profiles of the most recently profiled
+    requests. Only one request is run under cProfile at a time, as from Python 3.12 only one
+    profiler can be active per process.
+
+    Parameters
+    ==========
+    :history: int (default=20)
+        number of most recently profiled requests whose profiles are kept.
+
+    Methods
+    =======
+    start():
+        start profiling a request.
+    finish(profile, method, path, endpoint, status):
+        stop profiling a request and keep its profile.
+    profiles():
+        return a summary of each kept profile, most recent first.
+    stats(profile_id, output_format="pstats"):
+        return the cProfile stats of a kept profile as a pstats file or text.
+    """
+    def __init__(self, history: int=20):
+        self.lock = threading.Lock()
+        self.history = deque(maxlen=history)
+        self.ids = count(1)
+
+    def start(self) -> RequestProfile:
+        """ Return a new profile of the current request, run under cProfile unless another request is. """
+        return RequestProfile(self.lock)
+
+    def finish(self, profile: RequestProfile, method: str, path: str, endpoint: str, status: int) -> dict:
+        """
+        Stop profiling a request and keep its profile, discarding the oldest kept profile if the
+        history is full.
+
+        Parameters
+        ==========
+        :profile: RequestProfile
+            profile of the request.
+        :method: str
+            HTTP method of the request.
+        :path: str
+            path and query string of the request.
+        :endpoint: str
+            name of the endpoint that served the request.
+        :status: int
+            status code of the response.
+
+        Returns
+        =======
+        :summary: dict
+            id of the profile, request, time and phase durations in ms, and whether cProfile stats were collected.
+        """
+        profile.stop()
+        summary = {"id": next(self.ids), "method": method, "path": path, "endpoint": endpoint, "status": status,
+            "profiled_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "total_ms": round(profile.duration * 1000, 3),
+            "phases_ms": {phase: round(duration * 1000, 3) for phase, duration in profile.phases.items()}, "stats": profile.profile is not None}
+        self.history.appendleft((summary, profile.profile))
+        return summary
+
+    def profiles(self) -> list:
+        """ Return the summary of each kept profile, most recent first. """
+        return [summary for summary, _ in list(self.history)]
+
+    def stats(self, profile_id: int, output_format: str="pstats"):
+        """
+        Return the cProfile stats of the kept profile with the input id, either as the contents of a
+        pstats file, loadable using pstats.Stats or tools such as snakeviz, or as text listing the
+        functions with the highest cumulative time.
+
+        Parameters
+        ==========
+        :profile_id: int
+            id of the profile.
+        :output_format: str (default="pstats")
+            pstats or text.
+
+        Returns
+        =======
+        :stats: bytes/str
+            contents of the pstats file or text, None if the profile isn't kept or has no cProfile stats.
+        """
+        profile = next((profile for summary, profile in list(self.history) if summary["id"] == profile_id), None)
+        if (profile is None):
+            return None
+        if (output_format == "text"):
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(50)
+            return stream.getvalue()
+        return marshal.dumps(profile.stats)
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+import threading
+import time
+
+#########################################################################################################################
+# In-process LRU cache with a time to live (TTL), used to cache the results of repeated /api/name queries. Entries are
+# evicted once the cache is full, least recently used first, or once they are older than the TTL. All entries are
+# invalidated when the version or reload generation of the dataset they were computed from changes.
+#########################################################################################################################
+
+class ResultCache():
+    """
+    Thread safe LRU cache with a time to live, for caching the results of expensive requests. Each
+    lookup passes the version and reload generation of the dataset in use. A newer generation, or 
+    a different version, than that of the cached entries invalidates all entries, while lookups of
+    an older generation, i.e requests still in flight using the dataset replaced by a reload, bypass
+    the cache rather than evicting the entries of the newer dataset. The number of hits, misses, 
+    bypasses, evictions, expirations and invalidations are counted.
+
+    Parameters
+    ==========
+    :maxsize: int
+        max number of entries in the cache, the least recently used entry is evicted when full. A
+        size of 0 disables the cache.
+    :ttl: float
+        time to live in seconds of each entry, 0 or less means entries never expire.
+    :clock: callable (default=time.monotonic)
+        function returning the current time in seconds, used to expire entries.
+
+    Methods
+    =======
+    get(key, version, generation=0):
+        return the cached value of the key, else None.
+    put(key, value, version, generation=0):
+        cache the value of the key, evicting the least recently used entry if full.
+    clear():
+        remove all entries from the cache.
+    stats():
+        return the hit, miss, bypass, eviction, expiration and invalidation counters and size of the cache.
+    """
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+
+        #cached entries of key to (expiry time, value), ordered from least to most recently used
+        self.entries = OrderedDict()
+        self.version = None
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "bypasses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _validate_version(self, version: str, generation: int) -> bool:
+        """ 
+        Remove all entries if the input dataset version or a newer generation differs from that of 
+        the cached entries, return False if the input generation is older so the cache is bypassed,
+        lock must be held.
+        """
+        if (generation < self.generation):
+            self.counters["bypasses"] += 1
+            return False
+        if (version != self.version or generation != self.generation):
+            if (self.entries):
+                self.counters["invalidations"] += 1
+                self.entries.clear()
+            self.version, self.generation = version, generation
+        return True
+
+    def get(self, key, version: str, generation: int=0):
+        """
+        Return the cached value of the input key, if it's present, hasn't expired and was cached
+        from the same dataset version and generation, else None.
+
+        Parameters
+        ==========
+        :key: hashable
+            cache key.
+        :version: str
+            version of the dataset in use.
+        :generation: int (default=0)
+            reload generation of the dataset in use, increasing with each reloaded dataset.
+
+        Returns
+        =======
+        :value: object
+            cached value, None if not cached.
+        """
+        with self.lock:
+            if not (self._validate_version(version, generation)):
+                return None
+            entry = self.entries.get(key)
+            if (entry is None):
+                self.counters["misses"] += 1
+                return None
+            if (self.ttl > 0 and entry[0] <= self.clock()):
+                del self.entries[key]
+                self.counters["expirations"] += 1
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[1]
+
+    def put(self, key, value, version: str, generation: int=0) -> None:
+        """
+        Cache the value of the input key, computed from the input dataset version, evicting the
+        least recently used entry if the cache is full.
+
+        Parameters
+        ==========
+        :key: hashable
+            cache key.
+        :value: object
+            value to cache, None values aren't cached.
+        :version: str
+            version of the dataset the value was computed from.
+        :generation: int (default=0)
+            reload generation of the dataset the value was computed from.
+
+        Returns
+        =======
+        None
+        """
+        if (self.maxsize <= 0 or value is None):
+            return
+        with self.lock:
+            if not (self._validate_version(version, generation)):
+                return
+            self.entries[key] = (self.clock() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while (len(self.entries) > self.maxsize):
+                self.entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """ Remove all entries from the cache. """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Return the number of hits, misses, bypasses, evictions, expirations and invalidations of the cache,
+        along with its current and max size and TTL.
+
+        Parameters
+        ==========
+        None
+
+        Returns
+        =======
+        :stats: dict
+            counters of the cache.
+        """
+        with self.lock:
+            return dict(self.counters, size=len(self.entries), maxsize=self.maxsize, ttl=self.ttl)
@@ -0,0 +1,158 @@
+from heapq import heappush, heappushpop
+from math import asin, cos, radians, sin, sqrt
+
+#########################################################################################################################
+# Spatial index used by the /api/nearest endpoint. Each point's latitude and longitude is converted to a 3D unit vector,
+# so the straight line (chord) distance between two vectors increases with the great-circle distance between the points,
+# with no special handling of the poles or the antimeridian. A balanced k-d tree over the vectors is built once and the
+# k nearest points to a query are found by pruning every branch that can't contain a closer point than those found.
+#########################################################################################################################
+
+#mean radius of the Earth in km, used to convert between chord and great-circle distances
+EARTH_RADIUS_KM = 6371.0088
+
+def unit_vector(lat: float, lng: float) -> tuple[float, float, float]:
+    """
+    Return the 3D unit vector of the input latitude and longitude, in degrees.
+
+    Parameters
+    ==========
+    :lat: float
+        latitude in degrees.
+    :lng: float
+        longitude in degrees.
+
+    Returns
+    =======
+    :vector: tuple
+        (x, y, z) coordinates of the point on the unit sphere.
+    """
+    lat, lng = radians(lat), radians(lng)
+    return (cos(lat) * cos(lng), cos(lat) * sin(lng), sin(lat))
+
+def chord_to_km(chord: float) -> float:
+    """ Return the great-circle distance in km between two points whose unit vectors are the input chord length apart. """
+    return 2 * EARTH_RADIUS_KM * asin(min(chord / 2, 1.0))
+
+def km_to_chord(distance: float) -> float:
+    """ Return the chord length between the unit vectors of two points the input great-circle distance in km apart. """
+    return 2 * sin(min(distance / EARTH_RADIUS_KM, 3.141592653589793) / 2)
+
+def haversine_distance(lat_1: float, lng_1: float, lat_2: float, lng_2: float) -> float:
+    """
+    Return the great-circle distance in km between two points, using the haversine formula.
+
+    Parameters
+    ==========
+    :lat_1, lng_1: float
+        latitude and longitude of the first point, in degrees.
+    :lat_2, lng_2: float
+        latitude and longitude of the second point, in degrees.
+
+    Returns
+    =======
+    :distance: float
+        great-circle distance in km.
+    """
+    lat_1, lng_1, lat_2, lng_2 = radians(lat_1), radians(lng_1), radians(lat_2), radians(lng_2)
+    a = sin((lat_2 - lat_1) / 2) ** 2 + cos(lat_1) * cos(lat_2) * sin((lng_2 - lng_1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(sqrt(a), 1.0))
+
+class KDTree():
+    """
+    Balanced k-d tree over the unit vectors of a collection of points, used to find the k nearest
+    points to a latitude and longitude, optionally within a max great-circle distance. The tree is
+    stored implicitly in flat tuples: the median point of each range is the node splitting it,
+    with the points before it in its left subtree and those after it in its right subtree.
+
+    Parameters
+    ==========
+    :points: iterable
+        collection of (key, latitude, longitude) tuples, e.g each subdivision code and its latLng.
+
+    Methods
+    =======
+    nearest(lat, lng, k=1, max_distance=None):
+        return the keys and distances in km of the k nearest points, closest first, ties in key order.
+    """
+    def __init__(self, points):
+        points = [(key, unit_vector(lat, lng)) for key, lat, lng in points]
+        axes = [0] * len(points)
+
+        #recursively sort each range of points on the axis with the greatest spread, its median being the node splitting it
+        ranges = [(0, len(points))]
+        while ranges:
+            low, high = ranges.pop()
+            if (high - low <= 1):
+                continue
+            axis = max(range(3), key=lambda axis: max(point[1][axis] for point in points[low:high]) -
+                min(point[1][axis] for point in points[low:high]))
+            points[low:high] = sorted(points[low:high], key=lambda point: point[1][axis])
+            middle = (low + high) // 2
+            axes[middle] = axis
+            ranges.extend([(low, middle), (middle + 1, high)])
+
+        self.keys = tuple(point[0] for point in points)
+        self.vectors = tuple(point[1] for point in points)
+        self.axes = bytes(axes)
+
+        #rank of each point's key in sorted order, so points the same distance from a query are returned in key order
+        ranks = {key: rank for rank, key in enumerate(sorted(self.keys))}
+        self.ranks = tuple(ranks[key] for key in self.keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def nearest(self, lat: float, lng: float, k: int=1, max_distance: float=None) -> list[tuple[str, float]]:
+        """
+        Return the k nearest points to the input latitude and longitude, closest first, only
+        including points within the max great-circle distance, if input. Each branch of the tree
+        is only searched if the distance from the query to its splitting plane is less than the
+        distance to the furthest of the k nearest points found so far.
+
+        Parameters
+        ==========
+        :lat: float
+            latitude of the query, in degrees.
+        :lng: float
+            longitude of the query, in degrees.
+        :k: int (default=1)
+            max number of points to return.
+        :max_distance: float (default=None)
+            max great-circle distance in km of the returned points, None for no limit.
+
+        Returns
+        =======
+        :nearest: list
+            (key, great-circle distance in km) of each of the nearest points, sorted by distance.
+        """
+        if (k <= 0 or not self.keys):
+            return []
+        query = unit_vector(lat, lng)
+        max_squared = float("inf") if max_distance is None else km_to_chord(max_distance) ** 2
+
+        #max heap of the k nearest points found so far, as (-squared chord distance, -rank, position) so ties favour the smallest key
+        heap = []
+        stack = [(0, len(self.keys), 0.0)]
+        while stack:
+            #skip the range if the squared distance to its splitting plane is further than the furthest of the nearest points
+            low, high, plane_squared = stack.pop()
+            if (low >= high or plane_squared > (max_squared if len(heap) < k else min(max_squared, -heap[0][0]))):
+                continue
+            middle = (low + high) // 2
+            vector = self.vectors[middle]
+            squared = (query[0] - vector[0]) ** 2 + (query[1] - vector[1]) ** 2 + (query[2] - vector[2]) ** 2
+            if (squared <= max_squared):
+                if (len(heap) < k):
+                    heappush(heap, (-squared, -self.ranks[middle], middle))
+                elif ((-squared, -self.ranks[middle]) > heap[0][:2]):
+                    heappushpop(heap, (-squared, -self.ranks[middle], middle))
+
+            #search the side of the splitting plane containing the query first, the other only if it could contain a closer point
+            difference = query[self.axes[middle]] - vector[self.axes[middle]]
+            if (difference < 0):
+                stack.extend([(middle + 1, high, difference * difference), (low, middle, 0.0)])
+            else:
+                stack.extend([(low, middle, difference * difference), (middle + 1, high, 0.0)])
+
+        return [(self.keys[position], chord_to_km(sqrt(-squared))) for squared, _, position in sorted(heap, reverse=True)]
@@ -0,0 +1,82 @@
+from country_names import CountryNameResolver, normalize_country_name
+import iso3166
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Country_Names_Tests(unittest.TestCase):
+    """
+    Test suite for testing the country name resolver used by the /api/country_name endpoint.
+
+    Test Cases
+    ==========
+    test_normalize_country_name:
+        testing country names are transliterated, lower cased and stripped of punctuation.
+    test_lookup:
+        testing official names, apolitical names and aliases are exactly matched.
+    test_resolve:
+        testing names without an exact match are fuzzy matched, and invalid names aren't matched.
+    test_stats:
+        testing the exact hit and fuzzy cache hit/miss counters, and the candidates scored per resolve.
+    """
+    def setUp(self):
+        """ Initialise test variables, build country name resolver. """
+        self.resolver = CountryNameResolver(iso3166.countries)
+
+    def test_normalize_country_name(self):
+        """ Testing country names are transliterated, lower cased and stripped of punctuation. """
+#1.)
+        self.assertEqual(normalize_country_name("Côte d'Ivoire"), "cote d ivoire",
+            "Expected normalized country name, got {}.".format(normalize_country_name("Côte d'Ivoire")))
+#2.)
+        self.assertEqual(normalize_country_name("  Korea,  Republic of "), "korea republic of",
+            "Expected normalized country name, got {}.".format(normalize_country_name("  Korea,  Republic of ")))
+#3.)
+        self.assertEqual(normalize_country_name(""), "", "Expected empty normalized country name.")
+
+    def test_lookup(self):
+        """ Testing official names, apolitical names and aliases are exactly matched. """
+        test_names = {"Germany": "DE", "GERMANY": "DE", "Korea, Republic of": "KR", "Cote D'Ivoire": "CI", "Palestine": "PS",
+            "UAE": "AE", "Uae": "AE", "USA": "US", "DR Congo": "CD", "Virgin Islands, British": "VG", "Türkiye": "TR", "Turkey": "TR"}
+#1.)
+        for name, alpha_2 in test_names.items():
+            self.assertEqual(self.resolver.lookup(name), alpha_2,
+                "Expected {} to be exactly matched to {}, got {}.".format(name, alpha_2, self.resolver.lookup(name)))
+#2.)
+        for country in iso3166.countries:
+            self.assertEqual(self.resolver.lookup(country.name), country.alpha2,
+                "Expected {} to be exactly matched to {}.".format(country.name, country.alpha2))
+#3.)
+        self.assertIsNone(self.resolver.lookup("Swede"), "Expected no exact match for misspelt country name.")
+        self.assertIsNone(self.resolver.lookup("Germany,France"), "Expected no exact match for multiple country names.")
+
+    def test_resolve(self):
+        """ Testing names without an exact match are fuzzy matched, and invalid names aren't matched. """
+        test_names = {"Germany": "DE", "Swede": "SE", "Gemany": "DE", "Taiwn": "TW", "Tazania, United Republic of": "TZ"}
+#1.)
+        for name, alpha_2 in test_names.items():
+            self.assertEqual(self.resolver.resolve(name), alpha_2,
+                "Expected {} to be matched to {}, got {}.".format(name, alpha_2, self.resolver.resolve(name)))
+#2.)
+        for name in ["Nowhere", "abcdef", "", ",", "12345"]:
+            self.assertIsNone(self.resolver.resolve(name), "Expected no match for invalid country name {}.".format(name))
+
+    def test_stats(self):
+        """ Testing the exact hit and fuzzy cache hit/miss counters, and the candidates scored per resolve. """
+        self.resolver.resolve("Germany")
+        self.resolver.resolve("Swede")
+        self.resolver.resolve("swede")
+        self.resolver.resolve("Nowhere")
+#1.)
+        self.assertEqual(self.resolver.stats(), {"exact_hits": 1, "fuzzy_cache_hits": 1, "fuzzy_cache_misses": 2, "fuzzy_cache_size": 2},
+            "Expected resolver counters, got {}.".format(self.resolver.stats()))
+#2.)
+        test_stats = {}
+        self.resolver.resolve("Germany", stats=test_stats)
+        self.resolver.resolve("swede", stats=test_stats)
+        self.assertEqual(test_stats, {"candidates_scored": 0}, "Expected no candidates scored for exact and cached fuzzy matches.")
+        self.resolver.resolve("Gemany", stats=test_stats)
+        self.assertEqual(test_stats, {"candidates_scored": len(self.resolver.choices)}, "Expected every known name to be scored by a fuzzy match.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
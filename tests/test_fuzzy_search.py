@@ -0,0 +1,85 @@
+from fuzzy_search import TrigramIndex, ngrams
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+import random
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Fuzzy_Search_Tests(unittest.TestCase):
+    """
+    Test suite for testing the trigram index fuzzy search engine used by the /api/name endpoint.
+
+    Test Cases
+    ==========
+    test_ngrams:
+        testing padded trigrams are generated from an input string.
+    test_search:
+        testing exact and fuzzy matches are returned from the index, sorted by score.
+    test_search_exhaustive:
+        testing the index returns exactly the same matches as scoring every choice, for a
+        variety of queries and score cutoffs.
+    """
+    def setUp(self):
+        """ Initialise test variables, build trigram index. """
+        self.choices = ["saintgeorge", "saintgeorges", "saint-george", "saintandrew", "saintpatrick", "stgeorge",
+            "derry", "paris", "berlin", "bern", "murcia,regionde", "newry,mourneanddown", "ab", "a"]
+        self.trigram_index = TrigramIndex(self.choices)
+
+    def test_ngrams(self):
+        """ Testing padded trigrams are generated from an input string. """
+#1.)
+        self.assertEqual(ngrams("abc"), {"\x00\x00a": 1, "\x00ab": 1, "abc": 1, "bc\x00": 1, "c\x00\x00": 1},
+            "Expected padded trigrams of input string, got {}.".format(ngrams("abc")))
+#2.)
+        self.assertEqual(ngrams("aaaa")["aaa"], 2, "Expected trigram aaa to be counted twice, got {}.".format(ngrams("aaaa")["aaa"]))
+#3.)
+        self.assertEqual(sum(ngrams("a").values()), 3, "Expected 3 trigrams for single character string, got {}.".format(ngrams("a")))
+
+    def test_search(self):
+        """ Testing exact and fuzzy matches are returned from the index, sorted by score. """
+#1.)
+        test_saint_george = self.trigram_index.search("saintgeorge", 100)
+        self.assertEqual(test_saint_george, [("saintgeorge", 100)],
+            "Expected exact matches of saintgeorge, got {}.".format(test_saint_george))
+#2.)
+        test_saint_george_90 = self.trigram_index.search("saintgeorge", 90)
+        self.assertEqual(test_saint_george_90, [("saintgeorge", 100), ("saint-george", 96), ("saintgeorges", 96)],
+            "Expected matches of saintgeorge with a score of at least 90, got {}.".format(test_saint_george_90))
+#3.)
+        test_saint_50 = self.trigram_index.search("saint", 50)
+        self.assertEqual(len(test_saint_50), 5, "Expected 5 saint subdivisions to match, got {}.".format(test_saint_50))
+        self.assertEqual([match[1] for match in test_saint_50], sorted([match[1] for match in test_saint_50], reverse=True),
+            "Expected matches to be sorted by score descending, got {}.".format(test_saint_50))
+#4.)
+        self.assertEqual(self.trigram_index.search("a", 100), [("a", 100)],
+            "Expected exact match of single character choice, got {}.".format(self.trigram_index.search("a", 100)))
+#5.)
+        self.assertEqual(self.trigram_index.search("", 0), [], "Expected no matches for empty query.")
+        self.assertEqual(self.trigram_index.search("xyzxyz", 90), [], "Expected no matches for invalid query.")
+#6.)
+        test_stats = {}
+        self.trigram_index.search("saintgeorge", 90, stats=test_stats)
+        self.trigram_index.search("derry", 100, stats=test_stats)
+        self.assertTrue(0 < test_stats["candidates_scored"] < 2 * len(self.choices),
+            "Expected the candidates scored by both searches to be counted, got {}.".format(test_stats))
+#7.)
+        for score_cutoff in (-1, 101, 1000, float("inf"), float("nan")):
+            with self.assertRaises(ValueError):
+                self.trigram_index.search("saintgeorge", score_cutoff)
+
+    def test_search_exhaustive(self):
+        """ Testing the index returns exactly the same matches as scoring every choice. """
+        random.seed(0)
+        queries = ["saintgeorg", "paris", "bernn", "murcia", "newry", "x", "stgeorgs", "derr"] + \
+            ["".join(random.choice("abcdeginorst") for _ in range(random.randint(1, 14))) for _ in range(50)]
+        for query in queries:
+            for score_cutoff in [0, 10, 33.3, 50, 75, 90, 100]:
+                expected = sorted([(choice, int(round(fuzz.ratio(default_process(query), default_process(choice)))))
+                    for choice in self.choices], key=lambda match: (-match[1], match[0]))
+                expected = [match for match in expected if match[1] >= score_cutoff and match[1] > 0]
+                self.assertEqual(self.trigram_index.search(query, score_cutoff), expected,
+                    "Expected matches for query {} with cutoff {} to equal exhaustive search.".format(query, score_cutoff))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
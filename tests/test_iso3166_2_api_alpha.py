@@ -0,0 +1,71 @@
+import unittest
+from index import app, all_iso3166_2, resolve_alpha_codes
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Alpha_Tests(unittest.TestCase):
+    """
+    Test suite for testing the resolution of the alpha-2, alpha-3 and numeric country codes input
+    to the /api/alpha endpoint of the ISO 3166-2 api, using the Flask test client rather than the
+    hosted API.
+
+    Test Cases
+    ==========
+    test_resolve_alpha_codes:
+        testing alpha-2, alpha-3 and numeric codes, with or without leading zeros, are resolved into alpha-2 codes.
+    test_resolve_alpha_codes_invalid:
+        testing an error message is returned for empty, invalid alpha and unassigned numeric codes.
+    test_alpha_numeric:
+        testing the /api/alpha endpoint returns the same data for a numeric code with or without leading zeros.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.alpha_url = "/api/alpha/"
+
+    def test_resolve_alpha_codes(self):
+        """ Testing alpha-2, alpha-3 and numeric codes, with or without leading zeros, are resolved into alpha-2 codes. """
+#1.)
+        for alpha in ("AF", "AFG", "af", "4", "04", "004", " 004 ", "%20004"):
+            self.assertEqual(resolve_alpha_codes(alpha), (["AF"], None), "Expected {} to resolve to AF, got {}.".format(alpha, resolve_alpha_codes(alpha)))
+#2.)
+        for alpha, alpha_2 in (("372", "IE"), ("8", "AL"), ("008", "AL"), ("20", "AD"), ("020", "AD"), ("826", "GB"), ("840", "US")):
+            self.assertEqual(resolve_alpha_codes(alpha), ([alpha_2], None), "Expected {} to resolve to {}, got {}.".format(alpha, alpha_2,
+                resolve_alpha_codes(alpha)))
+#3.)
+        self.assertEqual(sorted(resolve_alpha_codes("IE,FRA,276,004")[0]), ["AF", "DE", "FR", "IE"], "Expected a mix of codes to be resolved.")
+
+    def test_resolve_alpha_codes_invalid(self):
+        """ Testing an error message is returned for empty, invalid alpha and unassigned numeric codes. """
+        test_invalid_codes = [("", "The alpha input parameter cannot be empty."),
+            ("999", "Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: 999."),
+            ("0004", "Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: 0004."),
+            ("99", "Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: 99."),
+            ("0", "Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: 0."),
+            ("IE,1234", "Invalid ISO 3166-1 numeric country code input, cannot convert into corresponding alpha-2 code: 1234."),
+            ("XXX", "Invalid ISO 3166-1 alpha-3 country code input, cannot convert into corresponding alpha-2 code: XXX."),
+            ("XX", "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: XX."),
+            ("²", "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: ²."),
+            ("4A", "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: 4A.")]
+#1.)
+        for alpha, message in test_invalid_codes:
+            self.assertEqual(resolve_alpha_codes(alpha), (None, message), "Expected error message for {}, got {}.".format(alpha, resolve_alpha_codes(alpha)))
+#2.)
+        for alpha, message in test_invalid_codes[1:]:
+            response = self.client.get(self.alpha_url + alpha)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code for {}, got {}.".format(alpha, response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message, got {}.".format(response.get_json()))
+
+    def test_alpha_numeric(self):
+        """ Testing the /api/alpha endpoint returns the same data for a numeric code with or without leading zeros. """
+#1.)
+        for alpha in ("4", "04", "004", "AFG"):
+            response = self.client.get(self.alpha_url + alpha)
+            self.assertEqual(response.status_code, 200, "Expected 200 status code for {}, got {}.".format(alpha, response.status_code))
+            self.assertEqual(response.get_json(), {"AF": all_iso3166_2["AF"]}, "Expected the data of AF for {}.".format(alpha))
+#2.)
+        response = self.client.get(self.alpha_url + "372,8,IE")
+        self.assertEqual(response.get_json(), {"AL": all_iso3166_2["AL"], "IE": all_iso3166_2["IE"]}, "Expected the data of AL and IE, deduplicated.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,84 @@
+import unittest
+from index import app, normalize_autocomplete_text
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Autocomplete_Tests(unittest.TestCase):
+    """
+    Test suite for testing the autocomplete endpoint of the ISO 3166-2 api, using the Flask test
+    client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_normalize_autocomplete_text:
+        testing names and queries are transliterated, lower cased and stripped of punctuation.
+    test_autocomplete:
+        testing the subdivisions whose name, localName or a word in it starts with the query are ranked.
+    test_autocomplete_limit_country:
+        testing the completions are limited in number and to the input countries.
+    test_autocomplete_invalid:
+        testing an error is returned for invalid query string parameters.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.autocomplete_url = "/api/autocomplete"
+
+    def completions(self, query_string: str) -> list:
+        """ Get the autocomplete endpoint with the input query string, return the code of each completion. """
+        response = self.client.get(self.autocomplete_url + query_string)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        return [completion["code"] for completion in response.get_json()]
+
+    def test_normalize_autocomplete_text(self):
+        """ Testing names and queries are transliterated, lower cased and stripped of punctuation. """
+#1.)
+        self.assertEqual(normalize_autocomplete_text("Baden-Württemberg"), "baden wurttemberg",
+            "Expected normalized text, got {}.".format(normalize_autocomplete_text("Baden-Württemberg")))
+        self.assertEqual(normalize_autocomplete_text("  Murcia,  Región de "), "murcia region de",
+            "Expected normalized text, got {}.".format(normalize_autocomplete_text("  Murcia,  Región de ")))
+
+    def test_autocomplete(self):
+        """ Testing the subdivisions whose name, localName or a word in it starts with the query are ranked. """
+#1.)
+        self.assertEqual(self.completions("?q=york")[:3], ["GB-YOR", "US-NY", "GB-NYK"],
+            "Expected York, then names with a later word starting with york, shortest first.")
+#2.)
+        self.assertEqual(self.completions("?q=baden-w"), ["DE-BW"], "Expected completion ignoring punctuation and accents.")
+        self.assertEqual(self.completions("?q=SAO p"), ["BR-SP"], "Expected completion ignoring case and accents.")
+#3.)
+        test_local_name = self.client.get(self.autocomplete_url + "?q=bayern").get_json()
+        self.assertEqual(test_local_name[0], {"code": "DE-BY", "localName": "Bayern", "match": "Bayern", "name": "Bayern"},
+            "Expected completion with its code, name, localName and matching name, got {}.".format(test_local_name))
+#4.)
+        self.assertEqual(self.completions("?q=zzzzz"), [], "Expected no completions.")
+
+    def test_autocomplete_limit_country(self):
+        """ Testing the completions are limited in number and to the input countries. """
+#1.)
+        self.assertEqual(len(self.completions("?q=s")), 10, "Expected the default limit of 10 completions.")
+        self.assertEqual(len(self.completions("?q=s&limit=50")), 50, "Expected 50 completions.")
+#2.)
+        test_country = self.completions("?q=s&limit=50&country=GB,FRA")
+        self.assertTrue(test_country and all(subd[:2] in ("GB", "FR") for subd in test_country),
+            "Expected only completions of GB and FR, got {}.".format(test_country))
+#3.)
+        self.assertEqual(self.completions("?q=san&limit=3"), self.completions("?q=san&limit=10")[:3],
+            "Expected a lower limit to return the top ranked completions.")
+
+    def test_autocomplete_invalid(self):
+        """ Testing an error is returned for invalid query string parameters. """
+        test_invalid = [("", "The q query string parameter must contain at least one letter or digit."),
+            ("?q=!!", "The q query string parameter must contain at least one letter or digit."),
+            ("?q=a&limit=0", "Limit query string parameter value must be an integer between 1 and 50, got value: 0."),
+            ("?q=a&limit=abc", "Limit query string parameter value must be an integer between 1 and 50, got value: abc."),
+            ("?q=a&limit=²", "Limit query string parameter value must be an integer between 1 and 50, got value: ²."),
+            ("?q=a&country=ZZ", "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: ZZ.")]
+#1.)
+        for query_string, message in test_invalid:
+            response = self.client.get(self.autocomplete_url + query_string)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,118 @@
+import unittest
+import index
+from index import app
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Batch_Tests(unittest.TestCase):
+    """
+    Test suite for testing the batch endpoint of the ISO 3166-2 api, using the Flask test client
+    rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_batch_results:
+        testing each lookup returns the same data as its respective endpoint, in input order.
+    test_batch_errors:
+        testing invalid lookups return their own error message without failing the whole request.
+    test_batch_invalid_body:
+        testing an error is returned for an invalid request body.
+    test_batch_limits:
+        testing an error is returned for too many lookups, or too many name lookups with a likeness below the default.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.batch_url = "/api/batch"
+
+    def test_batch_results(self):
+        """ Testing each lookup returns the same data as its respective endpoint, in input order. """
+        test_lookups = [("alpha", "FR,DEU,428"), ("subdivision", "IE-MO,FI-17"), ("name", "Saint George"),
+            ("country_name", "Moldova,UAE"), ("alpha", "FR,DEU,428")]
+        for fields in ("", "?fields=name,type"):
+            results = self.client.post(self.batch_url + fields, json=[{"type": lookup_type, "value": value}
+                for lookup_type, value in test_lookups]).get_json()
+#1.)
+            self.assertEqual(len(results), len(test_lookups), "Expected a result for each lookup, got {}.".format(len(results)))
+#2.)
+            for (lookup_type, value), result in zip(test_lookups, results):
+                self.assertEqual((result["type"], result["value"], result["status"]), (lookup_type, value, 200),
+                    "Expected successful result of lookup in input order, got {}.".format(result))
+                self.assertEqual(result["data"], self.client.get("/api/{}/{}{}".format(lookup_type, value, fields)).get_json(),
+                    "Expected data of lookup {} {} to equal that of its endpoint.".format(lookup_type, value))
+#3.)
+        test_likeness = self.client.post(self.batch_url, json=[{"type": "name", "value": "Saint George", "likeness": 0.5}]).get_json()
+        self.assertEqual(test_likeness[0]["data"], self.client.get("/api/name/Saint George?likeness=0.5").get_json(),
+            "Expected data of name lookup with likeness to equal that of its endpoint.")
+
+    def test_batch_errors(self):
+        """ Testing invalid lookups return their own error message without failing the whole request. """
+        response = self.client.post(self.batch_url, json=[{"type": "alpha", "value": "ZZ"}, {"type": "subdivision", "value": "FR"},
+            {"type": "name", "value": "Derry", "likeness": "abc"}, {"type": "alpha", "value": "FR"}, {"type": "abc", "value": "FR"},
+            {"type": "alpha", "value": 5}, "FR"])
+        results = response.get_json()
+#1.)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual([result["status"] for result in results], [400, 400, 400, 200, 400, 400, 400],
+            "Expected status code of each lookup, got {}.".format([result["status"] for result in results]))
+#2.)
+        self.assertEqual(results[0]["message"], "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: ZZ.",
+            "Expected error message of invalid alpha code, got {}.".format(results[0]))
+        self.assertEqual(results[1]["message"], "All subdivision codes must be in the format XX-Y, XX-YY or XX-YYY: FR.",
+            "Expected error message of invalid subdivision code, got {}.".format(results[1]))
+        self.assertEqual(results[2]["message"], "Likeness query string parameter value must be between 0 - 1 or 1 - 100: abc.",
+            "Expected error message of invalid likeness, got {}.".format(results[2]))
+        self.assertEqual(results[5]["message"], "The lookup value must be a string: 5.",
+            "Expected error message of invalid lookup value, got {}.".format(results[5]))
+        self.assertTrue(results[4]["message"].startswith("Each lookup must be an object with a type"),
+            "Expected error message of invalid lookup type, got {}.".format(results[4]))
+#3.)
+        response = self.client.post(self.batch_url, data='[{"type": "name", "value": "Westmeath", "likeness": 5000}, '
+            '{"type": "name", "value": "Westmeath", "likeness": Infinity}, {"type": "name", "value": "Westmeath", "likeness": NaN}, '
+            '{"type": "name", "value": "Westmeath", "likeness": 90}]', content_type="application/json")
+        results = response.get_json()
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual([result["status"] for result in results], [400, 400, 400, 200],
+            "Expected only the lookups with an out of range likeness to fail, got {}.".format(results))
+        for result, likeness in zip(results, ("5000", "inf", "nan")):
+            self.assertEqual(result["message"], "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: {}.".format(likeness),
+                "Expected error message of out of range likeness, got {}.".format(result))
+
+    def test_batch_invalid_body(self):
+        """ Testing an error is returned for an invalid request body. """
+#1.)
+        for body in ({"type": "alpha", "value": "FR"}, "FR"):
+            response = self.client.post(self.batch_url, json=body)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+#2.)
+        response = self.client.post(self.batch_url, data="abc", content_type="application/json")
+        self.assertEqual(response.get_json()["message"], 'The batch request body must be a JSON array of lookups, e.g [{"type": "alpha", "value": "FR"}].',
+            "Expected error message of invalid request body, got {}.".format(response.get_json()))
+#3.)
+        response = self.client.post(self.batch_url + "?fields=abc", json=[{"type": "alpha", "value": "FR"}])
+        self.assertEqual(response.status_code, 400, "Expected 400 status code for invalid fields, got {}.".format(response.status_code))
+
+    def test_batch_limits(self):
+        """ Testing an error is returned for too many lookups, or too many name lookups with a likeness below the default. """
+        test_fuzzy_lookup = {"type": "name", "value": "Cork", "likeness": 0}
+#1.)
+        response = self.client.post(self.batch_url, json=[{"type": "alpha", "value": "FR"}] * (index.batch_max_lookups + 1))
+        self.assertEqual(response.status_code, 400, "Expected 400 status code for too many lookups, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["message"], "The batch request cannot contain more than {} lookups, got {}.".format(index.batch_max_lookups,
+            index.batch_max_lookups + 1), "Expected error message, got {}.".format(response.get_json()))
+#2.)
+        response = self.client.post(self.batch_url, json=[test_fuzzy_lookup] * (index.batch_max_fuzzy_lookups + 1))
+        self.assertEqual(response.status_code, 400, "Expected 400 status code for too many fuzzy lookups, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["message"], "The batch request cannot contain more than {} name lookups with a likeness below 90, got {}.".format(
+            index.batch_max_fuzzy_lookups, index.batch_max_fuzzy_lookups + 1), "Expected error message, got {}.".format(response.get_json()))
+#3.)
+        for lookup in ({"type": "name", "value": "Cork"}, {"type": "name", "value": "Cork", "likeness": 90}, {"type": "name", "value": "Cork", "likeness": 0.95},
+                {"type": "name", "value": "Cork", "likeness": "abc"}, {"type": "alpha", "value": "IE", "likeness": 0}):
+            response = self.client.post(self.batch_url, json=[lookup] * (index.batch_max_fuzzy_lookups + 1))
+            self.assertEqual(response.status_code, 200, "Expected {} not to be limited as a fuzzy lookup, got {}.".format(lookup, response.status_code))
+#4.)
+        response = self.client.post(self.batch_url, json=[test_fuzzy_lookup] * index.batch_max_fuzzy_lookups)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code for the max number of fuzzy lookups, got {}.".format(response.status_code))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
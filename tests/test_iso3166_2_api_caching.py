@@ -0,0 +1,140 @@
+import gzip
+import hashlib
+import json
+import unittest
+import index
+from index import app, all_iso3166_2
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Caching_Tests(unittest.TestCase):
+    """
+    Test suite for testing the precompressed and conditionally cached response of the /api/all
+    endpoint of the ISO 3166-2 api, using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_etag:
+        testing the response has a strong ETag per encoding, derived from a hash of the body.
+    test_if_none_match:
+        testing a request whose If-None-Match header matches the ETag is returned a 304 with no body.
+    test_if_none_match_weak:
+        testing a request whose If-None-Match header has a weak validator of the ETag is returned a 304, using weak comparison.
+    test_encodings:
+        testing the gzip, brotli and identity encoded bodies are negotiated and decode to the same data.
+    test_refused_encodings:
+        testing encodings refused with a quality of 0 aren't used, and a 406 is returned if every encoding is refused.
+    test_compression_levels:
+        testing only the unprojected response is compressed using the highest levels, projected responses using the faster levels on request.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.all_url = "/api/all"
+
+    def test_etag(self):
+        """ Testing the response has a strong ETag per encoding, derived from a hash of the body. """
+        response = self.client.get(self.all_url)
+#1.)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        test_etag, test_weak = response.get_etag()
+        self.assertFalse(test_weak, "Expected a strong ETag, got {}.".format(response.headers["ETag"]))
+        self.assertEqual(test_etag, hashlib.sha256(response.data).hexdigest(), "Expected the ETag to be the hash of the body, got {}.".format(test_etag))
+#2.)
+        response = self.client.get(self.all_url, headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.get_etag(), (test_etag + "-gzip", False), "Expected a separate ETag of the gzip body, got {}.".format(response.get_etag()))
+#3.)
+        self.assertIn("Accept-Encoding", response.vary, "Expected the response to vary on Accept-Encoding, got {}.".format(response.vary))
+
+    def test_if_none_match(self):
+        """ Testing a request whose If-None-Match header matches the ETag is returned a 304 with no body. """
+        test_etag = self.client.get(self.all_url).get_etag()[0]
+#1.)
+        for headers in ({"If-None-Match": '"{}"'.format(test_etag)}, {"If-None-Match": '"{}-gzip"'.format(test_etag), "Accept-Encoding": "gzip"},
+                {"If-None-Match": '"{}"'.format(test_etag), "Accept-Encoding": "gzip"}, {"If-None-Match": '"other", "{}"'.format(test_etag)}):
+            response = self.client.get(self.all_url, headers=headers)
+            self.assertEqual(response.status_code, 304, "Expected 304 status code for {}, got {}.".format(headers, response.status_code))
+            self.assertEqual(response.data, b"", "Expected no body of a 304 response, got {}.".format(response.data[:50]))
+            self.assertIsNotNone(response.get_etag()[0], "Expected the ETag of a 304 response.")
+#2.)
+        for headers in ({"If-None-Match": '"other"'}, {"If-None-Match": '"{}"'.format(test_etag[:-1])}):
+            response = self.client.get(self.all_url, headers=headers)
+            self.assertEqual(response.status_code, 200, "Expected 200 status code for {}, got {}.".format(headers, response.status_code))
+#3.)
+        response = self.client.get(self.all_url + "?fields=name", headers={"If-None-Match": '"{}"'.format(test_etag)})
+        self.assertEqual(response.status_code, 200, "Expected 200 status code of a projected response, got {}.".format(response.status_code))
+
+    def test_if_none_match_weak(self):
+        """ Testing a request whose If-None-Match header has a weak validator of the ETag is returned a 304, using weak comparison. """
+        test_etag = self.client.get(self.all_url).get_etag()[0]
+#1.)
+        for headers in ({"If-None-Match": 'W/"{}"'.format(test_etag)}, {"If-None-Match": 'W/"{}-gzip"'.format(test_etag), "Accept-Encoding": "gzip"},
+                {"If-None-Match": '"other", W/"{}"'.format(test_etag)}):
+            response = self.client.get(self.all_url, headers=headers)
+            self.assertEqual(response.status_code, 304, "Expected 304 status code for {}, got {}.".format(headers, response.status_code))
+            self.assertEqual(response.data, b"", "Expected no body of a 304 response, got {}.".format(response.data[:50]))
+#2.)
+        response = self.client.get(self.all_url, headers={"If-None-Match": 'W/"other"'})
+        self.assertEqual(response.status_code, 200, "Expected 200 status code for a weak validator of another body, got {}.".format(response.status_code))
+
+    def test_encodings(self):
+        """ Testing the gzip, brotli and identity encoded bodies are negotiated and decode to the same data. """
+        test_decoders = {"identity": lambda body: body, "gzip": gzip.decompress}
+        if (index.brotli is not None):
+            test_decoders["br"] = index.brotli.decompress
+#1.)
+        for encoding, decode in test_decoders.items():
+            response = self.client.get(self.all_url, headers={"Accept-Encoding": encoding})
+            self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.headers.get("Content-Encoding", "identity"), encoding,
+                "Expected {} content encoding, got {}.".format(encoding, response.headers.get("Content-Encoding")))
+            self.assertEqual(response.mimetype, "application/json", "Expected application/json, got {}.".format(response.mimetype))
+            self.assertEqual(json.loads(decode(response.data)), all_iso3166_2, "Expected the {} body to decode to all of the data.".format(encoding))
+#2.)
+        test_preferred = "br" if (index.brotli is not None) else "gzip"
+        response = self.client.get(self.all_url, headers={"Accept-Encoding": "gzip, deflate, br"})
+        self.assertEqual(response.headers["Content-Encoding"], test_preferred, "Expected {} content encoding, got {}.".format(test_preferred,
+            response.headers.get("Content-Encoding")))
+        response = self.client.get(self.all_url, headers={"Accept-Encoding": "gzip;q=1.0, br;q=0.5"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip", "Expected the encoding of the highest quality, got {}.".format(response.headers.get("Content-Encoding")))
+#3.)
+        response = self.client.get(self.all_url, headers={"Accept-Encoding": "deflate"})
+        self.assertNotIn("Content-Encoding", response.headers, "Expected the identity encoding if no supported encoding is accepted.")
+
+    def test_refused_encodings(self):
+        """ Testing encodings refused with a quality of 0 aren't used, and a 406 is returned if every encoding is refused. """
+#1.)
+        for accept_encoding in ("gzip, identity;q=0", "gzip;q=1, br;q=0, *;q=0"):
+            response = self.client.get(self.all_url, headers={"Accept-Encoding": accept_encoding})
+            self.assertEqual(response.headers.get("Content-Encoding"), "gzip", "Expected gzip content encoding for {}, got {}.".format(accept_encoding,
+                response.headers.get("Content-Encoding")))
+#2.)
+        for accept_encoding in ("gzip;q=0, br;q=0", "*;q=0, identity"):
+            response = self.client.get(self.all_url, headers={"Accept-Encoding": accept_encoding})
+            self.assertEqual(response.status_code, 200, "Expected 200 status code for {}, got {}.".format(accept_encoding, response.status_code))
+            self.assertNotIn("Content-Encoding", response.headers, "Expected the identity encoding for {}.".format(accept_encoding))
+#3.)
+        for accept_encoding in ("identity;q=0", "*;q=0", "deflate, identity;q=0", "gzip;q=0, br;q=0, identity;q=0"):
+            response = self.client.get(self.all_url, headers={"Accept-Encoding": accept_encoding})
+            self.assertEqual(response.status_code, 406, "Expected 406 status code for {}, got {}.".format(accept_encoding, response.status_code))
+            self.assertEqual(response.get_json()["message"], "None of the content encodings accepted by the Accept-Encoding header are supported, "
+                "supported encodings: {}.".format(", ".join(["identity", *index.SerializedResponse.compressors])),
+                "Expected error message, got {}.".format(response.get_json()))
+
+    def test_compression_levels(self):
+        """ Testing only the unprojected response is compressed using the highest levels, projected responses using the faster levels on request. """
+        index.warm_caches()
+        test_all_response = index.all_iso3166_2_response(index.active_dataset())
+#1.)
+        self.assertEqual(test_all_response.levels, index.SerializedResponse.precompressed_levels, "Expected the highest compression levels of the unprojected response.")
+        self.assertEqual(set(test_all_response.encodings), {"identity", *index.SerializedResponse.compressors}, "Expected the unprojected response to be precompressed by warm_caches.")
+#2.)
+        response = self.client.get(self.all_url + "?fields=type", headers={"Accept-Encoding": "gzip"})
+        test_projected_response = index.all_iso3166_2_response(index.active_dataset(), ("type",))
+        self.assertEqual(test_projected_response.levels, index.SerializedResponse.on_request_levels, "Expected the faster compression levels of a projected response.")
+        self.assertEqual(set(test_projected_response.encodings), {"identity", "gzip"}, "Expected only the requested encoding of a projected response to be compressed.")
+        self.assertEqual(gzip.decompress(response.data), test_projected_response.body, "Expected the gzip body to decode to the projected data.")
+        self.assertLessEqual(max(index.SerializedResponse.on_request_levels.values()), 6, "Expected faster compression levels on request.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import unittest
+from index import app
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Concurrency_Tests(unittest.TestCase):
+    """
+    Test suite for testing the ISO 3166-2 api can safely serve concurrent requests from multiple threads, 
+    using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_concurrent_error_messages:
+        testing concurrent invalid requests to all endpoints each return their own error message and path.
+    """
+    def setUp(self):
+        """ Initialise test variables. """
+        #number of threads and number of requests per thread per endpoint
+        self.num_threads = 16
+        self.num_requests = 25
+
+        #barrier so all threads start sending their requests at the same time
+        self.barrier = threading.Barrier(self.num_threads)
+
+    def invalid_requests(self, thread_id: int) -> list[tuple[str, str]]:
+        """ Return a list of invalid request urls to each endpoint, unique to the thread, and their expected error messages. """
+        invalid_requests = []
+        for request_id in range(self.num_requests):
+            unique_id = "T{}X{}".format(thread_id, request_id)
+            invalid_requests.extend([
+                ("/api/all?format=format{}".format(unique_id), 
+                    "Format query string parameter value must be json or ndjson, got value: format{}.".format(unique_id.lower())),
+                ("/api/alpha/{}".format(unique_id), 
+                    "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: {}.".format(unique_id)),
+                ("/api/subdivision/AB-{}CDE".format(unique_id), 
+                    "All subdivision codes must be in the format XX-Y, XX-YY or XX-YYY: AB-{}CDE.".format(unique_id)),
+                ("/api/name/Derry?likeness=abc{}".format(unique_id), 
+                    "Likeness query string parameter value must be between 0 - 1 or 1 - 100: abc{}.".format(unique_id)),
+                ("/api/country_name/France?fields=field{}".format(unique_id), 
+                    "Invalid attribute(s) input to fields query string parameter: field{}. List of available attributes: "
+                    "flag, latLng, localName, name, parentCode, type.".format(unique_id)),
+                ("/api/list_subdivisions?granularity=granularity{}".format(unique_id), 
+                    "Granularity query string parameter value must be country or subdivision, got value: granularity{}.".format(unique_id.lower())),
+            ])
+        return invalid_requests
+
+    def send_invalid_requests(self, thread_id: int) -> list[tuple[str, str, int, dict]]:
+        """ Send all of the thread's invalid requests using the Flask test client, return each response. """
+        client = app.test_client()
+        responses = []
+        self.barrier.wait()
+        for url, expected_message in self.invalid_requests(thread_id):
+            response = client.get(url)
+            responses.append((url, expected_message, response.status_code, response.get_json()))
+        return responses
+
+    def test_concurrent_error_messages(self):
+        """ Testing concurrent invalid requests to all endpoints each return their own error message and path. """
+        with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
+            all_responses = list(executor.map(self.send_invalid_requests, range(self.num_threads)))
+#1.)
+        for responses in all_responses:
+            for url, expected_message, status_code, error_message in responses:
+                self.assertEqual(status_code, 400, "Expected status code 400 for {}, got {}.".format(url, status_code))
+                self.assertEqual(error_message["message"], expected_message, 
+                    "Expected error message for {} to be {}, got {}.".format(url, expected_message, error_message["message"]))
+                self.assertEqual(error_message["path"].replace("http://localhost", ""), url.split("?")[0] if not "/api/name" in url else url, 
+                    "Expected error path for {} to be its own url, got {}.".format(url, error_message["path"]))
+                self.assertEqual(error_message["status"], 400, "Expected error status to be 400, got {}.".format(error_message["status"]))
+#2.)
+        self.assertEqual(sum(len(responses) for responses in all_responses), self.num_threads * self.num_requests * 6, 
+            "Expected a response for every request sent.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,115 @@
+import csv
+import io
+import unittest
+from index import app, read_lines, ENRICH_MAX_MATCHES
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Enrich_Tests(unittest.TestCase):
+    """
+    Test suite for testing the CSV enrichment endpoint of the ISO 3166-2 api, using the Flask test
+    client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_read_lines:
+        testing a binary stream is decoded into lines, when read in chunks smaller than a line or character.
+    test_enrich_codes:
+        testing each row is annotated with the data of the subdivision code in its chosen column.
+    test_enrich_names:
+        testing each row is annotated with the data of the subdivision name in its chosen column.
+    test_enrich_max_matches:
+        testing a name matching too many subdivisions is annotated with only the closest ones and a truncation message.
+    test_enrich_invalid:
+        testing an error is returned for invalid parameters or an empty CSV.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.enrich_url = "/api/enrich"
+
+    def enrich(self, query_string: str, body: str) -> list:
+        """ Post the input CSV to the enrich endpoint, return the rows of the annotated CSV. """
+        response = self.client.post(self.enrich_url + query_string, data=body.encode("utf-8"), content_type="text/csv")
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+    def test_read_lines(self):
+        """ Testing a binary stream is decoded into lines, when read in chunks smaller than a line or character. """
+        body = '﻿id,name\n1,"São\nPaulo"\n2,Fryslân'
+#1.)
+        for chunk_size in (1, 2, 5, 64):
+            lines = list(read_lines(io.BytesIO(body.encode("utf-8")), chunk_size))
+            self.assertEqual(lines, ["id,name\n", '1,"São\n', 'Paulo"\n', "2,Fryslân"],
+                "Expected decoded lines with chunk size {}, got {}.".format(chunk_size, lines))
+#2.)
+        self.assertEqual(list(csv.reader(read_lines(io.BytesIO(body.encode("utf-8")), 3))), [["id", "name"], ["1", "São\nPaulo"], ["2", "Fryslân"]],
+            "Expected CSV rows to be parsed from decoded lines.")
+
+    def test_enrich_codes(self):
+        """ Testing each row is annotated with the data of the subdivision code in its chosen column. """
+        rows = self.enrich("?column=place", "id,place\n1,GB-ABD\n2,ad-02\n3,XX-1\n4\n")
+#1.)
+        self.assertEqual(rows[0], ["id", "place", "iso3166_2_code", "iso3166_2_name", "iso3166_2_type", "iso3166_2_parentCode", "iso3166_2_error"],
+            "Expected header with annotation columns, got {}.".format(rows[0]))
+#2.)
+        self.assertEqual(rows[1], ["1", "GB-ABD", "GB-ABD", "Aberdeenshire", "Council area", "GB-SCT", ""],
+            "Expected row annotated with subdivision data, got {}.".format(rows[1]))
+        self.assertEqual(rows[2], ["2", "ad-02", "AD-02", "Canillo", "Parish", "", ""],
+            "Expected row annotated with subdivision data, got {}.".format(rows[2]))
+#3.)
+        self.assertEqual(rows[3][2:], ["", "", "", "", "Subdivision code XX-1 not found in list of available subdivisions for XX."],
+            "Expected row annotated with error message, got {}.".format(rows[3]))
+        self.assertEqual(rows[4], ["4", "", "", "", "", "", "The subdivision input parameter cannot be empty."],
+            "Expected row with missing column padded and annotated with error message, got {}.".format(rows[4]))
+#4.)
+        self.assertEqual(self.enrich("?column=1", "id,place\n1,GB-ABD\n")[1][2], "GB-ABD", "Expected column to be chosen by its index.")
+#5.)
+        rows = self.enrich("?column=place", "a,place,b,c,d\n5\n6,GB-ABD,x\n")
+        self.assertTrue(all(len(row) == 10 for row in rows), "Expected every row to have the 10 columns of the header, got {}.".format(rows))
+        self.assertEqual(rows[2], ["6", "GB-ABD", "x", "", "", "GB-ABD", "Aberdeenshire", "Council area", "GB-SCT", ""],
+            "Expected short row padded before its annotations, got {}.".format(rows[2]))
+
+    def test_enrich_names(self):
+        """ Testing each row is annotated with the data of the subdivision name in its chosen column. """
+        rows = self.enrich("?column=name&type=name", "name\nSão Paulo\nSaint George\n")
+#1.)
+        self.assertEqual(rows[1][1:], ["BR-SP", "São Paulo", "State", "", ""], "Expected row annotated with subdivision data, got {}.".format(rows[1]))
+#2.)
+        self.assertEqual(rows[2][1], "AG-03;BB-03;DM-04;GD-03;VC-04",
+            "Expected codes of all subdivisions sharing the name, got {}.".format(rows[2][1]))
+
+    def test_enrich_max_matches(self):
+        """ Testing a name matching too many subdivisions is annotated with only the closest ones and a truncation message. """
+        rows = self.enrich("?column=name&type=name&likeness=0", "name\nCork\nSaint George\n")
+#1.)
+        for row in rows[1:]:
+            for column in row[1:5]:
+                self.assertEqual(len(column.split(";")), ENRICH_MAX_MATCHES, "Expected {} matches in each column, got {}.".format(ENRICH_MAX_MATCHES, column))
+            self.assertRegex(row[5], r"^Matched \d+ subdivisions, only the {} closest are included, increase the likeness to narrow the matches\.$".format(ENRICH_MAX_MATCHES),
+                "Expected truncation message, got {}.".format(row[5]))
+#2.)
+        self.assertIn("IE-CO", rows[1][1].split(";"), "Expected the exact match to be kept, got {}.".format(rows[1][1]))
+        self.assertTrue(set("AG-03;BB-03;DM-04;GD-03;VC-04".split(";")) <= set(rows[2][1].split(";")), "Expected the exact matches to be kept, got {}.".format(rows[2][1]))
+        self.assertEqual(rows[2][1].split(";"), sorted(rows[2][1].split(";")), "Expected the kept codes in sorted order, got {}.".format(rows[2][1]))
+#3.)
+        self.assertEqual(self.enrich("?column=name&type=name&likeness=0.9", "name\nSaint George\n")[1][5], "",
+            "Expected no truncation message for fewer matches than the max.")
+
+    def test_enrich_invalid(self):
+        """ Testing an error is returned for invalid parameters or an empty CSV. """
+        test_invalid = [("?column=abc", "id,place\n1,GB-ABD\n", "Column query string parameter value must be a column name or index in the CSV header, got value: abc."),
+            ("?column=place", "", "The request body must be a CSV file with a header row."),
+            ("?column=place&type=abc", "id,place\n", "Type query string parameter value must be subdivision or name, got value: abc."),
+            ("?column=place&type=name&likeness=abc", "id,place\n", "Likeness query string parameter value must be between 0 - 1 or 1 - 100: abc."),
+            ("?column=place&type=name&likeness=1000", "id,place\n1,Westmeath\n", "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: 1000."),
+            ("?column=place&type=name&likeness=nan", "id,place\n1,Westmeath\n", "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: nan."),
+            ("?column=²", "id,place\n1,GB-ABD\n", "Column query string parameter value must be a column name or index in the CSV header, got value: ².")]
+#1.)
+        for query_string, body, message in test_invalid:
+            response = self.client.post(self.enrich_url + query_string, data=body, content_type="text/csv")
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
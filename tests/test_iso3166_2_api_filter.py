@@ -0,0 +1,107 @@
+import unittest
+from index import app, all_iso3166_2
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Filter_Tests(unittest.TestCase):
+    """
+    Test suite for testing the filter query string parameter of the /api/all and /api/alpha
+    endpoints of the ISO 3166-2 api, using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_filter_exact:
+        testing subdivisions are filtered on exact attribute values, with combined filters intersected.
+    test_filter_prefix:
+        testing name and localName values ending in * are prefix matched.
+    test_filter_alpha:
+        testing filters on the alpha endpoint only return subdivisions of the input countries.
+    test_filter_invalid:
+        testing an error is returned for invalid filters.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.all_url = "/api/all"
+        self.alpha_url = "/api/alpha/"
+
+    def scan(self, predicate, alpha_codes=None) -> dict:
+        """ Return the subdivision codes of each country matching the input predicate, by scanning every subdivision. """
+        countries = {}
+        for alpha_2 in (alpha_codes or all_iso3166_2):
+            for subd, subdivision in all_iso3166_2[alpha_2].items():
+                if (predicate(subdivision)):
+                    countries.setdefault(alpha_2, []).append(subd)
+        return {alpha_2: sorted(subds) for alpha_2, subds in countries.items()}
+
+    def filtered(self, url: str) -> dict:
+        """ Get the input url, return the subdivision codes of each country in the response. """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        return {alpha_2: sorted(subdivisions) for alpha_2, subdivisions in response.get_json().items()}
+
+    def test_filter_exact(self):
+        """ Testing subdivisions are filtered on exact attribute values, with combined filters intersected. """
+#1.)
+        self.assertEqual(self.filtered(self.all_url + "?filter=type=Province"), self.scan(lambda subdivision: subdivision["type"] == "Province"),
+            "Expected all subdivisions of type Province.")
+        self.assertEqual(self.filtered(self.all_url + "?filter=type=province"), self.filtered(self.all_url + "?filter=type=Province"),
+            "Expected filter values to be matched case insensitively.")
+#2.)
+        self.assertEqual(self.filtered(self.all_url + "?filter=parentCode=GB-ENG,type=Two-tier county"),
+            self.scan(lambda subdivision: subdivision["parentCode"] == "GB-ENG" and subdivision["type"] == "Two-tier county"),
+            "Expected subdivisions matching both filters.")
+#3.)
+        self.assertEqual(self.filtered(self.all_url + "?filter=name=Murcia, Región de"), {"ES": ["ES-MC"]},
+            "Expected filter value containing a comma to be matched.")
+        self.assertEqual(self.filtered(self.all_url + "?filter=type=Province,type=State"), {}, "Expected no subdivisions matching both filters.")
+#4.)
+        self.assertEqual(self.filtered(self.alpha_url + "FR?filter=parentCode="), self.scan(lambda subdivision: subdivision["parentCode"] is None, ["FR"]),
+            "Expected empty parentCode filter to match subdivisions without a parent.")
+#5.)
+        test_fields = self.client.get(self.all_url + "?filter=parentCode=GB-SCT&fields=name").get_json()
+        self.assertEqual(test_fields["GB"]["GB-ABD"], {"name": "Aberdeenshire"}, "Expected filtered subdivisions to be projected to the input fields.")
+#6.)
+        test_ndjson = self.client.get(self.all_url + "?filter=parentCode=GB-SCT&format=ndjson&granularity=subdivision").get_data(as_text=True).splitlines()
+        self.assertEqual(len(test_ndjson), len(self.scan(lambda subdivision: subdivision["parentCode"] == "GB-SCT")["GB"]),
+            "Expected a line per filtered subdivision.")
+
+    def test_filter_prefix(self):
+        """ Testing name and localName values ending in * are prefix matched. """
+#1.)
+        self.assertEqual(self.filtered(self.all_url + "?filter=localName=Baden*"),
+            self.scan(lambda subdivision: (subdivision["localName"] or "").casefold().startswith("baden")),
+            "Expected all subdivisions with a localName starting with Baden.")
+#2.)
+        self.assertEqual(self.filtered(self.all_url + "?filter=name=san*,type=Province"),
+            self.scan(lambda subdivision: subdivision["name"].casefold().startswith("san") and subdivision["type"] == "Province"),
+            "Expected all provinces with a name starting with San.")
+
+    def test_filter_alpha(self):
+        """ Testing filters on the alpha endpoint only return subdivisions of the input countries. """
+#1.)
+        self.assertEqual(self.filtered(self.alpha_url + "DE,AUT?filter=name=B*"),
+            self.scan(lambda subdivision: subdivision["name"].startswith("B"), ["AT", "DE"]),
+            "Expected subdivisions of the input countries with a name starting with B.")
+#2.)
+        self.assertEqual(self.filtered(self.alpha_url + "GB?filter=type=Province"), {}, "Expected no subdivisions of GB of type Province.")
+#3.)
+        self.assertEqual(self.filtered(self.alpha_url + "FR?filter="), self.filtered(self.alpha_url + "FR"), "Expected empty filter to be ignored.")
+
+    def test_filter_invalid(self):
+        """ Testing an error is returned for invalid filters. """
+        test_invalid = [("?filter=flag=abc", "Invalid filter query string parameter value: flag=abc. Filters must be in the format attribute=value, "
+                "using the attributes: localName, name, parentCode, type."),
+            ("?filter=type", "Invalid filter query string parameter value: type. Filters must be in the format attribute=value, "
+                "using the attributes: localName, name, parentCode, type."),
+            ("?filter=type=Prov*", "Invalid filter query string parameter value: type=Prov*. Prefix filters (value*) can only be used "
+                "with the attributes: localName, name.")]
+#1.)
+        for query_string, message in test_invalid:
+            for url in (self.all_url, self.alpha_url + "FR"):
+                response = self.client.get(url + query_string)
+                self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+                self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
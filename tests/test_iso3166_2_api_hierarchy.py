@@ -0,0 +1,87 @@
+import unittest
+from index import app, all_iso3166_2
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Hierarchy_Tests(unittest.TestCase):
+    """
+    Test suite for testing the hierarchy endpoint of the ISO 3166-2 api, using the Flask test
+    client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_hierarchy_children:
+        testing the children of a subdivision are all subdivisions with it as their parentCode.
+    test_hierarchy_descendants:
+        testing all levels of descendants are returned, limited by the depth.
+    test_hierarchy_ancestors:
+        testing the chain of ancestors is returned, limited by the depth.
+    test_hierarchy_invalid:
+        testing an error is returned for an invalid subdivision code, relation or depth.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.hierarchy_url = "/api/hierarchy/"
+
+    def relatives(self, url: str) -> dict:
+        """ Get the input url, return the sorted relative codes of each input subdivision. """
+        response = self.client.get(self.hierarchy_url + url)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        return {subd: sorted(relatives) for subd, relatives in response.get_json().items()}
+
+    def test_hierarchy_children(self):
+        """ Testing the children of a subdivision are all subdivisions with it as their parentCode. """
+#1.)
+        self.assertEqual(self.relatives("GB-ENG"), {"GB-ENG": sorted(subd for subd, subdivision in all_iso3166_2["GB"].items()
+            if (subdivision["parentCode"] or "").upper() == "GB-ENG")}, "Expected all subdivisions with parentCode GB-ENG.")
+#2.)
+        self.assertEqual(self.relatives("FR-ARA,GB-ABD"), {"FR-ARA": ["FR-01", "FR-03", "FR-07", "FR-15", "FR-26", "FR-38", "FR-42", "FR-43",
+            "FR-63", "FR-69", "FR-69M", "FR-73", "FR-74"], "GB-ABD": []}, "Expected children of each input subdivision.")
+#3.)
+        test_fields = self.client.get(self.hierarchy_url + "FR-ARA?fields=name").get_json()
+        self.assertEqual(test_fields["FR-ARA"]["FR-01"], {"name": "Ain"}, "Expected children to be projected to the input fields.")
+
+    def test_hierarchy_descendants(self):
+        """ Testing all levels of descendants are returned, limited by the depth. """
+        test_descendants = self.relatives("FR-GES?relation=descendants")["FR-GES"]
+#1.)
+        self.assertIn("FR-67", test_descendants, "Expected grandchild FR-67 in descendants of FR-GES.")
+        self.assertIn("FR-6AE", test_descendants, "Expected child FR-6AE in descendants of FR-GES.")
+#2.)
+        self.assertEqual(self.relatives("FR-GES?relation=descendants&depth=1"), self.relatives("FR-GES"),
+            "Expected descendants with a depth of 1 to equal the children.")
+        self.assertNotIn("FR-67", self.relatives("FR-GES?relation=descendants&depth=1")["FR-GES"],
+            "Expected grandchild FR-67 to be excluded by a depth of 1.")
+
+    def test_hierarchy_ancestors(self):
+        """ Testing the chain of ancestors is returned, limited by the depth. """
+#1.)
+        self.assertEqual(self.relatives("FR-67?relation=ancestors"), {"FR-67": ["FR-6AE", "FR-GES"]},
+            "Expected parent and grandparent of FR-67.")
+#2.)
+        self.assertEqual(self.relatives("FR-67?relation=ancestors&depth=1"), {"FR-67": ["FR-6AE"]},
+            "Expected only the parent of FR-67 with a depth of 1.")
+#3.)
+        self.assertEqual(self.relatives("GB-ENG,AD-02?relation=ancestors"), {"AD-02": [], "GB-ENG": []},
+            "Expected no ancestors of subdivisions without a parent.")
+
+    def test_hierarchy_invalid(self):
+        """ Testing an error is returned for an invalid subdivision code, relation or depth. """
+        test_invalid = [("GB-XXX", "Subdivision code GB-XXX not found in list of available subdivisions for GB."),
+            ("GB", "All subdivision codes must be in the format XX-Y, XX-YY or XX-YYY: GB."),
+            ("GB-ENG?relation=abc", "Relation query string parameter value must be one of ancestors, children, descendants, got value: abc."),
+            ("GB-ENG?relation=descendants&depth=0", "Depth query string parameter value must be a positive integer: 0."),
+            ("GB-ENG?depth=abc", "Depth query string parameter value must be a positive integer: abc."),
+            ("GB-ENG?depth=²", "Depth query string parameter value must be a positive integer: ².")]
+#1.)
+        for url, message in test_invalid:
+            response = self.client.get(self.hierarchy_url + url)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+#2.)
+        self.assertEqual(self.client.get("/api/hierarchy").get_json()["message"], "The subdivision input parameter cannot be empty.",
+            "Expected error message of empty subdivision code.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
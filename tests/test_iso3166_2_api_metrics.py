@@ -0,0 +1,103 @@
+import unittest
+import re
+import index
+from index import app
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Metrics_Tests(unittest.TestCase):
+    """
+    Test suite for testing the metrics endpoint of the ISO 3166-2 api, using the Flask test client
+    rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_metrics:
+        testing the requests served are counted, with their latency, response size and errors.
+    test_metrics_fuzzy_candidates:
+        testing the fuzzy matching candidates scored by the name endpoints are observed.
+    test_metrics_caches:
+        testing the statistics of the caches and the current dataset are exported.
+    test_metrics_startup_diagnostics:
+        testing the time taken to import each dependency and load the dataset at startup is exported.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.metrics_url = "/metrics"
+
+    def sample(self, metrics: str, name: str) -> float:
+        """ Return the value of the sample with the input name and labels in the metrics, 0 if not present. """
+        match = re.search("^" + re.escape(name) + r" (\S+)$", metrics, re.MULTILINE)
+        return float(match.group(1)) if match else 0
+
+    def test_metrics(self):
+        """ Testing the requests served are counted, with their latency, response size and errors. """
+        before = self.client.get(self.metrics_url).get_data(as_text=True)
+        self.client.get("/api/alpha/IE")
+        self.client.get("/api/alpha/ZZ")
+        self.client.get("/api/invalid")
+        response = self.client.get(self.metrics_url)
+#1.)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.content_type, "text/plain; version=0.0.4; charset=utf-8", "Expected Prometheus text format content type.")
+        metrics = response.get_data(as_text=True)
+#2.)
+        for name, increase in [('iso3166_2_requests_total{endpoint="api_alpha",method="GET",status="200"}', 1),
+                ('iso3166_2_requests_total{endpoint="api_alpha",method="GET",status="400"}', 1),
+                ('iso3166_2_request_errors_total{endpoint="api_alpha",status="400"}', 1),
+                ('iso3166_2_request_errors_total{endpoint="not_found",status="404"}', 1),
+                ('iso3166_2_request_duration_seconds_count{endpoint="api_alpha"}', 2),
+                ('iso3166_2_response_size_bytes_count{endpoint="api_alpha"}', 2)]:
+            self.assertEqual(self.sample(metrics, name) - self.sample(before, name), increase, "Expected {} to increase by {}.".format(name, increase))
+#3.)
+        self.assertGreater(self.sample(metrics, 'iso3166_2_response_size_bytes_sum{endpoint="api_alpha"}'),
+            self.sample(before, 'iso3166_2_response_size_bytes_sum{endpoint="api_alpha"}'), "Expected the response sizes to be summed.")
+
+    def test_metrics_fuzzy_candidates(self):
+        """ Testing the fuzzy matching candidates scored by the name endpoints are observed. """
+        before = self.client.get(self.metrics_url).get_data(as_text=True)
+        self.client.get("/api/name/Westmeathh")
+        self.client.get("/api/country_name/Irelandd")
+        metrics = self.client.get(self.metrics_url).get_data(as_text=True)
+#1.)
+        for endpoint in ("api_subdivision_name", "api_country_name"):
+            name = 'iso3166_2_fuzzy_candidates_scored_count{{endpoint="{}"}}'.format(endpoint)
+            self.assertEqual(self.sample(metrics, name) - self.sample(before, name), 1, "Expected candidates scored observed for {}.".format(endpoint))
+            name = 'iso3166_2_fuzzy_candidates_scored_sum{{endpoint="{}"}}'.format(endpoint)
+            self.assertGreater(self.sample(metrics, name), self.sample(before, name), "Expected candidates to be scored by {}.".format(endpoint))
+#2.)
+        self.assertNotIn('iso3166_2_fuzzy_candidates_scored_count{endpoint="api_alpha"}', metrics, "Expected no candidates observed for api_alpha.")
+
+    def test_metrics_caches(self):
+        """ Testing the statistics of the caches and the current dataset are exported. """
+        self.client.get("/api/name/Dublin")
+        self.client.get("/api/name/Dublin")
+        metrics = self.client.get(self.metrics_url).get_data(as_text=True)
+#1.)
+        self.assertGreaterEqual(self.sample(metrics, "iso3166_2_name_cache_hits_total"), 1, "Expected name cache hits to be exported.")
+        self.assertIn("# TYPE iso3166_2_name_cache_size gauge", metrics, "Expected name cache size to be exported.")
+        self.assertRegex(metrics, r'iso3166_2_dataset_cache_size\{cache="projected_subdivision"\} \d+', "Expected dataset cache sizes to be exported.")
+        self.assertRegex(metrics, r'iso3166_2_dataset_info\{version="[\d.]+",source="\S+"\} 1', "Expected the dataset version to be exported.")
+
+    def test_metrics_startup_diagnostics(self):
+        """ Testing the time taken to import each dependency and load the dataset at startup is exported. """
+        self.client.get("/api/name/Dublin")
+        metrics = self.client.get(self.metrics_url).get_data(as_text=True)
+#1.)
+        for module_name, import_ms in index.startup_diagnostics["import_ms"].items():
+            self.assertAlmostEqual(self.sample(metrics, 'iso3166_2_startup_import_seconds{{module="{}"}}'.format(module_name)), import_ms / 1000, places=6,
+                msg="Expected the import time of {} to be exported.".format(module_name))
+        self.assertIn("flask", index.startup_diagnostics["import_ms"], "Expected the import time of flask to be recorded.")
+#2.)
+        self.assertIn("# TYPE iso3166_2_lazy_import_seconds gauge", metrics, "Expected the lazy import times to be exported.")
+        for module_name, import_ms in index.startup_diagnostics["lazy_import_ms"].items():
+            self.assertAlmostEqual(self.sample(metrics, 'iso3166_2_lazy_import_seconds{{module="{}"}}'.format(module_name)), import_ms / 1000, places=6,
+                msg="Expected the lazy import time of {} to be exported.".format(module_name))
+#3.)
+        self.assertAlmostEqual(self.sample(metrics, 'iso3166_2_startup_dataset_load_seconds{{source="{}"}}'.format(index.startup_diagnostics["dataset_source"])),
+            index.startup_diagnostics["dataset_load_ms"] / 1000, places=6, msg="Expected the dataset load time to be exported.")
+        self.assertIn("# TYPE iso3166_2_startup_dataset_load_seconds gauge", metrics, "Expected the dataset load time to be exported as a gauge.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,48 @@
+import unittest
+from index import app, parse_likeness
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Name_Tests(unittest.TestCase):
+    """
+    Test suite for testing the likeness query string parameter of the name endpoint of the
+    ISO 3166-2 api, using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_parse_likeness:
+        testing likeness values between 0 - 1 or 1 - 100 are parsed, all other values rejected.
+    test_name_likeness:
+        testing an error is returned for a likeness outside of 0 - 100 or that isn't a finite number.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.name_url = "/api/name/"
+
+    def test_parse_likeness(self):
+        """ Testing likeness values between 0 - 1 or 1 - 100 are parsed, all other values rejected. """
+#1.)
+        for likeness, expected in [(None, None), ("0", 0), ("0.5", 0.5), ("1", 1), ("50", 0.5), ("100", 1)]:
+            self.assertEqual(parse_likeness(likeness), (expected, None), "Expected likeness {} for input {}.".format(expected, likeness))
+#2.)
+        for likeness in ("-1", "100.5", "101", "1000", "inf", "-inf", "nan"):
+            self.assertEqual(parse_likeness(likeness), (None, "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: {}.".format(likeness)),
+                "Expected error for likeness {}, got {}.".format(likeness, parse_likeness(likeness)))
+
+    def test_name_likeness(self):
+        """ Testing an error is returned for a likeness outside of 0 - 100 or that isn't a finite number. """
+#1.)
+        for likeness in ("101", "1000", "inf", "nan", "-5"):
+            response = self.client.get(self.name_url + "Derry?likeness=" + likeness)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code for likeness {}, got {}.".format(likeness, response.status_code))
+            self.assertEqual(response.get_json()["message"], "Likeness query string parameter value must be between 0 - 1 or 1 - 100, got value: {}.".format(likeness),
+                "Expected likeness error message, got {}.".format(response.get_json()))
+#2.)
+        for likeness in ("100", "0.9", "90"):
+            response = self.client.get(self.name_url + "Westmeath?likeness=" + likeness)
+            self.assertEqual(response.status_code, 200, "Expected 200 status code for likeness {}, got {}.".format(likeness, response.status_code))
+            self.assertIn("IE-WH", response.get_json(), "Expected Westmeath to match with likeness {}.".format(likeness))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+import json
+import unittest
+from index import app, all_iso3166_2
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_NDJSON_Tests(unittest.TestCase):
+    """
+    Test suite for testing the newline delimited JSON (NDJSON) streaming of the /api/all and
+    /api/list_subdivisions endpoints of the ISO 3166-2 api, using the Flask test client rather
+    than the hosted API.
+
+    Test Cases
+    ==========
+    test_all_ndjson:
+        testing /api/all is streamed as one line per country or subdivision, merging into the JSON response, including countries without subdivisions.
+    test_list_subdivisions_ndjson:
+        testing /api/list_subdivisions is streamed as one line per country or subdivision, merging into the JSON response, including countries without subdivisions.
+    test_invalid_stream_params:
+        testing an error is returned for an invalid format or granularity.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.all_url = "/api/all"
+        self.list_subdivisions_url = "/api/list_subdivisions"
+
+    def ndjson_lines(self, url: str) -> list:
+        """ Get the input url, check it's a well framed NDJSON response and return its parsed lines. """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code for {}, got {}.".format(url, response.status_code))
+        self.assertEqual(response.mimetype, "application/x-ndjson", "Expected NDJSON response for {}, got {}.".format(url, response.mimetype))
+        self.assertTrue(response.is_streamed, "Expected a streamed response for {}.".format(url))
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.endswith("\n"), "Expected the last line to be terminated by a newline for {}.".format(url))
+        lines = body[:-1].split("\n")
+        for line in lines:
+            self.assertNotEqual(line.strip(), "", "Expected no empty lines for {}.".format(url))
+            self.assertIsInstance(json.loads(line), dict, "Expected each line to be a JSON object for {}, got {}.".format(url, line[:50]))
+        return [json.loads(line) for line in lines]
+
+    def merge(self, lines: list, merge_values) -> dict:
+        """ Merge the parsed NDJSON lines, each a single country keyed object, into one object, merging the values of repeated countries. """
+        merged = {}
+        for line in lines:
+            self.assertEqual(len(line), 1, "Expected each line to have a single country, got {}.".format(list(line)))
+            country, value = next(iter(line.items()))
+            merged[country] = merge_values(merged[country], value) if (country in merged) else value
+        return merged
+
+    def test_all_ndjson(self):
+        """ Testing /api/all is streamed as one line per country or subdivision, merging into the JSON response, including countries without subdivisions. """
+        test_all = self.client.get(self.all_url).get_json()
+#1.)
+        test_lines = self.ndjson_lines(self.all_url + "?format=ndjson")
+        self.assertEqual(len(test_lines), len(all_iso3166_2), "Expected one line per country, got {}.".format(len(test_lines)))
+        self.assertEqual([next(iter(line)) for line in test_lines], sorted(all_iso3166_2), "Expected the countries in alpha-2 code order.")
+        self.assertEqual(self.merge(test_lines, lambda merged, value: {**merged, **value}), test_all, "Expected the lines to merge into the JSON response.")
+#2.)
+        test_lines = self.ndjson_lines(self.all_url + "?format=NDJSON&granularity=subdivision")
+        self.assertEqual(len(test_lines), sum(max(len(subdivisions), 1) for subdivisions in all_iso3166_2.values()),
+            "Expected one line per subdivision, and per country without subdivisions, got {}.".format(len(test_lines)))
+        self.assertTrue(all(len(next(iter(line.values()))) == min(len(all_iso3166_2[next(iter(line))]), 1) for line in test_lines),
+            "Expected a single subdivision per line, or none for a country without subdivisions.")
+        self.assertEqual(self.merge(test_lines, lambda merged, value: {**merged, **value}), test_all, "Expected the lines to merge into the JSON response.")
+#3.)
+        test_lines = self.ndjson_lines(self.all_url + "?format=ndjson&granularity=subdivision&fields=name")
+        self.assertEqual(self.merge(test_lines, lambda merged, value: {**merged, **value}), self.client.get(self.all_url + "?fields=name").get_json(),
+            "Expected the projected lines to merge into the projected JSON response.")
+
+    def test_list_subdivisions_ndjson(self):
+        """ Testing /api/list_subdivisions is streamed as one line per country or subdivision, merging into the JSON response, including countries without subdivisions. """
+        test_list_subdivisions = self.client.get(self.list_subdivisions_url).get_json()
+#1.)
+        test_lines = self.ndjson_lines(self.list_subdivisions_url + "?format=ndjson")
+        self.assertEqual(len(test_lines), len(all_iso3166_2), "Expected one line per country, got {}.".format(len(test_lines)))
+        self.assertEqual(self.merge(test_lines, lambda merged, value: merged + value), test_list_subdivisions,
+            "Expected the lines to merge into the JSON response.")
+#2.)
+        test_lines = self.ndjson_lines(self.list_subdivisions_url + "?format=ndjson&granularity=subdivision")
+        self.assertEqual(len(test_lines), sum(max(len(subdivisions), 1) for subdivisions in all_iso3166_2.values()),
+            "Expected one line per subdivision, and per country without subdivisions, got {}.".format(len(test_lines)))
+        self.assertTrue(all(len(next(iter(line.values()))) == min(len(all_iso3166_2[next(iter(line))]), 1) for line in test_lines),
+            "Expected a single subdivision code per line, or none for a country without subdivisions.")
+        self.assertEqual(self.merge(test_lines, lambda merged, value: merged + value), test_list_subdivisions,
+            "Expected the lines to merge into the JSON response, with the subdivision codes in the same order.")
+#3.)
+        self.assertEqual(self.client.get(self.list_subdivisions_url + "?format=json").get_json(), test_list_subdivisions,
+            "Expected the JSON response if the format is json.")
+
+    def test_invalid_stream_params(self):
+        """ Testing an error is returned for an invalid format or granularity. """
+        test_invalid_params = [("?format=csv", "Format query string parameter value must be json or ndjson, got value: csv."),
+            ("?format=ndjson&granularity=region", "Granularity query string parameter value must be country or subdivision, got value: region.")]
+#1.)
+        for url in (self.all_url, self.list_subdivisions_url):
+            for params, message in test_invalid_params:
+                response = self.client.get(url + params)
+                self.assertEqual(response.status_code, 400, "Expected 400 status code for {}, got {}.".format(url + params, response.status_code))
+                self.assertEqual(response.get_json()["message"], message, "Expected error message, got {}.".format(response.get_json()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,138 @@
+import json
+import unittest
+import random
+from index import app, bulk_nearest_subdivisions, nearest_subdivisions
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Nearest_Tests(unittest.TestCase):
+    """
+    Test suite for testing the nearest endpoint of the ISO 3166-2 api, using the Flask test client
+    rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_nearest:
+        testing the nearest subdivisions to the coordinates are returned with their distance.
+    test_nearest_order:
+        testing the nearest subdivisions are returned ordered closest first.
+    test_nearest_country_radius:
+        testing the search is restricted to the input countries and radius.
+    test_nearest_invalid:
+        testing an error is returned for invalid query string parameters.
+    test_bulk_nearest_subdivisions:
+        testing the bulk reverse geocoding returns the same nearest subdivision as a single lookup, in input order.
+    test_nearest_bulk:
+        testing the nearest subdivision to each coordinate in the request body is streamed as NDJSON.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.nearest_url = "/api/nearest"
+
+    def nearest(self, query_string: str) -> dict:
+        """ Get the nearest endpoint with the input query string, return the distance of each subdivision. """
+        response = self.client.get(self.nearest_url + query_string)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        return {subd: subdivision["distance"] for subd, subdivision in response.get_json().items()}
+
+    def test_nearest(self):
+        """ Testing the nearest subdivisions to the coordinates are returned with their distance. """
+#1.)
+        self.assertEqual(self.nearest("?lat=53.35&lng=-6.26"), {"IE-D": 0.0}, "Expected nearest subdivision IE-D.")
+#2.)
+        test_nearest = self.nearest("?lat=53.35&lng=-6.26&k=3")
+        self.assertEqual(sorted(test_nearest, key=test_nearest.get), ["IE-D", "IE-MH", "IE-WW"],
+            "Expected 3 nearest subdivisions, got {}.".format(test_nearest))
+#3.)
+        test_data = self.client.get(self.nearest_url + "?lat=53.35&lng=-6.26&fields=name,type").get_json()
+        self.assertEqual(test_data, {"IE-D": {"distance": 0.0, "name": "Dublin", "type": "County"}},
+            "Expected subdivision data projected to the input fields, with its distance.")
+
+    def test_nearest_order(self):
+        """ Testing the nearest subdivisions are returned ordered closest first. """
+        for query_string in ("?lat=53.35&lng=-6.26&k=10", "?lat=53.0&lng=-6.3&k=10", "?lat=48.86&lng=2.35&k=25&country=FR", "?lat=40.71&lng=-74.0&k=100"):
+            response = self.client.get(self.nearest_url + query_string)
+            #parse the raw body, keeping the order of the keys
+            test_nearest = list(json.loads(response.data).items())
+#1.)
+            test_distances = [subdivision["distance"] for _, subdivision in test_nearest]
+            self.assertEqual(test_distances, sorted(test_distances), "Expected subdivisions ordered closest first for {}, got {}.".format(query_string,
+                [(subd, subdivision["distance"]) for subd, subdivision in test_nearest]))
+            self.assertNotEqual([subd for subd, _ in test_nearest], sorted(subd for subd, _ in test_nearest),
+                "Expected subdivisions not ordered by code for {}.".format(query_string))
+#2.)
+            self.assertTrue(all(list(subdivision) == sorted(subdivision) for _, subdivision in test_nearest), "Expected each subdivision's attributes sorted.")
+#3.)
+        test_nearest = list(json.loads(self.client.get(self.nearest_url + "?lat=53.0&lng=-6.3&k=5").data))
+        self.assertLess(test_nearest.index("IE-WW"), test_nearest.index("IE-D"), "Expected IE-WW before the further IE-D, got {}.".format(test_nearest))
+
+    def test_nearest_country_radius(self):
+        """ Testing the search is restricted to the input countries and radius. """
+#1.)
+        test_country = self.nearest("?lat=53.35&lng=-6.26&k=5&country=GBR,FR")
+        self.assertEqual(len(test_country), 5, "Expected 5 nearest subdivisions, got {}.".format(test_country))
+        self.assertTrue(all(subd.startswith("GB-") for subd in test_country), "Expected only subdivisions of GB, got {}.".format(test_country))
+#2.)
+        test_radius = self.nearest("?lat=53.35&lng=-6.26&k=100&radius=50")
+        self.assertTrue(0 < len(test_radius) < 100 and all(distance <= 50 for distance in test_radius.values()),
+            "Expected only subdivisions within 50km, got {}.".format(test_radius))
+#3.)
+        self.assertEqual(self.nearest("?lat=0&lng=-30&radius=10"), {}, "Expected no subdivisions within 10km of the Atlantic.")
+
+    def test_nearest_invalid(self):
+        """ Testing an error is returned for invalid query string parameters. """
+        test_invalid = [("?lat=53.35", "The lat and lng query string parameters are required, e.g /api/nearest?lat=53.35&lng=-6.26."),
+            ("?lat=91&lng=0", "Lat query string parameter value must be a number between -90 and 90, got value: 91."),
+            ("?lat=0&lng=abc", "Lng query string parameter value must be a number between -180 and 180, got value: abc."),
+            ("?lat=0&lng=0&k=0", "K query string parameter value must be an integer between 1 and 100, got value: 0."),
+            ("?lat=0&lng=0&k=²", "K query string parameter value must be an integer between 1 and 100, got value: ²."),
+            ("?lat=0&lng=0&radius=-5", "Radius query string parameter value must be a positive number of km, got value: -5."),
+            ("?lat=0&lng=0&country=ZZ", "Invalid ISO 3166-1 alpha country code input, cannot convert into corresponding alpha-2 code: ZZ.")]
+#1.)
+        for query_string, message in test_invalid:
+            response = self.client.get(self.nearest_url + query_string)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+
+    def test_bulk_nearest_subdivisions(self):
+        """ Testing the bulk reverse geocoding returns the same nearest subdivision as a single lookup, in input order. """
+        random.seed(0)
+        lats, lngs = [random.uniform(-90, 90) for _ in range(1000)], [random.uniform(-180, 180) for _ in range(1000)]
+#1.)
+        for alpha_codes, radius, tile_size in [(None, None, 64), (["GB", "FR"], None, 1000), (["GB", "FR"], 500, 100), (["AQ"], None, 64)]:
+            test_bulk = list(bulk_nearest_subdivisions(lats, lngs, alpha_codes, radius, tile_size))
+            expected = [(nearest_subdivisions(lat, lng, 1, alpha_codes, radius) or [(None, None)])[0] for lat, lng in zip(lats, lngs)]
+            self.assertEqual([subd for subd, _ in test_bulk], [subd for subd, _ in expected],
+                "Expected the same nearest subdivisions as single lookups for countries {} and radius {}.".format(alpha_codes, radius))
+            self.assertEqual([None if distance is None else round(distance, 6) for _, distance in test_bulk], 
+                [None if distance is None else round(distance, 6) for _, distance in expected], "Expected the same distances as single lookups.")
+#2.)
+        with self.assertRaises(ValueError):
+            list(bulk_nearest_subdivisions([1, 2], [1]))
+
+    def test_nearest_bulk(self):
+        """ Testing the nearest subdivision to each coordinate in the request body is streamed as NDJSON. """
+        response = self.client.post(self.nearest_url, json={"lat": [53.35, 0, 51.5], "lng": [-6.26, -30, -0.12]})
+#1.)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.mimetype, "application/x-ndjson", "Expected NDJSON response, got {}.".format(response.mimetype))
+        test_lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([line.split(",")[0] for line in test_lines], ['{"code":"IE-D"', '{"code":"BR-RN"', '{"code":"GB-LBH"'],
+            "Expected nearest subdivision to each coordinate in input order, got {}.".format(test_lines))
+#2.)
+        response = self.client.post(self.nearest_url + "?country=GB&radius=100", json={"lat": [53.35, 51.5], "lng": [-6.26, -0.12]})
+        self.assertEqual(response.get_data(as_text=True), '{"code":null,"distance":null}\n{"code":"GB-LBH","distance":0.681}\n',
+            "Expected no subdivision of GB within 100km of the first coordinate.")
+#3.)
+        test_invalid = [({"lat": [1], "lng": []}, 'The request body must be a JSON object of equal length lat and lng arrays, e.g {"lat": [53.35], "lng": [-6.26]}.'),
+            ([1, 2], 'The request body must be a JSON object of equal length lat and lng arrays, e.g {"lat": [53.35], "lng": [-6.26]}.'),
+            ({"lat": [1, 100], "lng": [1, 2]}, "Invalid coordinate at index 1: lat must be a number between -90 and 90 and lng between -180 and 180, got 100, 2."),
+            ({"lat": ["1"], "lng": [1]}, 'Invalid coordinate at index 0: lat must be a number between -90 and 90 and lng between -180 and 180, got "1", 1.')]
+        for body, message in test_invalid:
+            response = self.client.post(self.nearest_url, json=body)
+            self.assertEqual(response.status_code, 400, "Expected 400 status code, got {}.".format(response.status_code))
+            self.assertEqual(response.get_json()["message"], message, "Expected error message {}, got {}.".format(message, response.get_json()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
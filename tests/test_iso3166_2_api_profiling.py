@@ -0,0 +1,96 @@
+import pstats
+import tempfile
+import os
+import unittest
+import index
+from index import app
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Profiling_Tests(unittest.TestCase):
+    """
+    Test suite for testing the opt-in profiling of requests and the profiles endpoint of the
+    ISO 3166-2 api, using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_profiled_request:
+        testing a request with the profile token is profiled, returning the duration of each phase.
+    test_unprofiled_request:
+        testing requests without the profile token, or if profiling is disabled, aren't profiled.
+    test_profiles:
+        testing the profiles are listed and downloaded as pstats files or text, only with the profile token.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client and profile token. """
+        self.client = app.test_client()
+        self.profiles_url = "/api/profiles"
+        self.profile_token = index.profile_token
+        index.profile_token = "test-profile-token"
+        self.headers = {"X-Profile-Token": "test-profile-token"}
+
+    def tearDown(self):
+        """ Restore the profile token. """
+        index.profile_token = self.profile_token
+
+    def test_profiled_request(self):
+        """ Testing a request with the profile token is profiled, returning the duration of each phase. """
+        test_requests = [("/api/name/Westmeath", ["parse", "resolve", "serialize", "total"]),
+            ("/api/country_name/Irelandd", ["parse", "resolve", "serialize", "total"]),
+            ("/api/alpha/IE,FR", ["resolve", "serialize", "total"]), ("/api/list_subdivisions", ["total"])]
+#1.)
+        for url, phases in test_requests:
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+            self.assertEqual([timing.split(";")[0] for timing in response.headers["Server-Timing"].split(", ")], phases,
+                "Expected phases {} for {}, got {}.".format(phases, url, response.headers["Server-Timing"]))
+#2.)
+            test_summary = self.client.get(self.profiles_url, headers=self.headers).get_json()[0]
+            self.assertEqual(test_summary["id"], int(response.headers["X-Profile-Id"]), "Expected the request's profile to be kept.")
+            self.assertEqual((test_summary["path"], test_summary["status"]), (url, 200), "Expected the request's path and status code.")
+#3.)
+        response = self.client.get("/api/name/Westmeath", headers={"X-Profile-Token": "wrong-token"})
+        self.assertNotIn("Server-Timing", response.headers, "Expected no profiling with an invalid profile token.")
+
+    def test_unprofiled_request(self):
+        """ Testing requests without the profile token, or if profiling is disabled, aren't profiled. """
+#1.)
+        response = self.client.get("/api/subdivision/IE-D")
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertNotIn("Server-Timing", response.headers, "Expected no profiling without the profile token.")
+#2.)
+        index.profile_token = None
+        response = self.client.get("/api/subdivision/IE-D", headers=self.headers)
+        self.assertNotIn("Server-Timing", response.headers, "Expected no profiling when profiling is disabled.")
+        response = self.client.get(self.profiles_url, headers=self.headers)
+        self.assertEqual(response.status_code, 403, "Expected 403 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["message"], "Profiling is disabled, set the ISO3166_2_PROFILE_TOKEN environment variable to enable it.",
+            "Expected error message, got {}.".format(response.get_json()))
+
+    def test_profiles(self):
+        """ Testing the profiles are listed and downloaded as pstats files or text, only with the profile token. """
+        profile_id = self.client.get("/api/name/Dublin", headers=self.headers).headers["X-Profile-Id"]
+#1.)
+        response = self.client.get(self.profiles_url + "/" + profile_id, headers=self.headers)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.headers["Content-Disposition"], "attachment; filename=profile-{}.pstats".format(profile_id), "Expected pstats file.")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "profile.pstats"), "wb") as pstats_file:
+                pstats_file.write(response.data)
+            test_stats = pstats.Stats(os.path.join(temp_dir, "profile.pstats"))
+        self.assertTrue(any(function_name == "api_subdivision_name" for _, _, function_name in test_stats.stats), "Expected the view to be profiled.")
+#2.)
+        response = self.client.get(self.profiles_url + "/" + profile_id + "?format=text", headers=self.headers)
+        self.assertIn("api_subdivision_name", response.get_data(as_text=True), "Expected the stats as text.")
+#3.)
+        for url, status in [(self.profiles_url + "/0", 404), (self.profiles_url + "/" + profile_id + "?format=svg", 400)]:
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(response.status_code, status, "Expected {} status code, got {}.".format(status, response.status_code))
+#4.)
+        for headers in ({}, {"X-Profile-Token": "wrong-token"}):
+            response = self.client.get(self.profiles_url + "/" + profile_id, headers=headers)
+            self.assertEqual(response.status_code, 401, "Expected 401 status code, got {}.".format(response.status_code))
+            self.assertEqual(self.client.get(self.profiles_url, headers=headers).status_code, 401, "Expected 401 status code.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
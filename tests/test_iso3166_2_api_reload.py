@@ -0,0 +1,196 @@
+import gc
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import index
+from flask import g
+from index import app, active_dataset, reload_dataset, start_reload, start_snapshot_watcher
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Reload_Tests(unittest.TestCase):
+    """
+    Test suite for testing the hot reload of the dataset and the admin reload endpoint of the
+    ISO 3166-2 api, using the Flask test client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_dataset_immutable:
+        testing the dataset's attributes can't be changed.
+    test_reload_dataset:
+        testing a reloaded dataset is swapped in with warmed caches, while requests in flight keep their dataset.
+    test_admin_reload:
+        testing the admin endpoint starts a reload and returns its status, only with the admin token.
+    test_start_reload_concurrent:
+        testing only one of many concurrent calls starts a reload, which holds the reload lock until finished.
+    test_snapshot_watcher:
+        testing the snapshot watcher is only started if its interval is set.
+    test_reload_gc:
+        testing garbage collection is only paused while loading the snapshot at startup, not while reloading.
+    test_reload_name_cache:
+        testing the name cache's entries of a reloaded dataset aren't evicted by requests in flight using the previous dataset.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client and admin token. """
+        self.client = app.test_client()
+        self.reload_url = "/api/admin/reload"
+        self.admin_token = index.admin_token
+        index.admin_token = "test-admin-token"
+        self.headers = {"Authorization": "Bearer test-admin-token"}
+
+    def tearDown(self):
+        """ Restore the admin token. """
+        index.admin_token = self.admin_token
+
+    def test_dataset_immutable(self):
+        """ Testing the dataset's attributes can't be changed. """
+#1.)
+        with self.assertRaises(AttributeError):
+            index.current_dataset.all_iso3166_2 = {}
+#2.)
+        self.assertIs(index.all_iso3166_2, index.current_dataset.all_iso3166_2, "Expected module attribute of the current dataset.")
+        self.assertEqual(index.iso3166_2_version, index.current_dataset.version, "Expected module attribute of the current dataset's version.")
+
+    def test_reload_dataset(self):
+        """ Testing a reloaded dataset is swapped in with warmed caches, while requests in flight keep their dataset. """
+        previous_dataset = index.current_dataset
+#1.)
+        with app.test_request_context("/api/alpha/IE"):
+            pinned_dataset = active_dataset()
+            self.assertTrue(reload_dataset(), "Expected the reloaded dataset to be swapped in.")
+            self.assertIs(active_dataset(), pinned_dataset, "Expected the request in flight to keep using its dataset.")
+        self.assertIsNot(index.current_dataset, previous_dataset, "Expected a new current dataset.")
+        self.assertIs(active_dataset(), index.current_dataset, "Expected the new dataset outside of a request.")
+#2.)
+        self.assertIn("all_iso3166_2_response", index.current_dataset.caches, "Expected the new dataset's caches to be warmed.")
+        self.assertEqual(index.current_dataset.version, previous_dataset.version, "Expected the same version of the dataset.")
+        self.assertEqual(index.current_dataset.subdivision_codes.keys(), previous_dataset.subdivision_codes.keys(),
+            "Expected the same subdivisions in the reloaded dataset.")
+#3.)
+        response = self.client.get("/api/subdivision/IE-D")
+        self.assertEqual(response.status_code, 200, "Expected 200 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["IE-D"]["name"], "Dublin", "Expected subdivision data from the reloaded dataset.")
+#4.)
+        with index.reload_lock:
+            self.assertFalse(reload_dataset(), "Expected no reload while another reload is running.")
+
+    def test_admin_reload(self):
+        """ Testing the admin endpoint starts a reload and returns its status, only with the admin token. """
+#1.)
+        response = self.client.post(self.reload_url, headers=self.headers)
+        self.assertEqual(response.status_code, 202, "Expected 202 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["state"], "reloading", "Expected reload to be started.")
+        for thread in threading.enumerate():
+            if (thread.name == "iso3166-2-reload"):
+                thread.join()
+#2.)
+        test_status = self.client.get(self.reload_url, headers=self.headers).get_json()
+        self.assertEqual(test_status["state"], "idle", "Expected the reload to have finished, got {}.".format(test_status))
+        self.assertEqual(test_status["version"], index.current_dataset.version, "Expected the version of the current dataset.")
+        self.assertIsNotNone(test_status["reloaded_at"], "Expected the time of the latest reload.")
+        with index.reload_lock:
+            response = self.client.post(self.reload_url, headers=self.headers)
+            self.assertEqual(response.status_code, 409, "Expected 409 status code, got {}.".format(response.status_code))
+#3.)
+        response = self.client.post(self.reload_url, headers={"Authorization": "Bearer wrong-token"})
+        self.assertEqual(response.status_code, 401, "Expected 401 status code, got {}.".format(response.status_code))
+        self.assertEqual(self.client.get(self.reload_url).status_code, 401, "Expected 401 status code without an admin token.")
+#4.)
+        index.admin_token = None
+        response = self.client.post(self.reload_url, headers=self.headers)
+        self.assertEqual(response.status_code, 403, "Expected 403 status code, got {}.".format(response.status_code))
+        self.assertEqual(response.get_json()["message"], "The admin endpoints are disabled, set the ISO3166_2_ADMIN_TOKEN environment variable to enable them.",
+            "Expected error message, got {}.".format(response.get_json()))
+
+    def test_start_reload_concurrent(self):
+        """ Testing only one of many concurrent calls starts a reload, which holds the reload lock until finished. """
+        test_warming = threading.Event()
+        test_release = threading.Event()
+        warm_caches = index.warm_caches
+        def test_warm_caches(dataset):
+            test_warming.set()
+            test_release.wait(10)
+            warm_caches(dataset)
+        test_barrier = threading.Barrier(8)
+        test_started = []
+        def test_start():
+            test_barrier.wait()
+            test_started.append(start_reload())
+#1.)
+        with mock.patch.object(index, "warm_caches", side_effect=test_warm_caches):
+            test_threads = [threading.Thread(target=test_start) for _ in range(8)]
+            for thread in test_threads:
+                thread.start()
+            for thread in test_threads:
+                thread.join()
+            self.assertEqual(sorted(test_started), [False] * 7 + [True], "Expected only one reload to be started, got {}.".format(test_started))
+#2.)
+            self.assertTrue(test_warming.wait(10), "Expected the started reload to be running.")
+            self.assertTrue(index.reload_lock.locked(), "Expected the reload lock to be held by the running reload.")
+            self.assertFalse(start_reload(), "Expected no reload to be started while another is running.")
+            test_release.set()
+            for thread in threading.enumerate():
+                if (thread.name == "iso3166-2-reload"):
+                    thread.join()
+#3.)
+        self.assertFalse(index.reload_lock.locked(), "Expected the reload lock to be released once the reload finished.")
+        self.assertEqual(index.reload_status["state"], "idle", "Expected the reload to have finished, got {}.".format(index.reload_status))
+
+    def test_snapshot_watcher(self):
+        """ Testing the snapshot watcher is only started if its interval is set. """
+#1.)
+        self.assertIsNone(start_snapshot_watcher(0), "Expected no watcher when the interval is 0.")
+#2.)
+        test_watcher = start_snapshot_watcher(3600)
+        self.assertTrue(test_watcher.is_alive() and test_watcher.daemon, "Expected a running daemon watcher thread.")
+
+    def test_reload_gc(self):
+        """ Testing garbage collection is only paused while loading the snapshot at startup, not while reloading. """
+        test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(test_dir.cleanup)
+        test_snapshot_path = os.path.join(test_dir.name, "iso3166-2-snapshot.pickle")
+        index.save_snapshot(index.build_dataset(), test_snapshot_path)
+#1.)
+        with mock.patch.object(index.gc, "disable", wraps=gc.disable) as test_disable:
+            self.assertTrue(reload_dataset(), "Expected the reloaded dataset to be swapped in.")
+            self.assertIsNotNone(index.load_snapshot(test_snapshot_path), "Expected the snapshot to be loaded.")
+        self.assertFalse(test_disable.called, "Expected garbage collection not to be paused while reloading.")
+        self.assertTrue(gc.isenabled(), "Expected garbage collection to be enabled.")
+#2.)
+        with mock.patch.object(index.gc, "disable", wraps=gc.disable) as test_disable:
+            self.assertIsNotNone(index.load_snapshot(test_snapshot_path, pause_gc=True), "Expected the snapshot to be loaded.")
+        self.assertEqual(test_disable.call_count, 1, "Expected garbage collection to be paused while loading the snapshot at startup.")
+        self.assertTrue(gc.isenabled(), "Expected garbage collection to be re-enabled once loaded.")
+#3.)
+        gc.disable()
+        try:
+            self.assertIsNotNone(index.load_snapshot(test_snapshot_path, pause_gc=True), "Expected the snapshot to be loaded.")
+            self.assertFalse(gc.isenabled(), "Expected garbage collection disabled beforehand to be kept disabled.")
+        finally:
+            gc.enable()
+
+    def test_reload_name_cache(self):
+        """ Testing the name cache's entries of a reloaded dataset aren't evicted by requests in flight using the previous dataset. """
+        with app.test_request_context("/api/name/Cork"):
+            previous_dataset = active_dataset()
+            self.assertTrue(reload_dataset(), "Expected the reloaded dataset to be swapped in.")
+#1.)
+            self.assertGreater(index.current_dataset.generation, previous_dataset.generation, "Expected a newer generation of the reloaded dataset.")
+            self.assertEqual(index.current_dataset.version, previous_dataset.version, "Expected the same version of the reloaded dataset.")
+            self.assertEqual(index.resolve_subdivision_names("Cork"), (("IE-CO",), None), "Expected the subdivision of the name using the previous dataset.")
+        self.assertEqual(index.resolve_subdivision_names("Cork"), (("IE-CO",), None), "Expected the subdivision of the name using the reloaded dataset.")
+        test_stats = index.subdivision_name_cache.stats()
+#2.)
+        with app.test_request_context("/api/name/Cork"):
+            g.dataset = previous_dataset
+            self.assertEqual(index.resolve_subdivision_names("Cork"), (("IE-CO",), None), "Expected the subdivision of the name using the previous dataset.")
+        self.assertEqual(index.resolve_subdivision_names("Cork"), (("IE-CO",), None), "Expected the subdivision of the name using the reloaded dataset.")
+        stats = index.subdivision_name_cache.stats()
+        self.assertEqual((stats["invalidations"], stats["hits"]), (test_stats["invalidations"], test_stats["hits"] + 1),
+            "Expected the reloaded dataset's entry to be hit rather than invalidated by the previous dataset, got {}.".format(stats))
+        self.assertGreater(stats["bypasses"], test_stats["bypasses"], "Expected the previous dataset to bypass the cache.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
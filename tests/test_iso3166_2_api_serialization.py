@@ -0,0 +1,130 @@
+import json
+import unittest
+from flask import jsonify
+import index
+from index import app, all_iso3166_2
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Serialization_Tests(unittest.TestCase):
+    """
+    Test suite for testing the multi-country responses of the ISO 3166-2 api, joined from each
+    country's cached JSON fragment, are identical to the output of jsonify, using the Flask test
+    client rather than the hosted API.
+
+    Test Cases
+    ==========
+    test_alpha_parity:
+        testing the joined /api/alpha response of multiple countries is identical to jsonify's.
+    test_subdivision_parity:
+        testing the /api/subdivision response of subdivisions of multiple countries is identical to jsonify's.
+    test_country_name_parity:
+        testing the joined /api/country_name response of multiple countries is identical to jsonify's.
+    test_all_parity:
+        testing the joined /api/all response is identical to jsonify's.
+    test_fields_cache_keys:
+        testing the cached projections are keyed on the canonical fields, and their caches are bounded.
+    test_empty_fields:
+        testing a fields parameter with no attributes returns the full data, rather than empty projections.
+    """
+    def setUp(self):
+        """ Initialise test variables, Flask test client. """
+        self.client = app.test_client()
+        self.alpha_url = "/api/alpha/"
+        self.subdivision_url = "/api/subdivision/"
+        self.country_name_url = "/api/country_name/"
+        self.all_url = "/api/all"
+
+    def jsonify_body(self, data: dict) -> bytes:
+        """ Return the body of the input data serialized by jsonify, as previously returned by the endpoints. """
+        with app.app_context():
+            return jsonify(data).get_data()
+
+    def project(self, subdivision: dict, fields: list) -> dict:
+        """ Return the input subdivision's data projected down to the input attributes, or its full data if None. """
+        return subdivision if (fields is None) else {field: subdivision[field] for field in fields}
+
+    def assertParity(self, url: str, data: dict) -> None:
+        """ Assert the response of the input url is byte identical and JSON equal to the jsonify output of the input data. """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, "Expected 200 status code for {}, got {}.".format(url, response.status_code))
+        self.assertEqual(response.mimetype, "application/json", "Expected application/json for {}, got {}.".format(url, response.mimetype))
+        self.assertEqual(json.loads(response.data), json.loads(self.jsonify_body(data)), "Expected JSON equal to jsonify's output for {}.".format(url))
+        self.assertEqual(response.data, self.jsonify_body(data), "Expected output byte identical to jsonify's for {}.".format(url))
+
+    def test_alpha_parity(self):
+        """ Testing the joined /api/alpha response of multiple countries is identical to jsonify's. """
+        test_alpha_codes = [(["FR", "DE", "IE"], "FR,DE,IE"), (["AD", "FR", "IE"], "AND,FR,372"), (["GB", "LU", "MT"], "MT, gb ,LUX,GB"),
+            (sorted(all_iso3166_2)[:50], ",".join(sorted(all_iso3166_2)[:50][::-1]))]
+#1.)
+        for alpha_codes, url_codes in test_alpha_codes:
+            self.assertParity(self.alpha_url + url_codes, {alpha_2: all_iso3166_2[alpha_2] for alpha_2 in alpha_codes})
+#2.)
+        for fields in (["name"], ["name", "type"], ["flag", "latLng", "parentCode"]):
+            self.assertParity(self.alpha_url + "FR,DE,IE?fields=" + ",".join(fields[::-1]), {alpha_2: {subd: self.project(subdivision, fields)
+                for subd, subdivision in all_iso3166_2[alpha_2].items()} for alpha_2 in ["FR", "DE", "IE"]})
+
+    def test_subdivision_parity(self):
+        """ Testing the /api/subdivision response of subdivisions of multiple countries is identical to jsonify's. """
+        test_subdivision_codes = ["IE-D", "GB-BIR", "FR-IDF", "DE-BY", "US-NY"]
+        test_subdivisions = {subd: all_iso3166_2[subd.split("-")[0]][subd] for subd in test_subdivision_codes}
+#1.)
+        self.assertParity(self.subdivision_url + ",".join(test_subdivision_codes), test_subdivisions)
+#2.)
+        self.assertParity(self.subdivision_url + ",".join(test_subdivision_codes) + "?fields=type,name", {subd: self.project(subdivision, ["name", "type"])
+            for subd, subdivision in test_subdivisions.items()})
+
+    def test_country_name_parity(self):
+        """ Testing the joined /api/country_name response of multiple countries is identical to jsonify's. """
+#1.)
+        self.assertParity(self.country_name_url + "Ireland,France,Germany", {alpha_2: all_iso3166_2[alpha_2] for alpha_2 in ["DE", "FR", "IE"]})
+#2.)
+        self.assertParity(self.country_name_url + "Ireland,France?fields=name", {alpha_2: {subd: self.project(subdivision, ["name"])
+            for subd, subdivision in all_iso3166_2[alpha_2].items()} for alpha_2 in ["FR", "IE"]})
+
+    def test_all_parity(self):
+        """ Testing the joined /api/all response is identical to jsonify's. """
+#1.)
+        self.assertParity(self.all_url, all_iso3166_2)
+#2.)
+        self.assertParity(self.all_url + "?fields=name", {alpha_2: {subd: self.project(subdivision, ["name"])
+            for subd, subdivision in subdivisions.items()} for alpha_2, subdivisions in all_iso3166_2.items()})
+
+    def test_fields_cache_keys(self):
+        """ Testing the cached projections are keyed on the canonical fields, and their caches are bounded. """
+        self.client.get(self.alpha_url + "IE?fields=name")
+        test_caches = index.active_dataset().caches
+#1.)
+        self.assertEqual(test_caches["projected_subdivision"].cache_info().maxsize, index.PROJECTED_SUBDIVISION_CACHE_SIZE,
+            "Expected a bounded projected subdivision cache, got {}.".format(test_caches["projected_subdivision"].cache_info()))
+        self.assertEqual(test_caches["serialized_country"].cache_info().maxsize, index.SERIALIZED_COUNTRY_CACHE_SIZE,
+            "Expected a bounded serialized country cache, got {}.".format(test_caches["serialized_country"].cache_info()))
+        self.assertGreaterEqual(index.PROJECTED_SUBDIVISION_CACHE_SIZE, sum(len(subdivisions) for subdivisions in all_iso3166_2.values()),
+            "Expected the projected subdivision cache to fit at least one projection of every subdivision.")
+        self.assertGreaterEqual(index.SERIALIZED_COUNTRY_CACHE_SIZE, len(all_iso3166_2), "Expected the serialized country cache to fit every country.")
+#2.)
+        test_url = self.alpha_url + "FR,DE?fields=latLng,flag"
+        self.client.get(test_url)
+        test_body = self.client.get(test_url).data
+        test_cache_misses = (test_caches["projected_subdivision"].cache_info().misses, test_caches["serialized_country"].cache_info().misses)
+        for fields in ("flag,latLng", "latLng,flag,latLng", " flag , latLng ", "flag,flag,latLng,"):
+            response = self.client.get(self.alpha_url + "FR,DE?fields=" + fields)
+            self.assertEqual(response.data, test_body, "Expected the same response for fields {}.".format(fields))
+            self.assertEqual((test_caches["projected_subdivision"].cache_info().misses, test_caches["serialized_country"].cache_info().misses),
+                test_cache_misses, "Expected the cached projections to be reused for fields {}, got {}.".format(fields, test_caches["serialized_country"].cache_info()))
+#3.)
+        response = self.client.get(self.alpha_url + "FR?fields=flag,unknown")
+        self.assertEqual(response.status_code, 400, "Expected 400 status code for an invalid field, got {}.".format(response.status_code))
+        self.assertEqual(test_caches["serialized_country"].cache_info().misses, test_cache_misses[1], "Expected no cache entries for invalid fields.")
+
+    def test_empty_fields(self):
+        """ Testing a fields parameter with no attributes returns the full data, rather than empty projections. """
+#1.)
+        for fields in ("", ",", ", ,", " , , ", ",,,"):
+            self.assertParity(self.alpha_url + "FR,IE?fields=" + fields, {alpha_2: all_iso3166_2[alpha_2] for alpha_2 in ["FR", "IE"]})
+            self.assertParity(self.subdivision_url + "IE-D,FR-IDF?fields=" + fields, {subd: all_iso3166_2[subd.split("-")[0]][subd] for subd in ["FR-IDF", "IE-D"]})
+#2.)
+        self.assertEqual(self.client.get(self.all_url + "?fields=,").data, self.client.get(self.all_url).data, "Expected the full data of /api/all for an empty fields parameter.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
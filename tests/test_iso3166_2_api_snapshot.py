@@ -0,0 +1,75 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import index
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class ISO3166_2_API_Snapshot_Tests(unittest.TestCase):
+    """
+    Test suite for testing the build-time snapshot of the dataset and its lookup indexes, loaded by
+    the ISO 3166-2 api at startup.
+
+    Test Cases
+    ==========
+    test_source_stamp:
+        testing the snapshot's stamp is a hash of the iso3166-2 data file's contents, unchanged by its modification time.
+    test_load_snapshot:
+        testing a snapshot is only loaded if it was built from the installed iso3166-2 data and can be read.
+    test_shipped_snapshot:
+        testing the snapshot shipped with the API was built from the installed iso3166-2 data.
+    """
+    def setUp(self):
+        """ Initialise test variables, temporary directory and a copy of the iso3166-2 data file. """
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.test_dir.cleanup)
+        self.test_data_path = os.path.join(self.test_dir.name, "iso3166-2.json")
+        shutil.copyfile(index.dataset_source_path(), self.test_data_path)
+        self.test_snapshot_path = os.path.join(self.test_dir.name, "iso3166-2-snapshot.pickle")
+
+    def test_source_stamp(self):
+        """ Testing the snapshot's stamp is a hash of the iso3166-2 data file's contents, unchanged by its modification time. """
+        with open(self.test_data_path, "rb") as test_data_file:
+            test_hash = hashlib.sha256(test_data_file.read()).hexdigest()
+#1.)
+        self.assertEqual(index.dataset_source_stamp(), test_hash, "Expected the hash of the iso3166-2 data file, got {}.".format(index.dataset_source_stamp()))
+        with mock.patch.object(index, "dataset_source_path", return_value=self.test_data_path):
+#2.)
+            os.utime(self.test_data_path, ns=(0, 0))
+            self.assertEqual(index.dataset_source_stamp(), test_hash, "Expected the same stamp after the data file's modification time changed.")
+#3.)
+            with open(self.test_data_path, "ab") as test_data_file:
+                test_data_file.write(b" ")
+            self.assertNotEqual(index.dataset_source_stamp(), test_hash, "Expected a different stamp after the data file's contents changed.")
+
+    def test_load_snapshot(self):
+        """ Testing a snapshot is only loaded if it was built from the installed iso3166-2 data and can be read. """
+        with mock.patch.object(index, "dataset_source_path", return_value=self.test_data_path):
+            index.save_snapshot(index.build_dataset(), self.test_snapshot_path)
+#1.)
+            os.utime(self.test_data_path, ns=(0, 0))
+            test_dataset = index.load_snapshot(self.test_snapshot_path)
+            self.assertIsNotNone(test_dataset, "Expected the snapshot to be loaded after a fresh install of the same data.")
+            self.assertEqual(test_dataset["version"], index.current_dataset.version, "Expected the version of the installed data.")
+#2.)
+            with open(self.test_data_path, "ab") as test_data_file:
+                test_data_file.write(b" ")
+            self.assertIsNone(index.load_snapshot(self.test_snapshot_path), "Expected no snapshot built from different data.")
+#3.)
+        self.assertIsNone(index.load_snapshot(os.path.join(self.test_dir.name, "missing.pickle")), "Expected no snapshot if it doesn't exist.")
+        with open(self.test_snapshot_path, "wb") as test_snapshot_file:
+            test_snapshot_file.write(b"not a snapshot")
+        self.assertIsNone(index.load_snapshot(self.test_snapshot_path), "Expected no snapshot if it can't be unpickled.")
+
+    @unittest.skipIf("ISO3166_2_SNAPSHOT" in os.environ, "Snapshot path set using the ISO3166_2_SNAPSHOT environment variable.")
+    def test_shipped_snapshot(self):
+        """ Testing the snapshot shipped with the API was built from the installed iso3166-2 data. """
+#1.)
+        self.assertTrue(os.path.isfile(index.snapshot_path), "Expected the snapshot to be shipped at {}.".format(index.snapshot_path))
+        self.assertIsNotNone(index.load_snapshot(index.snapshot_path), "Expected the shipped snapshot to be current, rebuild it using python build_snapshot.py.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
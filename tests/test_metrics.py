@@ -0,0 +1,99 @@
+from metrics import MetricsRegistry, format_labels, format_value
+import threading
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Metrics_Tests(unittest.TestCase):
+    """
+    Test suite for testing the per-thread metrics registry exported by the /metrics endpoint.
+
+    Test Cases
+    ==========
+    test_format:
+        testing labels and values are formatted in the Prometheus text format.
+    test_observe_request:
+        testing requests are counted, errors counted by status code and histograms observed.
+    test_threads:
+        testing the requests recorded by each thread into its own shard are summed, and shards of exited threads retired.
+    test_render:
+        testing the metrics are rendered in the Prometheus text format, with cumulative histogram buckets.
+    """
+    def setUp(self):
+        """ Initialise test variables, metrics registry. """
+        self.metrics = MetricsRegistry()
+
+    def test_format(self):
+        """ Testing labels and values are formatted in the Prometheus text format. """
+#1.)
+        self.assertEqual(format_labels({"endpoint": "api_alpha", "status": 200}), '{endpoint="api_alpha",status="200"}',
+            "Expected formatted labels, got {}.".format(format_labels({"endpoint": "api_alpha", "status": 200})))
+        self.assertEqual(format_labels({"name": 'a"b\\c\n'}), '{name="a\\"b\\\\c\\n"}', "Expected escaped label value.")
+#2.)
+        self.assertEqual([format_value(value) for value in (3, 2.0, 0.25)], ["3", "2", "0.25"], "Expected integers without a decimal point.")
+
+    def test_observe_request(self):
+        """ Testing requests are counted, errors counted by status code and histograms observed. """
+        self.metrics.observe_request("api_alpha", "GET", 200, 0.002, 6000)
+        self.metrics.observe_request("api_alpha", "GET", 200, 0.004, 4000)
+        self.metrics.observe_request("api_alpha", "GET", 400, 0.001, 200)
+        self.metrics.observe_request("api_subdivision_name", "GET", 200, 0.01, None, 25)
+        test_samples = self.metrics.samples()
+#1.)
+        self.assertEqual(test_samples["requests"], {("api_alpha", "GET", 200): 2, ("api_alpha", "GET", 400): 1, ("api_subdivision_name", "GET", 200): 1},
+            "Expected requests counted by endpoint, method and status, got {}.".format(test_samples["requests"]))
+        self.assertEqual(test_samples["errors"], {("api_alpha", 400): 1}, "Expected only 4xx and 5xx responses counted as errors.")
+#2.)
+        self.assertEqual(test_samples["latency"]["api_alpha"][1:], [0.007, 3], "Expected latency sum and count of 3 requests.")
+        self.assertEqual(test_samples["size"]["api_alpha"][1:], [10200, 3], "Expected response size sum and count of 3 requests.")
+        self.assertNotIn("api_subdivision_name", test_samples["size"], "Expected no response size observed if unknown.")
+        self.assertEqual(test_samples["candidates"], {"api_subdivision_name": [[0, 0, 1, 0, 0, 0, 0], 25, 1]},
+            "Expected candidates scored only observed for fuzzy matching requests, got {}.".format(test_samples["candidates"]))
+
+    def test_threads(self):
+        """ Testing the requests recorded by each thread into its own shard are summed, and shards of exited threads retired. """
+        def record_requests():
+            for _ in range(1000):
+                self.metrics.observe_request("api_alpha", "GET", 200, 0.001, 100)
+        threads = [threading.Thread(target=record_requests) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+#1.)
+        self.assertEqual(self.metrics.samples()["requests"], {("api_alpha", "GET", 200): 8000}, "Expected the requests of every thread to be summed.")
+        self.assertEqual(self.metrics.samples()["latency"]["api_alpha"][2], 8000, "Expected the latency of every request to be observed.")
+#2.)
+        self.assertEqual(self.metrics.shards, [], "Expected the shards of exited threads to be retired, got {}.".format(len(self.metrics.shards)))
+        self.metrics.observe_request("api_alpha", "GET", 200, 0.001, 100)
+        self.assertEqual(len(self.metrics.shards), 1, "Expected only the shard of the running thread.")
+        self.assertEqual(self.metrics.samples()["requests"], {("api_alpha", "GET", 200): 8001}, "Expected the retired and running shards to be summed.")
+#3.)
+        for _ in range(300):
+            thread = threading.Thread(target=self.metrics.observe_request, args=("api_subdivision", "GET", 200, 0.001, 100))
+            thread.start()
+            thread.join()
+        self.assertEqual(len(self.metrics.shards), 1, "Expected no shards of one-off threads to be kept, got {}.".format(len(self.metrics.shards)))
+        self.assertEqual(self.metrics.samples()["requests"][("api_subdivision", "GET", 200)], 300, "Expected the requests of one-off threads to be kept.")
+
+    def test_render(self):
+        """ Testing the metrics are rendered in the Prometheus text format, with cumulative histogram buckets. """
+        self.metrics.observe_request("api_alpha", "GET", 200, 0.002, 6000)
+        self.metrics.observe_request("api_alpha", "GET", 404, 0.3, 200)
+        test_render = self.metrics.render([("dataset_info", "gauge", "Version of the dataset.", [({"version": "1.6.1"}, 1)])]).splitlines()
+#1.)
+        for line in ['# TYPE iso3166_2_requests_total counter', 'iso3166_2_requests_total{endpoint="api_alpha",method="GET",status="200"} 1',
+                'iso3166_2_request_errors_total{endpoint="api_alpha",status="404"} 1', '# TYPE iso3166_2_request_duration_seconds histogram',
+                'iso3166_2_request_duration_seconds_bucket{endpoint="api_alpha",le="0.001"} 0',
+                'iso3166_2_request_duration_seconds_bucket{endpoint="api_alpha",le="0.0025"} 1',
+                'iso3166_2_request_duration_seconds_bucket{endpoint="api_alpha",le="0.5"} 2',
+                'iso3166_2_request_duration_seconds_bucket{endpoint="api_alpha",le="+Inf"} 2',
+                'iso3166_2_request_duration_seconds_count{endpoint="api_alpha"} 2', 'iso3166_2_response_size_bytes_sum{endpoint="api_alpha"} 6200',
+                '# TYPE iso3166_2_dataset_info gauge', 'iso3166_2_dataset_info{version="1.6.1"} 1']:
+            self.assertIn(line, test_render, "Expected line {} in the rendered metrics.".format(line))
+#2.)
+        self.assertFalse(any(line.startswith("iso3166_2_fuzzy_candidates_scored_") for line in test_render),
+            "Expected no fuzzy candidates samples without fuzzy matching requests.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
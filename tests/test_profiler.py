@@ -0,0 +1,79 @@
+from profiler import RequestProfiler
+import marshal
+import time
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Profiler_Tests(unittest.TestCase):
+    """
+    Test suite for testing the request profiler used by the opt-in profiling of requests.
+
+    Test Cases
+    ==========
+    test_phases:
+        testing each phase of a request is timed and returned in the Server-Timing header format.
+    test_history:
+        testing only the profiles of the most recently profiled requests are kept.
+    test_concurrent_profiles:
+        testing only one request is run under cProfile at a time.
+    """
+    def setUp(self):
+        """ Initialise test variables, request profiler. """
+        self.profiler = RequestProfiler(history=3)
+
+    def test_phases(self):
+        """ Testing each phase of a request is timed and returned in the Server-Timing header format. """
+        test_profile = self.profiler.start()
+        test_profile.mark("parse")
+        time.sleep(0.01)
+        test_profile.mark("resolve")
+        test_profile.mark("parse")
+        test_summary = self.profiler.finish(test_profile, "GET", "/api/name/Dublin", "api_subdivision_name", 200)
+#1.)
+        self.assertEqual(list(test_summary["phases_ms"]), ["parse", "resolve", "serialize"], "Expected parse, resolve and serialize phases.")
+        self.assertGreaterEqual(test_summary["phases_ms"]["resolve"], 10, "Expected resolve phase of at least 10ms, got {}.".format(test_summary))
+        self.assertAlmostEqual(sum(test_summary["phases_ms"].values()), test_summary["total_ms"], delta=0.01, msg="Expected phases to sum to the total.")
+#2.)
+        self.assertRegex(test_profile.server_timing(), r"^parse;dur=[\d.]+, resolve;dur=[\d.]+, serialize;dur=[\d.]+, total;dur=[\d.]+$",
+            "Expected Server-Timing header, got {}.".format(test_profile.server_timing()))
+#3.)
+        test_profile.mark("resolve")
+        self.assertEqual(round(test_profile.phases["resolve"] * 1000, 3), test_summary["phases_ms"]["resolve"], "Expected no marks once stopped.")
+#4.)
+        test_unmarked_profile = self.profiler.start()
+        test_unmarked_profile.stop()
+        self.assertRegex(test_unmarked_profile.server_timing(), r"^total;dur=[\d.]+$", "Expected only the total without any marked phases.")
+
+    def test_history(self):
+        """ Testing only the profiles of the most recently profiled requests are kept. """
+        for _ in range(5):
+            self.profiler.finish(self.profiler.start(), "GET", "/api/alpha/IE", "api_alpha", 200)
+#1.)
+        self.assertEqual([summary["id"] for summary in self.profiler.profiles()], [5, 4, 3], "Expected the 3 most recent profiles.")
+        self.assertIsNone(self.profiler.stats(1), "Expected no stats of a discarded profile.")
+#2.)
+        test_stats = marshal.loads(self.profiler.stats(5))
+        self.assertIsInstance(test_stats, dict, "Expected the contents of a pstats file.")
+        self.assertIn("function calls", self.profiler.stats(5, "text"), "Expected the stats as text.")
+
+    def test_concurrent_profiles(self):
+        """ Testing only one request is run under cProfile at a time. """
+        test_profile = self.profiler.start()
+        test_concurrent_profile = self.profiler.start()
+#1.)
+        self.assertIsNotNone(test_profile.profile, "Expected the first request to run under cProfile.")
+        self.assertIsNone(test_concurrent_profile.profile, "Expected the concurrent request to only be timed.")
+        test_summary = self.profiler.finish(test_concurrent_profile, "GET", "/api/alpha/IE", "api_alpha", 200)
+        self.assertFalse(test_summary["stats"], "Expected no cProfile stats of the concurrent request.")
+        self.assertIsNone(self.profiler.stats(test_summary["id"]), "Expected no stats of the concurrent request.")
+#2.)
+        test_profile.stop()
+        test_profile.stop()
+        self.assertFalse(self.profiler.lock.locked(), "Expected the profiler to be released once stopped.")
+        test_next_profile = self.profiler.start()
+        test_next_profile.stop()
+        self.assertIsNotNone(test_next_profile.profile, "Expected the next request to run under cProfile.")
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+from result_cache import ResultCache
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Result_Cache_Tests(unittest.TestCase):
+    """
+    Test suite for testing the LRU cache with a time to live used by the /api/name endpoint.
+
+    Test Cases
+    ==========
+    test_lru_eviction:
+        testing the least recently used entry is evicted when the cache is full.
+    test_ttl_expiration:
+        testing entries expire once older than the time to live.
+    test_version_invalidation:
+        testing all entries are invalidated when the dataset version changes.
+    test_generation_invalidation:
+        testing entries are invalidated by a newer dataset generation, while an older generation bypasses the cache.
+    test_disabled:
+        testing nothing is cached when the max size is 0.
+    """
+    def setUp(self):
+        """ Initialise test variables, create cache using a fake clock. """
+        self.now = 0
+        self.cache = ResultCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_lru_eviction(self):
+        """ Testing the least recently used entry is evicted when the cache is full. """
+        self.cache.put("a", 1, "1.0")
+        self.cache.put("b", 2, "1.0")
+#1.)
+        self.assertEqual(self.cache.get("a", "1.0"), 1, "Expected cached value of key a.")
+        self.cache.put("c", 3, "1.0")
+#2.)
+        self.assertIsNone(self.cache.get("b", "1.0"), "Expected least recently used key b to be evicted.")
+        self.assertEqual(self.cache.get("a", "1.0"), 1, "Expected cached value of key a.")
+        self.assertEqual(self.cache.get("c", "1.0"), 3, "Expected cached value of key c.")
+#3.)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"], stats["size"]), (3, 1, 1, 2),
+            "Expected cache hit, miss, eviction counters and size, got {}.".format(stats))
+
+    def test_ttl_expiration(self):
+        """ Testing entries expire once older than the time to live. """
+        self.cache.put("a", 1, "1.0")
+        self.now = 9.9
+#1.)
+        self.assertEqual(self.cache.get("a", "1.0"), 1, "Expected cached value of key a before it expires.")
+        self.now = 10
+#2.)
+        self.assertIsNone(self.cache.get("a", "1.0"), "Expected key a to have expired.")
+        self.assertEqual(self.cache.stats()["expirations"], 1, "Expected 1 expiration, got {}.".format(self.cache.stats()))
+#3.)
+        cache = ResultCache(maxsize=2, ttl=0, clock=lambda: self.now)
+        cache.put("a", 1, "1.0")
+        self.now = 1e9
+        self.assertEqual(cache.get("a", "1.0"), 1, "Expected entries to never expire with a TTL of 0.")
+
+    def test_version_invalidation(self):
+        """ Testing all entries are invalidated when the dataset version changes. """
+        self.cache.put("a", 1, "1.0")
+#1.)
+        self.assertIsNone(self.cache.get("a", "1.1"), "Expected key a to be invalidated by new dataset version.")
+        self.assertEqual(self.cache.stats()["invalidations"], 1, "Expected 1 invalidation, got {}.".format(self.cache.stats()))
+#2.)
+        self.cache.put("a", 2, "1.1")
+        self.assertEqual(self.cache.get("a", "1.1"), 2, "Expected value of key a cached from new dataset version.")
+
+    def test_generation_invalidation(self):
+        """ Testing entries are invalidated by a newer dataset generation, while an older generation bypasses the cache. """
+        self.cache.put("a", 1, "1.0", 0)
+#1.)
+        self.assertIsNone(self.cache.get("a", "1.0", 1), "Expected key a to be invalidated by a newer dataset generation of the same version.")
+        self.cache.put("a", 2, "1.0", 1)
+#2.)
+        for _ in range(3):
+            self.assertIsNone(self.cache.get("a", "1.0", 0), "Expected an older dataset generation to bypass the cache.")
+            self.cache.put("a", 1, "1.0", 0)
+            self.assertEqual(self.cache.get("a", "1.0", 1), 2, "Expected the newer generation's entry not to be evicted by an older generation.")
+#3.)
+        stats = self.cache.stats()
+        self.assertEqual((stats["invalidations"], stats["bypasses"], stats["hits"]), (1, 6, 3),
+            "Expected 1 invalidation, 6 bypasses and 3 hits, got {}.".format(stats))
+
+    def test_disabled(self):
+        """ Testing nothing is cached when the max size is 0. """
+        cache = ResultCache(maxsize=0, ttl=10)
+        cache.put("a", 1, "1.0")
+#1.)
+        self.assertIsNone(cache.get("a", "1.0"), "Expected nothing to be cached with a max size of 0.")
+        self.assertEqual(cache.stats()["size"], 0, "Expected empty cache, got {}.".format(cache.stats()))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)
@@ -0,0 +1,69 @@
+from spatial_index import KDTree, haversine_distance
+import random
+import unittest
+unittest.TestLoader.sortTestMethodsUsing = None
+
+class Spatial_Index_Tests(unittest.TestCase):
+    """
+    Test suite for testing the k-d tree spatial index used by the /api/nearest endpoint.
+
+    Test Cases
+    ==========
+    test_haversine_distance:
+        testing the great-circle distance between two points.
+    test_nearest:
+        testing the nearest points are returned closest first, in key order if the same distance away, within the max distance.
+    test_nearest_exhaustive:
+        testing the k-d tree returns exactly the same nearest points as computing the distance to
+        every point, for a variety of queries, k and max distances.
+    """
+    def setUp(self):
+        """ Initialise test variables, build k-d tree. """
+        self.points = [("dublin", 53.35, -6.26), ("belfast", 54.6, -5.93), ("london", 51.51, -0.13), ("paris", 48.86, 2.35),
+            ("fiji", -17.71, 178.07), ("samoa", -13.76, -172.1), ("north pole", 90, 0), ("south pole", -90, 0)]
+        self.kd_tree = KDTree(self.points)
+
+    def test_haversine_distance(self):
+        """ Testing the great-circle distance between two points. """
+#1.)
+        self.assertAlmostEqual(haversine_distance(53.35, -6.26, 51.51, -0.13), 464.0, delta=1,
+            msg="Expected distance from Dublin to London of ~464km.")
+#2.)
+        self.assertAlmostEqual(haversine_distance(0, 179.5, 0, -179.5), 111.2, delta=0.1, msg="Expected distance across the antimeridian.")
+        self.assertEqual(haversine_distance(10, 10, 10, 10), 0, "Expected distance of 0 between the same point.")
+
+    def test_nearest(self):
+        """ Testing the nearest points are returned closest first, within the max distance. """
+#1.)
+        self.assertEqual([key for key, _ in self.kd_tree.nearest(53.3, -6.2, k=3)], ["dublin", "belfast", "london"],
+            "Expected 3 nearest points closest first, got {}.".format(self.kd_tree.nearest(53.3, -6.2, k=3)))
+#2.)
+        self.assertEqual([key for key, _ in self.kd_tree.nearest(53.3, -6.2, k=3, max_distance=200)], ["dublin", "belfast"],
+            "Expected only points within 200km.")
+#3.)
+        self.assertEqual(self.kd_tree.nearest(-15, 179.9)[0][0], "fiji", "Expected nearest point across the antimeridian.")
+        self.assertEqual(self.kd_tree.nearest(89, 120)[0][0], "north pole", "Expected nearest point at the pole.")
+#4.)
+        test_ties = KDTree([("c", 10, 10), ("a", 10, 10), ("b", 10, 10), ("d", 10, 10)])
+        self.assertEqual([key for key, _ in test_ties.nearest(10, 10, k=3)], ["a", "b", "c"], "Expected points the same distance away in key order.")
+#5.)
+        self.assertEqual(len(self.kd_tree.nearest(0, 0, k=100)), len(self.points), "Expected all points when k is greater than the number of points.")
+        self.assertEqual(self.kd_tree.nearest(0, 0, k=0), [], "Expected no points when k is 0.")
+        self.assertEqual(KDTree([]).nearest(0, 0), [], "Expected no points from an empty tree.")
+
+    def test_nearest_exhaustive(self):
+        """ Testing the k-d tree returns exactly the same nearest points as computing the distance to every point. """
+        random.seed(0)
+        points = [(str(i), random.uniform(-90, 90), random.uniform(-180, 180)) for i in range(500)]
+        kd_tree = KDTree(points)
+#1.)
+        for _ in range(200):
+            lat, lng, k, max_distance = random.uniform(-90, 90), random.uniform(-180, 180), random.choice([1, 5, 20]), random.choice([None, 500, 2000])
+            expected = sorted((haversine_distance(lat, lng, point_lat, point_lng), key) for key, point_lat, point_lng in points)
+            expected = [round(distance, 6) for distance, _ in expected if max_distance is None or distance <= max_distance][:k]
+            self.assertEqual([round(distance, 6) for _, distance in kd_tree.nearest(lat, lng, k, max_distance)], expected,
+                "Expected the same nearest points as an exhaustive search for query {}, {}.".format(lat, lng))
+
+if __name__ == '__main__':
+    #run all unit tests
+    unittest.main(verbosity=2)